@@ -0,0 +1,254 @@
+from typing import NamedTuple
+
+from instrumentation import instrumentation
+from knapsack import NUMPY_MIN_CELLS, _numpy_dtype, _progress_every
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional; sem ele as duas DPs rodam em Python puro
+    np = None
+
+# Limites de memória: o top-k guarda k escolhas por célula da DP (1 byte cada)
+# e a fronteira de Pareto nunca passa de `max_size` mochilas durante a DP.
+DEFAULT_TOP_K = 5
+MAX_TOP_K = 64
+DEFAULT_FRONTIER = 128
+MAX_FRONTIER = 1024
+
+
+class Alternative(NamedTuple):
+    score: float    # primeiro objetivo (no top-k, o único)
+    chosen: list    # ids dos itens, em ordem
+    weight: int
+    totals: dict    # objetivo -> soma sobre os itens escolhidos
+
+
+def knapsack_top_k(weights, values, max_weight: int, k: int = DEFAULT_TOP_K, ids=None,
+                   progress=None) -> list:
+    """
+    As `k` melhores mochilas (conjuntos distintos) em uma DP só, do maior
+    score para o menor. Cada célula da DP guarda os k melhores scores em vez
+    de um, e cada item guarda, por célula, de qual posição da linha anterior
+    veio cada um deles (com ou sem o item), o que basta para reconstruir todas
+    as k mochilas. Custa ~k vezes uma DP, com k bytes por célula de memória.
+
+    Itens com score <= 0 ficam de fora (só criariam alternativas piores com
+    o mesmo conteúdo útil). `progress` funciona como em `knapsack()`.
+    """
+    if not 1 <= k <= MAX_TOP_K:
+        raise ValueError(f"k precisa estar entre 1 e {MAX_TOP_K}")
+    if ids is None:
+        ids = range(len(weights))
+    usable = [i for i in ids if weights[i] <= max_weight and values[i] > 0]
+    item_weights = [weights[i] for i in usable]
+    item_values = [values[i] for i in usable]
+    instrumentation.count("dp_cells", len(usable) * (max_weight + 1) * k)
+
+    cells = len(usable) * (max_weight + 1)
+    if np is not None and cells >= NUMPY_MIN_CELLS and _numpy_dtype(item_values) is not None:
+        row, sources = _fill_top_k_numpy(item_weights, item_values, max_weight, k, progress)
+    else:
+        row, sources = _fill_top_k(item_weights, item_values, max_weight, k, progress)
+
+    alternatives = []
+    for rank, score in enumerate(row):
+        chosen = []
+        w = max_weight
+        for position in range(len(usable) - 1, -1, -1):
+            if sources[position] is None:
+                continue
+            source = sources[position][rank * (max_weight + 1) + w]
+            if source >= k:
+                chosen.append(usable[position])
+                rank = source - k
+                w -= item_weights[position]
+            else:
+                rank = source
+        chosen.reverse()
+        alternatives.append(Alternative(score, chosen, sum(weights[i] for i in chosen), {"score": score}))
+    return alternatives
+
+
+def _fill_top_k(weights, values, max_weight: int, k: int, progress=None):
+    """
+    Linha final (as k melhores somas da capacidade máxima) e, por item, um
+    bytearray k x (W+1): posição de origem < k = sem o item, >= k = com ele
+    (None: o item não entrou em nenhuma célula).
+    """
+    size = max_weight + 1
+    # rows[w]: melhores somas (decrescentes) usando até `w` de peso; começa só com a mochila vazia
+    rows = [[0] for _ in range(size)]
+    identity = bytes(rank for rank in range(k) for _ in range(size))
+    sources = []
+
+    step = _progress_every(size * k)
+    for position in range(len(weights)):
+        if progress is not None and position % step == 0:
+            progress(position, len(weights))
+        item_weight = weights[position]
+        item_value = values[position]
+        source = bytearray(identity)
+
+        # de trás pra frente: rows[w - item_weight] ainda é a linha anterior
+        for w in range(max_weight, item_weight - 1, -1):
+            without = rows[w]
+            base = rows[w - item_weight]
+            merged = []
+            a = b = 0
+            while len(merged) < k and (a < len(without) or b < len(base)):
+                if b == len(base) or (a < len(without) and without[a] >= base[b] + item_value):
+                    source[len(merged) * size + w] = a
+                    merged.append(without[a])
+                    a += 1
+                else:
+                    source[len(merged) * size + w] = k + b
+                    merged.append(base[b] + item_value)
+                    b += 1
+            rows[w] = merged
+        sources.append(source)
+
+    if progress is not None:
+        progress(len(weights), len(weights))
+    return rows[max_weight], sources
+
+
+def _fill_top_k_numpy(weights, values, max_weight: int, k: int, progress=None):
+    """Mesmo formato do `_fill_top_k`; cada item junta as 2k candidatas e ordena por coluna."""
+    size = max_weight + 1
+    missing = np.iinfo(np.int64).min // 4  # célula sem k mochilas distintas
+    row = np.full((k, size), missing, dtype=np.int64)
+    row[0] = 0
+    sources = []
+
+    identity = np.repeat(np.arange(k, dtype=np.uint8), size).reshape(k, size)
+
+    step = _progress_every(size * k)
+    for position in range(len(weights)):
+        if progress is not None and position % step == 0:
+            progress(position, len(weights))
+        item_weight = weights[position]
+        taken = row[:, :size - item_weight] + values[position]
+        # só mexe nas colunas em que a melhor soma com o item entra entre as k
+        active = np.flatnonzero(taken[0] > row[k - 1, item_weight:])
+        if not active.size:
+            sources.append(None)  # o item não entra em nenhuma das k melhores
+            continue
+        columns = active + item_weight
+        candidates = np.concatenate((row[:, columns], taken[:, active]))
+        # estável: no empate fica a opção sem o item, como no Python puro
+        order = np.argsort(-candidates, axis=0, kind="stable")[:k]
+        row[:, columns] = np.take_along_axis(candidates, order, axis=0)
+        source = identity.copy()
+        source[:, columns] = order
+        sources.append(source.tobytes())
+
+    if progress is not None:
+        progress(len(weights), len(weights))
+    last = row[:, max_weight]
+    return [int(score) for score in last if score >= 0], sources
+
+
+def knapsack_pareto(weights, objectives: dict, max_weight: int, max_size: int = DEFAULT_FRONTIER, ids=None,
+                    progress=None) -> tuple[list, bool]:
+    """
+    Fronteira de Pareto das mochilas que cabem em `max_weight` para vários
+    objetivos ao mesmo tempo. `objectives` é {nome: coluna indexada pelo id},
+    ex.: {"score": scores, "gold": catalog.values, "attack": catalog.attack};
+    o primeiro objetivo ordena o resultado (maior primeiro).
+
+    A DP percorre os itens mantendo só as mochilas parciais não dominadas
+    (uma mochila domina outra se não pesa mais e não perde em nenhum
+    objetivo), sem uma célula por capacidade. Se a fronteira passar de
+    `max_size`, ela é afinada mantendo pontos espalhados ao longo do primeiro
+    objetivo; aí o segundo elemento retornado é True e o resultado é uma
+    amostra da fronteira, não ela inteira.
+    """
+    if not 1 <= max_size <= MAX_FRONTIER:
+        raise ValueError(f"max_size precisa estar entre 1 e {MAX_FRONTIER}")
+    names = list(objectives)
+    if not names:
+        raise ValueError("Informe ao menos um objetivo")
+    columns = [objectives[name] for name in names]
+    if ids is None:
+        ids = range(len(weights))
+    usable = [
+        i for i in ids
+        if weights[i] <= max_weight and any(column[i] > 0 for column in columns)
+    ]
+
+    # estado: (peso, somas dos objetivos, nó) com nó = (id do item, nó anterior)
+    states = [(0, (0,) * len(columns), None)]
+    truncated = False
+    for position, i in enumerate(usable):
+        if progress is not None:
+            progress(position, len(usable))
+        item_weight = weights[i]
+        item_vector = tuple(column[i] for column in columns)
+        grown = [
+            (weight + item_weight, tuple(a + b for a, b in zip(vector, item_vector)), (i, node))
+            for weight, vector, node in states
+            if weight + item_weight <= max_weight
+        ]
+        states = _non_dominated(states + grown, by_weight=True)
+        instrumentation.count("pareto_states", len(states))
+        if len(states) > max_size:
+            states = _thin(states, max_size)
+            truncated = True
+    if progress is not None:
+        progress(len(usable), len(usable))
+
+    # na capacidade pedida o peso deixa de ser um objetivo
+    alternatives = []
+    for weight, vector, node in _non_dominated(states, by_weight=False):
+        chosen = []
+        while node is not None:
+            chosen.append(node[0])
+            node = node[1]
+        chosen.sort()
+        alternatives.append(Alternative(vector[0], chosen, weight, dict(zip(names, vector))))
+    alternatives.sort(key=lambda alternative: (-alternative.score, alternative.weight))
+    return alternatives, truncated
+
+
+def loadout_totals(chosen, columns: dict) -> dict:
+    """Soma de cada coluna ({nome: coluna indexada pelo id}) sobre os ids escolhidos."""
+    return {name: sum(column[i] for i in chosen) for name, column in columns.items()}
+
+
+def _non_dominated(states: list, by_weight: bool) -> list:
+    """
+    Remove os estados dominados (e as cópias exatas, mantendo a primeira).
+    Com `by_weight` o peso conta como objetivo a minimizar.
+    """
+    if len(states) <= 1:
+        return states
+    if np is not None and len(states) >= 64:
+        vectors = np.array([vector for _, vector, _ in states], dtype=float)
+        covers = np.all(vectors[:, None, :] >= vectors[None, :, :], axis=2)
+        if by_weight:
+            state_weights = np.array([weight for weight, _, _ in states])
+            covers &= state_weights[:, None] <= state_weights[None, :]
+        # i domina j: i cobre j e j não cobre i; em cópias exatas só a primeira fica
+        dominated = covers & ~covers.T
+        dominated |= np.triu(covers & covers.T, 1)
+        keep = ~dominated.any(axis=0)
+        return [state for state, kept in zip(states, keep) if kept]
+
+    # peso crescente e, no empate, somas decrescentes: quem pode dominar vem antes
+    ordered = sorted(states, key=lambda state: (state[0] if by_weight else 0, tuple(-v for v in state[1])))
+    kept = []
+    for state in ordered:
+        vector = state[1]
+        if not any(all(a >= b for a, b in zip(other[1], vector)) for other in kept):
+            kept.append(state)
+    return kept
+
+
+def _thin(states: list, max_size: int) -> list:
+    """`max_size` estados espalhados ao longo do primeiro objetivo (extremos incluídos)."""
+    ordered = sorted(states, key=lambda state: state[1][0])
+    if max_size == 1:
+        return ordered[-1:]
+    last = len(ordered) - 1
+    picks = sorted({round(j * last / (max_size - 1)) for j in range(max_size)})
+    return [ordered[j] for j in picks]
@@ -1,8 +1,45 @@
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
 import flet as ft
-import json
-from knapsack import knapsack
+from catalog import DEFAULT_CATALOG_PATH, ItemCatalog, load_catalog
+from reduction import knapsack_sweep_reduced
+from approx import knapsack_approx
+from alternatives import knapsack_pareto, knapsack_top_k, loadout_totals
+from cache import SweepCache
+from slots import SLOT_LIMITS, item_slot, knapsack_slots_ids
 from dungeon import DungeonManager
-from game_utils import prepare_items_for_knapsack 
+from game_utils import prepare_items_for_knapsack, prepare_chosen_items, ScoreMatrix
+from instrumentation import instrumentation
+from item_index import ItemIndex
+from knapsack import SolveCancelled
+from result_cards import BackpackTotals, CardCache
+
+# Linhas por página da tabela de itens (só a página visível vira DataRow)
+ITEMS_PAGE_SIZE = 50
+
+# Espera depois da última tecla no peso antes de recalcular (segundos)
+WEIGHT_DEBOUNCE_S = 0.4
+# Intervalo mínimo entre atualizações da barra de progresso (segundos)
+PROGRESS_UPDATE_INTERVAL = 0.1
+
+# A partir de quantas células (itens x capacidade) o "Equipar" mostra antes uma
+# prévia aproximada, com no máximo PREVIEW_EPSILON de distância do ótimo
+PREVIEW_MIN_CELLS = 1 << 20
+PREVIEW_EPSILON = 0.05
+
+# Quantas mochilas o diálogo "Alternativas" lista (top-k) e teto da fronteira de Pareto
+ALTERNATIVES_K = 5
+ALTERNATIVES_FRONTIER = 64
+
+# Onde o "Salvar JSON" do diagnóstico grava (ao lado do app, não no diretório atual)
+DIAGNOSTICS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "diagnostics.json")
+
+# Controles fixos no topo do painel de resultado (avatar, info, espaço, título da lista)
+RESULT_HEADER_SIZE = 4
 
 class RPGKnapsackApp:
     def __init__(self, page: ft.Page):
@@ -11,18 +48,34 @@ class RPGKnapsackApp:
         self.setup_page()
         
         # Carregando os dados dos itens
-        self.items_data = self.load_data()
-        self.dungeon_manager = DungeonManager(self.items_data) 
+        self.catalog = self.load_data()
+        self.score_matrix = ScoreMatrix(self.catalog)
+        self.solve_cache = SweepCache(maxsize=8)
+        self.item_slots = None  # calculado no primeiro uso de "Respeitar slots"
+        self.item_index = ItemIndex(self.catalog)
+        self.dungeon_manager = DungeonManager(self.catalog) 
         self.current_backpack = [] 
+        self.equipped = None  # (raça, peso) do último "Equipar", base do diálogo "Alternativas"
+
+        # Solves rodam fora do handler, um por vez. Cada pedido ganha uma
+        # geração nova; o anterior para no próximo callback de progresso.
+        self.solve_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="solve")
+        self.solve_generation = 0
+        self.weight_timer = None
+        self.auto_solve = False  # depois do primeiro "Equipar", mudar o peso recalcula sozinho
+        self.page.on_disconnect = lambda e: self.cancel_solve(update_ui=False)
         
         # Inicializar Componentes de UI 
         self.weight_input = ft.TextField(
             label="Peso Máximo", 
             value="15", 
             text_align=ft.TextAlign.RIGHT, 
-            width=150
+            width=150,
+            on_change=self.on_weight_change,
         )
 
+        self.progress_bar = ft.ProgressBar(value=0, visible=False, color=ft.Colors.BLUE_800)
+
         self.race_dropdown = ft.Dropdown(
             width=220,
             label="Escolha sua Raça",
@@ -52,10 +105,16 @@ class RPGKnapsackApp:
             border_radius=ft.border_radius.all(15), 
         )
 
+        # Limita a mochila a um item por slot (mão principal, escudo, arco)
+        self.slots_checkbox = ft.Checkbox(label="Respeitar slots", value=False, on_change=lambda e: self.cancel_solve())
+
         # Atualiza `race_dropdown` para chamar handler quando mudar
         self.race_dropdown.on_change = self.on_race_change
 
         self.results_column = ft.Column(spacing=10, scroll=ft.ScrollMode.AUTO)
+        # cards reaproveitados entre solves: o page.update() só envia o que mudou
+        self.card_cache = CardCache(self.create_result_card)
+        self.backpack_totals = BackpackTotals()
 
         self.btn_dungeon = ft.ElevatedButton(
             "Explorar Dungeon", 
@@ -68,6 +127,71 @@ class RPGKnapsackApp:
             disabled=True 
         )
 
+        # Outras mochilas boas para a mesma raça e peso (top-k e fronteira de Pareto)
+        self.btn_alternatives = ft.TextButton(
+            "Alternativas",
+            icon=ft.Icons.COMPARE_ARROWS,
+            on_click=self.open_alternatives,
+            disabled=True,
+        )
+
+        # Diagnóstico: tempos de cada etapa, contadores da DP e cProfile
+        self.btn_diagnostics = ft.TextButton(
+            "Diagnóstico",
+            icon=ft.Icons.SPEED,
+            on_click=self.open_diagnostics,
+        )
+
+        # Tabela de itens: busca por prefixo, filtro de tipo, ordenação e páginas
+        self.table_ids = self.item_index.query()
+        self.table_page = 0
+        self.sort_descending = False
+
+        self.search_input = ft.TextField(
+            label="Buscar por nome",
+            prefix_icon=ft.Icons.SEARCH,
+            width=200,
+            dense=True,
+            on_change=self.on_table_query_change,
+        )
+
+        # os tipos só são listados quando o filtro é aberto
+        self.type_filter = ft.Dropdown(
+            label="Tipo",
+            width=150,
+            dense=True,
+            value="all",
+            options=[ft.dropdown.Option("all", "Todos")],
+            on_change=self.on_table_query_change,
+            on_focus=self.on_type_filter_focus,
+        )
+
+        self.sort_dropdown = ft.Dropdown(
+            label="Ordenar por",
+            width=170,
+            dense=True,
+            value="catalog",
+            options=[
+                ft.dropdown.Option("catalog", "Ordem do catálogo"),
+                ft.dropdown.Option("name", "Nome"),
+                ft.dropdown.Option("weight", "Peso"),
+                ft.dropdown.Option("value", "Septims"),
+                ft.dropdown.Option("attack", "Ataque"),
+                ft.dropdown.Option("defense", "Defesa"),
+            ],
+            on_change=self.on_table_query_change,
+        )
+
+        self.btn_sort_direction = ft.IconButton(
+            icon=ft.Icons.ARROW_UPWARD,
+            tooltip="Inverter ordem",
+            on_click=self.on_sort_direction_click,
+        )
+
+        self.btn_prev_page = ft.IconButton(icon=ft.Icons.CHEVRON_LEFT, on_click=lambda e: self.change_table_page(-1))
+        self.btn_next_page = ft.IconButton(icon=ft.Icons.CHEVRON_RIGHT, on_click=lambda e: self.change_table_page(1))
+        self.page_label = ft.Text(size=12, color=ft.Colors.GREY_700)
+
         # Construindo a Interface
         self.build_ui()
 
@@ -93,13 +217,13 @@ class RPGKnapsackApp:
         self.page.window.height = 700
 
     def load_data(self):
-        """Lê o arquivo JSON de itens."""
+        """Abre o catálogo de itens (compilado de data/items.json na primeira vez)."""
         try:
-            with open("data/items.json", "r", encoding="utf-8") as f:
-                return json.load(f)
+            with instrumentation.span("startup.catalogo"):
+                return load_catalog(DEFAULT_CATALOG_PATH)
         except Exception as e:
-            self.page.add(ft.Text(f"Erro ao ler data/items.json: {e}", color=ft.Colors.RED))
-            return []
+            self.page.add(ft.Text(f"Erro ao ler {DEFAULT_CATALOG_PATH}: {e}", color=ft.Colors.RED))
+            return ItemCatalog()
 
     def build_ui(self):
         """Monta o layout principal da aplicação."""
@@ -109,6 +233,13 @@ class RPGKnapsackApp:
         # Painel Esquerdo
         left_panel = ft.Column([
             ft.Text("⚔️ Arsenal de Tamriel", size=24, weight=ft.FontWeight.BOLD, font_family="serif"),
+
+            ft.Row([
+                self.search_input,
+                self.type_filter,
+                self.sort_dropdown,
+                self.btn_sort_direction,
+            ]),
             
             ft.Container(
                 content=ft.Column([items_table], scroll=ft.ScrollMode.AUTO, expand=True),
@@ -116,12 +247,19 @@ class RPGKnapsackApp:
                 border_radius=10,
                 height=300
             ),
+
+            ft.Row([
+                self.btn_prev_page,
+                self.page_label,
+                self.btn_next_page,
+            ], alignment=ft.MainAxisAlignment.CENTER),
             
             ft.Divider(),
             
             ft.Row([
                 self.weight_input,
                 self.race_dropdown, 
+                self.slots_checkbox,
                 ft.ElevatedButton(
                     "Equipar", 
                     icon=ft.Icons.BACKPACK, 
@@ -130,11 +268,15 @@ class RPGKnapsackApp:
                     color=ft.Colors.WHITE
                 )
             ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+
+            self.progress_bar,
             
             ft.Divider(),
 
             ft.Row([
-                self.btn_dungeon
+                self.btn_dungeon,
+                self.btn_alternatives,
+                self.btn_diagnostics,
             ], alignment=ft.MainAxisAlignment.CENTER)
 
         ], scroll=ft.ScrollMode.AUTO, expand=True)
@@ -155,25 +297,7 @@ class RPGKnapsackApp:
         self.page.add(layout)
 
     def create_items_table(self):
-        table_rows = []
-        for item in self.items_data:
-            stats = item.get("stats", {})
-            atk = stats.get("attack", 0)
-            defe = stats.get("defense", 0)
-            
-            table_rows.append(
-                ft.DataRow(
-                    cells=[
-                        ft.DataCell(ft.Image(src=f"/images/{item['image']}", width=30, height=30)),
-                        ft.DataCell(ft.Text(item['name'])),
-                        ft.DataCell(ft.Text(str(item['weight']))),
-                        ft.DataCell(ft.Text(str(item['value']))),
-                        ft.DataCell(ft.Text(f"⚔️{atk}    🛡️{defe}", size=12)),
-                    ]
-                )
-            )
-
-        return ft.DataTable(
+        self.items_table = ft.DataTable(
             columns=[
                 ft.DataColumn(ft.Text("Img")),
                 ft.DataColumn(ft.Text("Item")),
@@ -181,10 +305,66 @@ class RPGKnapsackApp:
                 ft.DataColumn(ft.Text("🥮 Septims"), numeric=True), 
                 ft.DataColumn(ft.Text("Stats")), 
             ],
-            rows=table_rows,
+            rows=self.table_page_rows(),
             border=ft.border.all(1, ft.Colors.GREY_300),
             heading_row_color=ft.Colors.BLUE_50,
         )
+        return self.items_table
+
+    def table_page_rows(self):
+        """DataRows só da página atual de `self.table_ids` (e atualiza o paginador)."""
+        total = len(self.table_ids)
+        pages = max(1, -(-total // ITEMS_PAGE_SIZE))
+        self.table_page = min(self.table_page, pages - 1)
+        start = self.table_page * ITEMS_PAGE_SIZE
+
+        self.page_label.value = f"Página {self.table_page + 1} de {pages} ({total} itens)"
+        self.btn_prev_page.disabled = self.table_page == 0
+        self.btn_next_page.disabled = self.table_page >= pages - 1
+        return [self.create_item_row(item_id) for item_id in self.table_ids[start:start + ITEMS_PAGE_SIZE]]
+
+    def create_item_row(self, item_id):
+        catalog = self.catalog
+        return ft.DataRow(
+            cells=[
+                ft.DataCell(ft.Image(src=f"/images/{catalog.images[item_id]}", width=30, height=30)),
+                ft.DataCell(ft.Text(catalog.names[item_id])),
+                ft.DataCell(ft.Text(str(catalog.weights[item_id]))),
+                ft.DataCell(ft.Text(str(catalog.values[item_id]))),
+                ft.DataCell(ft.Text(f"⚔️{catalog.attack[item_id]}    🛡️{catalog.defense[item_id]}", size=12)),
+            ]
+        )
+
+    def refresh_items_table(self):
+        with instrumentation.span("tabela.pagina"):
+            self.items_table.rows = self.table_page_rows()
+            self.page.update()
+
+    def on_table_query_change(self, e):
+        """Refaz a lista de ids da tabela pelos índices (sem percorrer o catálogo) e volta à página 1."""
+        with instrumentation.span("tabela.busca"):
+            self.table_ids = self.item_index.query(
+                prefix=self.search_input.value or "",
+                item_type=None if self.type_filter.value == "all" else self.type_filter.value,
+                sort=None if self.sort_dropdown.value == "catalog" else self.sort_dropdown.value,
+                descending=self.sort_descending,
+            )
+        self.table_page = 0
+        self.refresh_items_table()
+
+    def on_sort_direction_click(self, e):
+        self.sort_descending = not self.sort_descending
+        self.btn_sort_direction.icon = ft.Icons.ARROW_DOWNWARD if self.sort_descending else ft.Icons.ARROW_UPWARD
+        self.on_table_query_change(e)
+
+    def on_type_filter_focus(self, e):
+        if len(self.type_filter.options) == 1:
+            self.type_filter.options += [ft.dropdown.Option(t) for t in self.item_index.types()]
+            self.type_filter.update()
+
+    def change_table_page(self, step):
+        self.table_page = max(0, self.table_page + step)
+        self.refresh_items_table()
 
     def create_result_card(self, item, is_discarded=False):
         bg_color = ft.Colors.RED_50 if is_discarded else ft.Colors.WHITE
@@ -199,6 +379,11 @@ class RPGKnapsackApp:
         if "attack" in stats:
             info_text += f" | ⚔️ {stats.get('attack',0)} | 🛡️ {stats.get('defense',0)}"
 
+        # Pilhas (ex.: várias poções) mostram a quantidade no nome
+        name = item['name']
+        if item.get("quantity", 1) > 1:
+            name += f" x{item['quantity']}"
+
         return ft.Card(
             color=bg_color,
             elevation=2 if not is_discarded else 0,
@@ -212,7 +397,7 @@ class RPGKnapsackApp:
                         opacity=0.5 if is_discarded else 1.0
                     ),
                     ft.Column([
-                        ft.Text(item['name'], size=14, weight=ft.FontWeight.BOLD, color=text_color),
+                        ft.Text(name, size=14, weight=ft.FontWeight.BOLD, color=text_color),
                         ft.Text(info_text, size=11, color=ft.Colors.GREY_700)
                     ], alignment=ft.MainAxisAlignment.CENTER, expand=True),
                     
@@ -227,9 +412,11 @@ class RPGKnapsackApp:
         selected = e.control.value if hasattr(e.control, "value") else None
         if not selected:
             return
-        
+
+        self.cancel_solve()
         self.btn_dungeon.disabled = True
         self.btn_dungeon.color = ft.Colors.GREY_600
+        self.btn_alternatives.disabled = True
         
         img = self.race_images.get(selected, "nord.webp")
         
@@ -240,6 +427,65 @@ class RPGKnapsackApp:
             self.race_avatar.update()
             
         self.btn_dungeon.update()
+        self.btn_alternatives.update()
+
+    def on_weight_change(self, e):
+        """Cancela o solve em andamento e recalcula quando o usuário para de digitar."""
+        self.cancel_solve()
+        if self.weight_timer is not None:
+            self.weight_timer.cancel()
+        if self.auto_solve:
+            self.weight_timer = threading.Timer(WEIGHT_DEBOUNCE_S, self.on_calculate_click, args=(None,))
+            self.weight_timer.daemon = True
+            self.weight_timer.start()
+
+    def submit_solve(self, job, *args):
+        """
+        Roda `job(generation, progress, *args)` no executor de solves. O
+        `progress` repassado para a DP atualiza a barra e levanta
+        `SolveCancelled` assim que um pedido mais novo chega.
+        """
+        self.solve_generation += 1
+        generation = self.solve_generation
+        self.progress_bar.value = 0
+        self.progress_bar.visible = True
+        self.progress_bar.update()
+        self.solve_executor.submit(self._run_solve, generation, job, args)
+
+    def cancel_solve(self, update_ui=True):
+        """Invalida o solve em andamento (a DP para no próximo callback de progresso)."""
+        self.solve_generation += 1
+        if update_ui and self.progress_bar.visible:
+            self.progress_bar.visible = False
+            self.progress_bar.update()
+
+    def is_current(self, generation):
+        return generation == self.solve_generation
+
+    def _run_solve(self, generation, job, args):
+        last_update = [0.0]
+
+        def progress(done, total):
+            if not self.is_current(generation):
+                raise SolveCancelled
+            now = time.monotonic()
+            if total and now - last_update[0] >= PROGRESS_UPDATE_INTERVAL:
+                last_update[0] = now
+                self.progress_bar.value = done / total
+                self.progress_bar.update()
+
+        try:
+            # o cProfile do diagnóstico só mede a thread em que é ligado: liga aqui, na do solve
+            with instrumentation.profiled():
+                job(generation, progress, *args)
+        except SolveCancelled:
+            instrumentation.count("solves_cancelled")
+        except Exception:
+            traceback.print_exc()
+        finally:
+            if self.is_current(generation):
+                self.progress_bar.visible = False
+                self.progress_bar.update()
 
     def on_calculate_click(self, e):
         try:
@@ -255,33 +501,128 @@ class RPGKnapsackApp:
         self.weight_input.update()
 
         race = self.race_dropdown.value if self.race_dropdown.value else "empty"
-        processed_items = prepare_items_for_knapsack(self.items_data, race)
+        self.auto_solve = True
+        self.submit_solve(self._calculate, race, max_w, bool(self.slots_checkbox.value))
+
+    def _calculate(self, generation, progress, race, max_w, use_slots):
+        with instrumentation.span("equipar.total"):
+            self._equip(generation, progress, race, max_w, use_slots)
+
+    def _equip(self, generation, progress, race, max_w, use_slots):
+        with instrumentation.span("equipar.scores"):
+            scores = self.score_matrix.column(race)
+
+        if use_slots:
+            with instrumentation.span("equipar.dp"):
+                best_score, chosen_ids = knapsack_slots_ids(self.catalog.weights, scores, self.slot_column(), max_w,
+                                                            progress=progress)
+            slot_limits = SLOT_LIMITS
+        else:
+            cached = (race, self.catalog.version, max_w) in self.solve_cache
+            if not cached and len(self.catalog) * (max_w + 1) >= PREVIEW_MIN_CELLS:
+                self._show_preview(generation, progress, race, max_w, scores)
+            with instrumentation.span("equipar.dp"):
+                sweep = self.solve_sweep(race, max_w, progress)
+            # a reconstrução do sweep é preguiçosa: só acontece aqui
+            with instrumentation.span("equipar.reconstrucao"):
+                best_score, chosen_ids = sweep.best_score(max_w), sweep.chosen(max_w)
+            slot_limits = None
+
+        with instrumentation.span("equipar.preparar_itens"):
+            chosen = prepare_chosen_items(self.catalog, chosen_ids, scores)
+
+        # outro pedido chegou enquanto reconstruíamos: este resultado já é velho
+        if not self.is_current(generation):
+            return
 
-        best_score, chosen, _ = knapsack(processed_items, max_w)
-        
-        self.current_backpack = chosen 
+        self.dungeon_manager.slot_limits = slot_limits
+        self.current_backpack = chosen
+        self.dungeon_manager.reset_run()
         self.btn_dungeon.disabled = False
         self.btn_dungeon.color = ft.Colors.WHITE
-
-        self.results_column.controls.clear()
+        self.equipped = (race, max_w)
+        self.btn_alternatives.disabled = use_slots  # top-k e Pareto não conhecem os slots
         
-        self.update_results_panel(best_score, chosen, race_key=race, title=f"Inventário ({race.capitalize()})")
+        with instrumentation.span("equipar.cards"):
+            self.update_results_panel(best_score, chosen, race_key=race, title=f"Inventário ({race.capitalize()})")
+        with instrumentation.span("equipar.page_update"):
+            self.page.update()
+
+    def _show_preview(self, generation, progress, race, max_w, scores):
+        """
+        Resposta rápida (approx.knapsack_approx) mostrada enquanto a DP exata
+        roda; o título traz o limite do ótimo. A DP exata depois substitui.
+        """
+        with instrumentation.span("equipar.previa"):
+            fast = knapsack_approx(self.catalog.weights, scores, max_w, PREVIEW_EPSILON, progress=progress)
+            chosen = prepare_chosen_items(self.catalog, fast.chosen, scores)
+
+        if not self.is_current(generation):
+            return
+        self.update_results_panel(fast.score, chosen, race_key=race,
+                                  title=f"Prévia ({race.capitalize()}) · ótimo ≤ {fast.upper_bound}")
         self.page.update()
 
+    def slot_column(self):
+        """Slot de cada item do catálogo, calculado na primeira vez que é pedido."""
+        if self.item_slots is None:
+            self.item_slots = [item_slot(item) for item in self.catalog]
+        return self.item_slots
+
+    def solve_sweep(self, race, max_w, progress=None):
+        """
+        DP da raça resolvida até `max_w` (ou mais), vinda do cache quando
+        possível. `self.solve_cache.info()` mostra os acertos e erros.
+        """
+        sweep = self.solve_cache.get(race, self.catalog.version, max_w)
+        if sweep is None:
+            sweep, _ = knapsack_sweep_reduced(self.catalog.weights, self.score_matrix.column(race), max_w,
+                                              progress=progress)
+            self.solve_cache.put(race, self.catalog.version, max_w, sweep)
+        return sweep
+
     # --- CORREÇÃO 3: Usar o self.race_avatar em vez de criar novo ---
     def update_results_panel(self, score, items, race_key="nord", title="Resultado"):
-        self.results_column.controls.clear()
-        
+        """
+        Atualiza o painel no lugar: os textos do topo mudam de valor, os totais
+        são ajustados pela diferença e a lista de cards é trocada por cards do
+        cache, então o flet só envia os cards que entraram, saíram ou mudaram.
+        """
+        if not self.results_column.controls:
+            self.results_column.controls.extend(self.create_results_header())
+
         race_img = self.race_images.get(race_key, "nord.webp")
         
         # Garante que a imagem está certa (caso o calculate seja chamado diretamente)
         self.race_avatar.src = f"/images/{race_img}"
 
-        # Totais
-        total_gold = sum(i.get('real_value', i['value']) for i in items)
-        total_atk = sum(i.get('stats', {}).get('attack', 0) for i in items)
-        total_def = sum(i.get('stats', {}).get('defense', 0) for i in items)
-        total_weight = sum(i['weight'] for i in items)
+        cards = self.card_cache.cards("panel", items)
+        # Totais: só os itens que entraram ou saíram do painel desde a última vez
+        totals = self.backpack_totals.apply(*self.card_cache.changes("panel"))
+
+        self.result_title.value = title
+        self.result_score.value = f"✨ Score de Afinidade: {score}"
+        self.total_gold.value = f"💰 {totals['gold']}"
+        self.total_attack.value = f"⚔️ {totals['attack']}"
+        self.total_defense.value = f"🛡️ {totals['defense']}"
+        self.total_weight.value = f"🎒 {totals['weight']}kg"
+        self.items_header.value = f"Itens ({len(items)}):"
+
+        controls = self.results_column.controls
+        if len(controls) - RESULT_HEADER_SIZE != len(cards) or any(
+            a is not b for a, b in zip(controls[RESULT_HEADER_SIZE:], cards)
+        ):
+            controls[RESULT_HEADER_SIZE:] = cards
+
+    def create_results_header(self):
+        """Controles fixos do painel de resultado, criados uma vez e atualizados no lugar."""
+        self.result_title = ft.Text(size=20, weight=ft.FontWeight.BOLD)
+        self.result_score = ft.Text(size=16, color=ft.Colors.BLUE_700)
+        self.total_gold = ft.Text(size=16, color=ft.Colors.AMBER_800, weight=ft.FontWeight.BOLD)
+        self.total_attack = ft.Text(size=16, color=ft.Colors.RED_700, weight=ft.FontWeight.BOLD)
+        self.total_defense = ft.Text(size=16, color=ft.Colors.BLUE_GREY_700, weight=ft.FontWeight.BOLD)
+        self.total_weight = ft.Text(size=16, weight=ft.FontWeight.BOLD)
+        self.items_header = ft.Text(weight=ft.FontWeight.BOLD)
 
         # Container da Imagem (Reutilizando self.race_avatar)
         avatar_section = ft.Container(
@@ -294,17 +635,17 @@ class RPGKnapsackApp:
         info_panel = ft.Container(
             content=ft.Column([
                 ft.Column([
-                    ft.Text(title, size=20, weight=ft.FontWeight.BOLD),
-                    ft.Text(f"✨ Score de Afinidade: {score}", size=16, color=ft.Colors.BLUE_700),
+                    self.result_title,
+                    self.result_score,
                 ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
                 
                 ft.Divider(color=ft.Colors.BLUE_200),
 
                 ft.Row([
-                    ft.Text(f"💰 {total_gold}", size=16, color=ft.Colors.AMBER_800, weight=ft.FontWeight.BOLD),
-                    ft.Text(f"⚔️ {total_atk}", size=16, color=ft.Colors.RED_700, weight=ft.FontWeight.BOLD),
-                    ft.Text(f"🛡️ {total_def}", size=16, color=ft.Colors.BLUE_GREY_700, weight=ft.FontWeight.BOLD),
-                    ft.Text(f"🎒 {total_weight}kg", size=16, weight=ft.FontWeight.BOLD),
+                    self.total_gold,
+                    self.total_attack,
+                    self.total_defense,
+                    self.total_weight,
                 ], alignment=ft.MainAxisAlignment.SPACE_EVENLY), 
                 
             ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
@@ -315,35 +656,45 @@ class RPGKnapsackApp:
             border=ft.border.all(1, ft.Colors.BLUE_100)
         )
 
-        self.results_column.controls.append(avatar_section)
-        self.results_column.controls.append(info_panel)
-        
-        self.results_column.controls.append(ft.Container(height=10))
-        self.results_column.controls.append(ft.Text(f"Itens ({len(items)}):", weight=ft.FontWeight.BOLD))
-        
-        for item in items:
-            self.results_column.controls.append(self.create_result_card(item))
+        return [avatar_section, info_panel, ft.Container(height=10), self.items_header]
 
     def open_dungeon_modal(self, e):
-        loot = self.dungeon_manager.generate_loot(quantity=3)
-        
         raw_value = self.weight_input.value or "0"
         max_w = int(raw_value)
         race = self.race_dropdown.value if self.race_dropdown.value else "empty"
-        processed_loot = prepare_items_for_knapsack(loot, race)
+        self.submit_solve(self._explore_dungeon, race, max_w)
+
+    def _explore_dungeon(self, generation, progress, race, max_w):
+        with instrumentation.span("dungeon.total"):
+            self._dungeon_step(generation, progress, race, max_w)
+
+    def _dungeon_step(self, generation, progress, race, max_w):
+        with instrumentation.span("dungeon.loot"):
+            loot = self.dungeon_manager.generate_loot(quantity=3, stack=True)
+
+        with instrumentation.span("dungeon.preparar_itens"):
+            processed_loot = prepare_items_for_knapsack(loot, race)
         
-        kept, discarded, new_score = self.dungeon_manager.discard_overweight(
-            self.current_backpack, processed_loot, max_w
-        )
+        with instrumentation.span("dungeon.dp"):
+            kept, discarded, new_score = self.dungeon_manager.discard_overweight(
+                self.current_backpack, processed_loot, max_w, progress=progress
+            )
+
+        if not self.is_current(generation):
+            return
         
+        with instrumentation.span("dungeon.cards"):
+            self._show_dungeon_result(loot, kept, discarded, new_score, race)
+
+    def _show_dungeon_result(self, loot, kept, discarded, new_score, race):
         loot_display = ft.Column([ft.Text("🎁 Você encontrou:", weight=ft.FontWeight.BOLD)] + 
-                                 [self.create_result_card(i) for i in loot])
+                                 self.card_cache.cards("loot", loot))
         
         kept_display = ft.Column([ft.Text("✅ Mantidos:", color=ft.Colors.GREEN)] + 
-                                 [self.create_result_card(i) for i in kept], scroll=ft.ScrollMode.AUTO, height=400)
+                                 self.card_cache.cards("kept", kept), scroll=ft.ScrollMode.AUTO, height=400)
         
         discarded_display = ft.Column([ft.Text("🗑️ Descartados:", color=ft.Colors.RED)] + 
-                                      [self.create_result_card(i, is_discarded=True) for i in discarded], scroll=ft.ScrollMode.AUTO, height=300)
+                                      self.card_cache.cards("discarded", discarded, is_discarded=True), scroll=ft.ScrollMode.AUTO, height=300)
 
         self.current_backpack = kept
         self.update_results_panel(new_score, kept, title=f"Pós-Dungeon ({race.capitalize()})")
@@ -367,9 +718,176 @@ class RPGKnapsackApp:
         
         self.page.open(dlg)
 
+    def objective_columns(self, scores):
+        """Objetivos da fronteira de Pareto, indexados pelo id do item."""
+        return {
+            "score": scores,
+            "gold": self.catalog.values,
+            "attack": self.catalog.attack,
+            "defense": self.catalog.defense,
+        }
+
+    def open_alternatives(self, e):
+        if self.equipped is not None:
+            self.submit_solve(self._alternatives, *self.equipped)
+
+    def _alternatives(self, generation, progress, race, max_w):
+        scores = self.score_matrix.column(race)
+        columns = self.objective_columns(scores)
+        with instrumentation.span("alternativas.top_k"):
+            top = knapsack_top_k(self.catalog.weights, scores, max_w, ALTERNATIVES_K, progress=progress)
+        with instrumentation.span("alternativas.pareto"):
+            front, truncated = knapsack_pareto(self.catalog.weights, columns, max_w, ALTERNATIVES_FRONTIER,
+                                               progress=progress)
+
+        if not self.is_current(generation):
+            return
+        top = [alternative._replace(totals=loadout_totals(alternative.chosen, columns)) for alternative in top]
+        self._show_alternatives(top, front, truncated, race, scores)
+
+    def _show_alternatives(self, top, front, truncated, race, scores):
+        dlg = ft.AlertDialog(title=ft.Text(f"Alternativas ({race.capitalize()})"))
+
+        def use(alternative):
+            def on_click(ev):
+                chosen = prepare_chosen_items(self.catalog, alternative.chosen, scores)
+                self.current_backpack = chosen
+                self.dungeon_manager.reset_run()
+                self.update_results_panel(alternative.totals["score"], chosen, race_key=race,
+                                          title=f"Inventário ({race.capitalize()})")
+                self.close_modal(dlg)
+                self.page.update()
+            return on_click
+
+        def table(alternatives):
+            return ft.DataTable(
+                columns=[
+                    ft.DataColumn(ft.Text("Score"), numeric=True),
+                    ft.DataColumn(ft.Text("💰"), numeric=True),
+                    ft.DataColumn(ft.Text("⚔️"), numeric=True),
+                    ft.DataColumn(ft.Text("🛡️"), numeric=True),
+                    ft.DataColumn(ft.Text("🎒"), numeric=True),
+                    ft.DataColumn(ft.Text("Itens")),
+                    ft.DataColumn(ft.Text("")),
+                ],
+                rows=[
+                    ft.DataRow(cells=[
+                        ft.DataCell(ft.Text(str(alternative.totals["score"]))),
+                        ft.DataCell(ft.Text(str(alternative.totals["gold"]))),
+                        ft.DataCell(ft.Text(str(alternative.totals["attack"]))),
+                        ft.DataCell(ft.Text(str(alternative.totals["defense"]))),
+                        ft.DataCell(ft.Text(str(alternative.weight))),
+                        ft.DataCell(ft.Text(", ".join(self.catalog.names[i] for i in alternative.chosen), size=12)),
+                        ft.DataCell(ft.TextButton("Usar", on_click=use(alternative))),
+                    ])
+                    for alternative in alternatives
+                ],
+                heading_row_color=ft.Colors.BLUE_50,
+            )
+
+        note = "Amostra da fronteira (limite de tamanho atingido)." if truncated else ""
+        dlg.content = ft.Container(
+            width=900,
+            content=ft.Column([
+                ft.Text(f"As {len(top)} melhores mochilas por score", weight=ft.FontWeight.BOLD),
+                table(top),
+                ft.Text("Trocas entre score, ouro, ataque e defesa (nenhuma é pior em tudo)",
+                        weight=ft.FontWeight.BOLD),
+                table(front),
+                ft.Text(note, size=12, color=ft.Colors.GREY_700),
+            ], scroll=ft.ScrollMode.AUTO, height=500),
+        )
+        dlg.actions = [ft.TextButton("Fechar", on_click=lambda ev: self.close_modal(dlg))]
+        self.page.open(dlg)
+
     def close_modal(self, dlg):
         self.page.close(dlg)
 
+    def open_diagnostics(self, e):
+        """Percentis de cada etapa, contadores da DP, cache e captura com cProfile."""
+        snapshot = instrumentation.snapshot()
+
+        rows = [
+            ft.DataRow(cells=[
+                ft.DataCell(ft.Text(name)),
+                ft.DataCell(ft.Text(str(stats["count"]))),
+                ft.DataCell(ft.Text(f"{stats['p50_ms']:.2f}")),
+                ft.DataCell(ft.Text(f"{stats['p90_ms']:.2f}")),
+                ft.DataCell(ft.Text(f"{stats['p99_ms']:.2f}")),
+                ft.DataCell(ft.Text(f"{stats['max_ms']:.2f}")),
+            ])
+            for name, stats in snapshot["spans"].items()
+        ]
+        spans_table = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Etapa")),
+                ft.DataColumn(ft.Text("n"), numeric=True),
+                ft.DataColumn(ft.Text("p50 ms"), numeric=True),
+                ft.DataColumn(ft.Text("p90 ms"), numeric=True),
+                ft.DataColumn(ft.Text("p99 ms"), numeric=True),
+                ft.DataColumn(ft.Text("máx ms"), numeric=True),
+            ],
+            rows=rows,
+            heading_row_color=ft.Colors.BLUE_50,
+        )
+
+        counters = ", ".join(f"{name}: {value:,}" for name, value in sorted(snapshot["counters"].items()))
+        engine = snapshot["notes"].get("engine", "-")
+        cache = self.solve_cache.info()
+        cards = self.card_cache.info()
+        profile_text = ft.Text("", size=11, font_family="monospace", selectable=True)
+        status = ft.Text("", size=12, color=ft.Colors.GREY_700)
+
+        def toggle_enabled(ev):
+            if ev.control.value:
+                instrumentation.enable()
+            else:
+                instrumentation.disable()
+
+        def toggle_profile(ev):
+            if ev.control.value:
+                instrumentation.start_profile()
+            else:
+                profile_text.value = instrumentation.stop_profile()
+            self.page.update()
+
+        def save_json(ev):
+            instrumentation.dump(DIAGNOSTICS_PATH)
+            status.value = f"Salvo em {DIAGNOSTICS_PATH}"
+            self.page.update()
+
+        def reset(ev):
+            instrumentation.reset()
+            status.value = "Medições zeradas (reabra para ver a tabela vazia)"
+            self.page.update()
+
+        dlg = ft.AlertDialog(
+            title=ft.Text("Diagnóstico"),
+            content=ft.Container(
+                width=700,
+                content=ft.Column([
+                    ft.Row([
+                        ft.Switch(label="Medir etapas", value=instrumentation.enabled, on_change=toggle_enabled),
+                        ft.Switch(label="cProfile", value=instrumentation.profiling, on_change=toggle_profile),
+                    ]),
+                    spans_table if rows else ft.Text("Nenhuma medição ainda. Ligue \"Medir etapas\" e use o app."),
+                    ft.Text(f"Contadores: {counters or '-'}", size=12),
+                    ft.Text(f"Último motor da DP: {engine}", size=12),
+                    ft.Text(f"Cache de DP: {cache}", size=12),
+                    ft.Text(f"Cache de cards: {cards}", size=12),
+                    status,
+                    profile_text,
+                ], scroll=ft.ScrollMode.AUTO, height=450),
+            ),
+            actions=[
+                ft.TextButton("Salvar JSON", on_click=save_json),
+                ft.TextButton("Zerar", on_click=reset),
+                ft.TextButton("Fechar", on_click=lambda ev: self.close_modal(dlg)),
+            ],
+        )
+
+        self.page.open(dlg)
+
 def main(page: ft.Page):
     RPGKnapsackApp(page)
 
@@ -0,0 +1,148 @@
+from typing import NamedTuple
+
+from knapsack import _solve_by_value, knapsack_ids
+
+# Precisão padrão do modo rápido: o score fica a no máximo 10% do ótimo
+DEFAULT_EPSILON = 0.1
+
+# Teto de células da DP por score escalado. Se a precisão pedida passar disso,
+# os scores são escalados mais grosso e o `epsilon` devolvido diz a garantia real.
+APPROX_MAX_CELLS = 1 << 22
+
+
+class ApproxResult(NamedTuple):
+    score: int          # score real da mochila escolhida
+    chosen: list        # ids dos itens escolhidos, em ordem
+    upper_bound: int    # limite da relaxação linear: o ótimo nunca passa disso
+    greedy_score: int   # score do guloso por score/peso
+    epsilon: float      # garantia obtida: score >= (1 - epsilon) * ótimo
+    method: str         # "greedy", "fptas" ou "exact"
+
+    @property
+    def gap(self) -> int:
+        """Quanto, no pior caso, falta para o ótimo."""
+        return self.upper_bound - self.score
+
+
+def knapsack_approx(weights, values, max_weight: int, epsilon: float = DEFAULT_EPSILON, ids=None,
+                    progress=None) -> ApproxResult:
+    """
+    Mochila 0/1 aproximada com garantia, no formato de `knapsack_ids`.
+
+    Os scores são divididos por K = epsilon * LB / n (LB = score do guloso,
+    que vale pelo menos metade do ótimo) e arredondados para baixo; a DP por
+    score sobre os valores escalados perde menos de K por item, então o
+    resultado fica acima de (1 - epsilon) * ótimo, em tempo ~ n² / epsilon.
+    A resposta é a melhor entre a da DP e a do guloso, e vem com o limite da
+    relaxação linear para quem quiser mostrar a distância até o ótimo.
+
+    Se a DP exata por peso custar menos que a escalada, ela roda no lugar
+    (`method == "exact"`, `epsilon == 0`). `progress` funciona como em `knapsack()`.
+    """
+    if not 0 < epsilon < 1:
+        raise ValueError("epsilon precisa estar entre 0 e 1")
+    if ids is None:
+        ids = range(len(weights))
+    else:
+        weights = [weights[i] for i in ids]
+        values = [values[i] for i in ids]
+
+    usable = [i for i in range(len(weights)) if weights[i] <= max_weight and values[i] > 0]
+    greedy_score, greedy = _greedy(weights, values, usable, max_weight)
+    bound = _lp_bound(weights, values, usable, max_weight)
+    n = len(usable)
+
+    def result(score, chosen, eps, method):
+        return ApproxResult(score, [ids[k] for k in chosen], bound, greedy_score, eps, method)
+
+    if greedy_score >= bound:
+        return result(greedy_score, greedy, 0.0, "greedy")
+
+    integral = all(isinstance(values[i], int) for i in usable)
+    scale = epsilon * greedy_score / n
+    if integral and scale < 1:
+        scale = 1  # escalar não ajudaria: a DP por score já é exata
+    cells = n * (int(bound / scale) + 1)
+
+    if integral and n * (max_weight + 1) <= cells:
+        best, chosen = knapsack_ids(weights, values, max_weight, ids=usable, progress=progress)
+        return result(best, chosen, 0.0, "exact")
+
+    if cells > APPROX_MAX_CELLS:
+        scale *= cells / APPROX_MAX_CELLS
+    scaled = [0] * len(weights)
+    for i in usable:
+        scaled[i] = int(values[i] / scale)
+    # nenhum item sozinho passa do limite, então nenhum escalado passa de `top`
+    top = int(bound / scale)
+    _, chosen = _solve_by_value(weights, scaled, usable, top, max_weight, progress)
+
+    score = sum(values[i] for i in chosen)
+    method = "fptas"
+    if score < greedy_score:
+        score, chosen, method = greedy_score, greedy, "greedy"
+
+    # garantia a priori (perda < n * K, e o guloso sozinho já garante metade),
+    # apertada pela distância real até o limite; com K = 1 nada foi arredondado
+    if integral and scale == 1:
+        guarantee = 0.0
+    else:
+        guarantee = min(n * scale / greedy_score, 0.5, 1 - score / bound)
+    return result(score, chosen, guarantee, method)
+
+
+def greedy_ids(weights, values, max_weight: int, ids=None) -> tuple[int, list]:
+    """
+    Guloso por score/peso: pega os itens na ordem da razão enquanto couberem
+    e compara com o melhor item sozinho, o que garante ao menos metade do ótimo.
+    Retorna o score e os ids escolhidos, em ordem.
+    """
+    if ids is None:
+        ids = range(len(weights))
+    usable = [i for i in ids if weights[i] <= max_weight and values[i] > 0]
+    return _greedy(weights, values, usable, max_weight)
+
+
+def lp_bound(weights, values, max_weight: int, ids=None) -> int:
+    """Limite superior do ótimo pela relaxação linear (último item entra fracionado)."""
+    if ids is None:
+        ids = range(len(weights))
+    usable = [i for i in ids if weights[i] <= max_weight and values[i] > 0]
+    return _lp_bound(weights, values, usable, max_weight)
+
+
+def _ratio_order(weights, values, usable: list) -> list:
+    # peso zero primeiro (razão infinita), depois maior score por peso
+    return sorted(usable, key=lambda i: (weights[i] != 0, -values[i] / (weights[i] or 1)))
+
+
+def _greedy(weights, values, usable: list, max_weight: int) -> tuple[int, list]:
+    capacity = max_weight
+    score = 0
+    chosen = []
+    for i in _ratio_order(weights, values, usable):
+        if weights[i] <= capacity:
+            capacity -= weights[i]
+            score += values[i]
+            chosen.append(i)
+
+    if usable:
+        single = max(usable, key=values.__getitem__)
+        if values[single] > score:
+            return values[single], [single]
+    return score, sorted(chosen)
+
+
+def _lp_bound(weights, values, usable: list, max_weight: int):
+    capacity = max_weight
+    bound = 0
+    for i in _ratio_order(weights, values, usable):
+        if weights[i] <= capacity:
+            capacity -= weights[i]
+            bound += values[i]
+        else:
+            # scores inteiros: arredonda para baixo, o ótimo (inteiro) continua <= limite
+            value = values[i]
+            bound += capacity * value // weights[i] if isinstance(value, int) else capacity * value / weights[i]
+            break
+    return bound
@@ -0,0 +1,160 @@
+"""
+Resolve o knapsack para muitas combinações (raça, capacidade) de uma vez.
+
+Jobs da mesma raça compartilham uma DP (resolvida até a maior capacidade
+pedida). Se houver menos raças que processos, as capacidades de cada raça
+são divididas em faixas contíguas, cada uma com a sua DP, para ocupar todos
+os processos do pool. Cada processo carrega o catálogo uma só vez, no
+inicializador.
+
+Exemplo (a partir de `rpg_knapsack`):
+
+    python batch.py --capacities 5-50:5 --format csv --output loadouts.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from catalog import DEFAULT_CATALOG_PATH, load_catalog
+from game_utils import RACE_RULES, ScoreMatrix
+from reduction import knapsack_sweep_reduced
+
+CSV_FIELDS = ["race", "capacity", "score", "weight", "gold", "attack", "defense", "items"]
+
+# Estado de cada processo do pool (preenchido por `_init_worker`)
+_worker = {}
+
+
+def _init_worker(catalog_path: str):
+    catalog = load_catalog(catalog_path)
+    _worker["catalog"] = catalog
+    _worker["scores"] = ScoreMatrix(catalog)
+
+
+def _solve_group(race_key: str, capacities: list) -> list:
+    """Uma DP para a raça, respondendo todas as capacidades do grupo."""
+    catalog = _worker["catalog"]
+    scores = _worker["scores"].column(race_key)
+    sweep, _ = knapsack_sweep_reduced(catalog.weights, scores, max(capacities))
+
+    results = []
+    for capacity in capacities:
+        ids = sweep.chosen(capacity)
+        results.append({
+            "race": race_key,
+            "capacity": capacity,
+            "score": sweep.best_score(capacity),
+            "weight": sum(catalog.weights[i] for i in ids),
+            "gold": sum(catalog.values[i] for i in ids),
+            "attack": sum(catalog.attack[i] for i in ids),
+            "defense": sum(catalog.defense[i] for i in ids),
+            "items": [catalog.names[i] for i in ids],
+            "ids": list(ids),
+        })
+    return results
+
+
+def split_capacities(capacities: list, parts: int) -> list:
+    """
+    Divide as capacidades (em ordem crescente) em até `parts` faixas
+    contíguas de tamanhos parecidos. Faixas contíguas mantêm baixa a
+    capacidade máxima das faixas de baixo, então só a última paga a DP inteira.
+    """
+    parts = max(1, min(parts, len(capacities)))
+    size, extra = divmod(len(capacities), parts)
+    chunks = []
+    start = 0
+    for part in range(parts):
+        end = start + size + (part < extra)
+        chunks.append(capacities[start:end])
+        start = end
+    return chunks
+
+
+def solve_batch(jobs: list, catalog_path: str = DEFAULT_CATALOG_PATH, workers: int = None) -> list:
+    """
+    Recebe uma lista de (raça, capacidade) e retorna um dict de resultado por
+    job, na mesma ordem dos jobs. Com `workers=1` roda tudo no processo atual.
+    """
+    groups = {}
+    for race_key, capacity in jobs:
+        groups.setdefault(race_key, set()).add(capacity)
+    groups = {race_key: sorted(caps) for race_key, caps in groups.items()}
+
+    solved = {}
+    workers = workers or os.cpu_count() or 1
+    tasks = list(groups.items())
+    if 1 < workers and 0 < len(groups) < workers:
+        # raças a menos que processos: cada raça vira várias faixas de capacidade
+        parts = -(-workers // len(groups))
+        tasks = [(race_key, chunk) for race_key, caps in groups.items() for chunk in split_capacities(caps, parts)]
+
+    if workers == 1 or len(tasks) <= 1:
+        _init_worker(catalog_path)
+        for race_key, capacities in tasks:
+            for result in _solve_group(race_key, capacities):
+                solved[(race_key, result["capacity"])] = result
+    else:
+        workers = min(workers, len(tasks))
+        # as faixas mais caras (maior capacidade) entram primeiro na fila
+        tasks.sort(key=lambda task: -task[1][-1])
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(catalog_path,)) as pool:
+            futures = [pool.submit(_solve_group, race_key, caps) for race_key, caps in tasks]
+            for future in futures:
+                for result in future.result():
+                    solved[(result["race"], result["capacity"])] = result
+
+    return [solved[(race_key, capacity)] for race_key, capacity in jobs]
+
+
+def parse_capacities(specs: list) -> list:
+    """Aceita números soltos ("15") e intervalos "início-fim[:passo]" ("10-100:10")."""
+    capacities = []
+    for spec in specs:
+        if "-" in spec:
+            bounds, _, step = spec.partition(":")
+            start, end = (int(x) for x in bounds.split("-", 1))
+            capacities.extend(range(start, end + 1, int(step or 1)))
+        else:
+            capacities.append(int(spec))
+    return capacities
+
+
+def write_results(results: list, out, fmt: str):
+    if fmt == "json":
+        json.dump(results, out, ensure_ascii=False, indent=2)
+        out.write("\n")
+        return
+
+    writer = csv.DictWriter(out, fieldnames=CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for result in results:
+        writer.writerow({**result, "items": "; ".join(result["items"])})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mochila ótima para várias raças e capacidades.")
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG_PATH, help="items.json do catálogo")
+    parser.add_argument("--races", nargs="+", default=list(RACE_RULES), help="raças (padrão: todas)")
+    parser.add_argument("--capacities", nargs="+", default=["15"], help='ex.: 15 20 ou "10-100:10"')
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: núcleos da máquina)")
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    parser.add_argument("--output", help="arquivo de saída (padrão: stdout)")
+    args = parser.parse_args(argv)
+
+    capacities = parse_capacities(args.capacities)
+    jobs = [(race_key, capacity) for race_key in args.races for capacity in capacities]
+    results = solve_batch(jobs, args.catalog, args.workers)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            write_results(results, f, args.format)
+    else:
+        write_results(results, sys.stdout, args.format)
+
+
+if __name__ == "__main__":
+    main()
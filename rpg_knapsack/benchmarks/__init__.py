@@ -0,0 +1,12 @@
+"""
+Benchmarks do solver, do cálculo de score e da dungeon.
+
+Rodar a partir de `rpg_knapsack`:
+
+    python -m benchmarks --profile quick --output bench.json
+    python -m benchmarks --profile quick --baseline bench.json --threshold 0.25
+"""
+from benchmarks.catalogs import make_records
+from benchmarks.runner import PROFILES, compare, run_profile
+
+__all__ = ["PROFILES", "compare", "make_records", "run_profile"]
@@ -0,0 +1,37 @@
+import argparse
+import json
+import sys
+
+from benchmarks.runner import PROFILES, compare, run_profile
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks do Mochila RPG.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--only", help="roda só os casos cujo nome contém este texto")
+    parser.add_argument("--output", help="salva o resultado em JSON")
+    parser.add_argument("--baseline", help="JSON de uma rodada anterior para comparar")
+    parser.add_argument("--threshold", type=float, default=0.2, help="piora tolerada (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    result = run_profile(args.profile, args.only)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(result, baseline, args.threshold)
+    for name, before, after, ratio in regressions:
+        print(f"REGRESSÃO {name}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms ({ratio:.2f}x)")
+    if not regressions:
+        print(f"Sem regressões acima de {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
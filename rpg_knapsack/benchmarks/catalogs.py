@@ -0,0 +1,51 @@
+import random
+
+# Palavras que ativam as regras de raça do game_utils (espadas, arcos, escudos, poções)
+_KINDS = [
+    ("Espada", "weapon", "sword.jpg"),
+    ("Arco", "weapon", "bow.png"),
+    ("Escudo", "armor", "shield.jpg"),
+    ("Poção", "consumable", "potion.jpg"),
+]
+_SUFFIXES = ["Longa", "de Vidro", "Élfico", "Nórdico", "de Carvalho", "de Auriel", "Antiga", "Rúnica"]
+
+DISTRIBUTIONS = ("uniform", "heavy_tail", "correlated")
+
+
+def make_records(n: int, max_item_weight: int = 20, distribution: str = "uniform", seed: int = 0) -> list:
+    """
+    Catálogo sintético no formato do items.json, sempre igual para a mesma semente.
+    - uniform: peso e valor independentes e uniformes;
+    - heavy_tail: muitos itens leves e poucos muito pesados;
+    - correlated: valor ~ peso (o caso difícil para a mochila).
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Distribuição desconhecida: {distribution}")
+
+    rng = random.Random(seed)
+    records = []
+    for i in range(n):
+        if distribution == "heavy_tail":
+            weight = min(max_item_weight, max(1, int(rng.paretovariate(1.5))))
+        else:
+            weight = rng.randint(1, max_item_weight)
+
+        if distribution == "correlated":
+            value = weight * 3 + rng.randint(0, 5)
+        else:
+            value = rng.randint(1, 60)
+
+        base, item_type, image = _KINDS[i % len(_KINDS)]
+        stats = {"attack": rng.randint(0, 30), "defense": rng.randint(0, 30)}
+        if item_type == "consumable":
+            stats = {"attack": 0, "defense": 0, "heal": rng.randint(5, 50)}
+
+        records.append({
+            "name": f"{base} {rng.choice(_SUFFIXES)} {i}",
+            "weight": weight,
+            "value": value,
+            "image": image,
+            "type": item_type,
+            "stats": stats,
+        })
+    return records
@@ -0,0 +1,177 @@
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from alternatives import knapsack_top_k
+from approx import knapsack_approx
+from benchmarks.catalogs import make_records
+from catalog import ItemCatalog, compile_catalog, load_catalog
+from dungeon import DungeonManager
+from game_utils import ScoreMatrix, prepare_items_for_knapsack
+from knapsack import knapsack
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Cada perfil diz quais tamanhos rodar e quantas repetições fazer.
+# "quick" roda em poucos minutos numa máquina comum, mesmo sem NumPy.
+PROFILES = {
+    "quick": {
+        "warmup": 1,
+        "repeat": 3,
+        "knapsack": [(10, 15), (100, 100), (1000, 1000), (10_000, 1000)],
+        "distributions": ["uniform", "correlated"],
+        "prepare": [10, 1000, 100_000],
+        "dungeon": [(15, 5), (1000, 5)],
+    },
+    "full": {
+        "warmup": 2,
+        "repeat": 5,
+        "knapsack": [(10, 15), (100, 1000), (1000, 10_000), (10_000, 10_000), (100_000, 1000), (1000, 100_000)],
+        "distributions": ["uniform", "heavy_tail", "correlated"],
+        "prepare": [10, 1000, 10_000, 100_000],
+        "dungeon": [(15, 20), (1000, 20), (10_000, 20)],
+    },
+}
+
+RACE = "orc"
+LOOT_PER_ROOM = 3
+
+
+def measure(fn, warmup: int, repeat: int) -> dict:
+    """Tempo (após aquecimento) e pico de memória alocada de `fn()`."""
+    for _ in range(warmup):
+        fn()
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    # rodada separada: o tracemalloc deixa tudo mais lento e não pode entrar no tempo
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "mean_s": statistics.fmean(times),
+        "repeat": repeat,
+        "peak_bytes": peak,
+    }
+
+
+def _knapsack_cases(profile: dict):
+    for n, capacity in profile["knapsack"]:
+        for distribution in profile["distributions"]:
+            items = prepare_items_for_knapsack(make_records(n, distribution=distribution), RACE)
+            params = {"n": n, "W": capacity, "dist": distribution}
+            yield "knapsack", params, lambda items=items, capacity=capacity: knapsack(items, capacity, lean=True)
+            weights = [item["weight"] for item in items]
+            values = [item["value"] for item in items]
+            yield "knapsack_approx", params, lambda w=weights, v=values, capacity=capacity: knapsack_approx(w, v, capacity)
+            yield "knapsack_top_k", params, lambda w=weights, v=values, capacity=capacity: knapsack_top_k(w, v, capacity)
+
+
+def _prepare_cases(profile: dict):
+    for n in profile["prepare"]:
+        records = make_records(n)
+        catalog = ItemCatalog(records)
+        yield "prepare_items_for_knapsack", {"n": n}, lambda records=records: prepare_items_for_knapsack(records, RACE)
+        yield "score_matrix", {"n": n}, lambda catalog=catalog: ScoreMatrix(catalog).column(RACE)
+
+
+def _catalog_cases(profile: dict):
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in profile["prepare"]:
+            path = os.path.join(tmp, f"items_{n}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(make_records(n), f, ensure_ascii=False)
+            compiled = compile_catalog(path)
+            yield "catalog_json", {"n": n}, lambda path=path: ItemCatalog.from_json(path)
+            yield "catalog_load", {"n": n}, lambda path=path: load_catalog(path)
+            yield "catalog_mmap", {"n": n}, lambda compiled=compiled: load_catalog(compiled)
+
+
+def _dungeon_cases(profile: dict):
+    for capacity, rooms in profile["dungeon"]:
+        pool = prepare_items_for_knapsack(make_records(200, distribution="uniform", seed=1), RACE)
+        manager = DungeonManager(pool)
+
+        def crawl(manager=manager, capacity=capacity, rooms=rooms):
+            rng = random.Random(42)
+            manager.reset_run()
+            backpack = []
+            for _ in range(rooms):
+                loot = manager.generate_loot(LOOT_PER_ROOM, rng=rng)
+                backpack, _, _ = manager.discard_overweight(backpack, loot, capacity)
+
+        yield "discard_overweight", {"W": capacity, "rooms": rooms}, crawl
+
+        def party_crawl(manager=manager, capacity=capacity, rooms=rooms):
+            rng = random.Random(42)
+            party = [(RACE, capacity), ("nord", capacity), ("wood_elf", capacity)]
+            backpacks = [[] for _ in party]
+            for _ in range(rooms):
+                loot = manager.generate_loot(LOOT_PER_ROOM, rng=rng)
+                backpacks, _, _ = manager.distribute_party(backpacks, loot, party)
+
+        yield "distribute_party", {"W": capacity, "rooms": rooms}, party_crawl
+
+
+def run_profile(name: str = "quick", only: str = None, log=sys.stderr) -> dict:
+    """Roda todos os casos do perfil e retorna o resultado pronto para virar JSON."""
+    profile = PROFILES[name]
+    results = []
+    for cases in (_knapsack_cases, _prepare_cases, _catalog_cases, _dungeon_cases):
+        for bench, params, fn in cases(profile):
+            key = case_key(bench, params)
+            if only and only not in key:
+                continue
+            stats = measure(fn, profile["warmup"], profile["repeat"])
+            results.append({"name": key, "bench": bench, "params": params, **stats})
+            if log:
+                log.write(f"{key:<60} {stats['median_s'] * 1000:10.3f} ms {stats['peak_bytes'] / 1024:12.1f} KiB\n")
+
+    return {
+        "meta": {
+            "profile": name,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": numpy.__version__ if numpy else None,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def case_key(bench: str, params: dict) -> str:
+    return bench + "[" + ",".join(f"{k}={v}" for k, v in params.items()) + "]"
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.2) -> list:
+    """
+    Casos cuja mediana piorou mais que `threshold` (0.2 = 20%) em relação à
+    linha de base. Retorna (nome, mediana base, mediana atual, razão).
+    """
+    base = {r["name"]: r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        previous = base.get(result["name"])
+        if previous is None or previous["median_s"] <= 0:
+            continue
+        ratio = result["median_s"] / previous["median_s"]
+        if ratio > 1 + threshold:
+            regressions.append((result["name"], previous["median_s"], result["median_s"], ratio))
+    return regressions
@@ -0,0 +1,73 @@
+from knapsack import knapsack_ids
+
+
+def split_quantity(quantity: int) -> list:
+    """
+    Divide uma pilha de `quantity` unidades em blocos 1, 2, 4, ..., resto.
+    Qualquer quantidade de 0 a `quantity` é soma de um subconjunto dos blocos,
+    então a pilha vira O(log q) itens 0/1 em vez de q cópias.
+    """
+    chunks = []
+    size = 1
+    while quantity > 0:
+        chunk = min(size, quantity)
+        chunks.append(chunk)
+        quantity -= chunk
+        size <<= 1
+    return chunks
+
+
+def expand_stacks(items: list) -> tuple[list, list, list]:
+    """
+    Transforma itens com "quantity" (padrão 1) em blocos 0/1.
+    Retorna pesos, valores e, para cada bloco, (posição do item, unidades).
+    """
+    weights = []
+    values = []
+    owners = []
+    for index, item in enumerate(items):
+        for chunk in split_quantity(item.get("quantity", 1)):
+            weights.append(item["weight"] * chunk)
+            values.append(item["value"] * chunk)
+            owners.append((index, chunk))
+    return weights, values, owners
+
+
+def knapsack_bounded(items: list, max_weight: int, engine: str = "auto") -> tuple[int, list]:
+    """
+    Mochila com quantidade limitada: cada item pode entrar até item["quantity"]
+    vezes. Retorna o melhor valor e uma lista de (item, quantas unidades levar),
+    na ordem de `items`, só com os itens levados.
+    """
+    weights, values, owners = expand_stacks(items)
+    best, chosen = knapsack_ids(weights, values, max_weight, engine=engine)
+
+    counts = [0] * len(items)
+    for k in chosen:
+        index, chunk = owners[k]
+        counts[index] += chunk
+    return best, [(items[i], counts[i]) for i in range(len(items)) if counts[i]]
+
+
+def stack_items(items: list) -> list:
+    """
+    Junta itens repetidos em uma pilha com "quantity". Itens do catálogo são o
+    mesmo item quando têm o mesmo "id" (cada acesso ao ItemCatalog cria uma
+    visão nova); dicts soltos, sem "id", só quando são o mesmo objeto.
+    Itens únicos continuam sendo os mesmos objetos.
+    """
+    first = {}
+    counts = {}
+    for item in items:
+        item_id = item.get("id")
+        key = ("id", item_id) if item_id is not None else ("object", id(item))
+        if key not in counts:
+            counts[key] = 0
+            first[key] = item
+        counts[key] += item.get("quantity", 1)
+
+    stacked = []
+    for key, item in first.items():
+        quantity = counts[key]
+        stacked.append(item if quantity == item.get("quantity", 1) else {**item, "quantity": quantity})
+    return stacked
@@ -0,0 +1,50 @@
+from collections import OrderedDict
+
+
+class SweepCache:
+    """
+    LRU de resultados do knapsack (CapacitySweep) por (raça, versão do
+    catálogo, capacidade resolvida). Um resultado resolvido até W serve
+    qualquer capacidade <= W, então baixar o peso ou voltar para uma raça
+    anterior não refaz a DP.
+    """
+    def __init__(self, maxsize: int = 8):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, race_key, version, capacity: int):
+        key = self._find(race_key, version, capacity)
+        if key is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._entries[key]
+
+    def __contains__(self, request) -> bool:
+        """`(raça, versão, capacidade) in cache`, sem contar acerto/erro nem mexer na ordem."""
+        return self._find(*request) is not None
+
+    def _find(self, race_key, version, capacity: int):
+        for key in reversed(self._entries):
+            race, entry_version, solved = key
+            if race == race_key and entry_version == version and solved >= capacity:
+                return key
+        return None
+
+    def put(self, race_key, version, capacity: int, sweep):
+        # um resultado maior torna os menores da mesma raça/versão inúteis
+        for key in [k for k in self._entries if k[0] == race_key and k[1] == version and k[2] <= capacity]:
+            del self._entries[key]
+
+        self._entries[(race_key, version, capacity)] = sweep
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def info(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
@@ -0,0 +1,364 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Mapping, Sequence
+
+# items.json ao lado deste módulo, independente do diretório atual
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "items.json")
+
+# Catálogo compilado (ver `compile_catalog`): cabeçalho, colunas numéricas
+# int64, colunas uint32 de índices na tabela de strings e a tabela em si
+# (strings únicas em UTF-8 separadas por "\0"). Tudo little-endian.
+COMPILED_SUFFIX = ".bin"
+COMPILED_MAGIC = b"RPGCAT\0\0"
+COMPILED_VERSION = 1
+# magic, versão, nº de itens, tamanho e mtime_ns do JSON, sha256 do JSON, bytes da tabela de strings
+_HEADER = struct.Struct("<8sIIqq32sQ")
+_STAMP = struct.Struct("<qq")
+_STAMP_OFFSET = 16
+_INT_COLUMNS = ("weights", "values", "attack", "defense", "heal")
+_STRING_COLUMNS = ("names", "images", "types")
+
+
+class ItemCatalog:
+    """
+    Catálogo de itens em colunas paralelas (uma lista/array por campo).
+    O id de um item é a sua posição nas colunas, então identidade é O(1) e o
+    knapsack recebe `weights` e `values` já contíguos, sem ler dicts.
+    """
+    def __init__(self, records: list = ()):
+        self.names = []
+        self.images = []
+        self.types = []
+        self.weights = array("q")
+        self.values = array("q")
+        self.attack = array("q")
+        self.defense = array("q")
+        self.heal = array("q")
+        # muda a cada alteração; serve de chave para caches de resultados.
+        # Lido de arquivo, vem do sha256 do JSON: mesmo conteúdo, mesma versão.
+        self.version = 0
+
+        for record in records:
+            self.append(record)
+
+    @classmethod
+    def from_json(cls, path) -> "ItemCatalog":
+        with open(path, "rb") as f:
+            raw = f.read()
+        catalog = cls(json.loads(raw))
+        catalog.version = _content_version(hashlib.sha256(raw).digest())
+        return catalog
+
+    @classmethod
+    def _from_columns(cls, columns: dict, version: int) -> "ItemCatalog":
+        catalog = cls.__new__(cls)
+        for name in _INT_COLUMNS + _STRING_COLUMNS:
+            setattr(catalog, name, columns[name])
+        catalog.version = version
+        return catalog
+
+    def append(self, record: dict) -> int:
+        """Adiciona um item no formato do items.json e retorna o seu id."""
+        if not isinstance(self.weights, array):
+            self._detach()
+        stats = record.get("stats", {})
+        self.names.append(record["name"])
+        self.images.append(record.get("image", ""))
+        self.types.append(record.get("type", ""))
+        self.weights.append(record["weight"])
+        self.values.append(record["value"])
+        self.attack.append(stats.get("attack", 0))
+        self.defense.append(stats.get("defense", 0))
+        self.heal.append(stats.get("heal", 0))
+        self.version += 1
+        return len(self.names) - 1
+
+    def _detach(self):
+        """Copia as colunas mapeadas (somente leitura) para listas/arrays editáveis."""
+        for name in _INT_COLUMNS:
+            setattr(self, name, array("q", getattr(self, name)))
+        for name in _STRING_COLUMNS:
+            setattr(self, name, list(getattr(self, name)))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, item_id: int) -> "ItemView":
+        if not 0 <= item_id < len(self.names):
+            raise IndexError(item_id)
+        return ItemView(self, item_id)
+
+    def __iter__(self):
+        for item_id in range(len(self.names)):
+            yield ItemView(self, item_id)
+
+    def stats(self, item_id: int) -> dict:
+        stats = {"attack": self.attack[item_id], "defense": self.defense[item_id]}
+        if self.heal[item_id]:
+            stats["heal"] = self.heal[item_id]
+        return stats
+
+    def to_dict(self, item_id: int) -> dict:
+        """Item no mesmo formato do items.json (mais o "id")."""
+        return {
+            "id": item_id,
+            "name": self.names[item_id],
+            "weight": self.weights[item_id],
+            "value": self.values[item_id],
+            "image": self.images[item_id],
+            "type": self.types[item_id],
+            "stats": self.stats(item_id),
+        }
+
+
+class ItemView(Mapping):
+    """
+    Visão leve (só catálogo + id) de um item do catálogo. Se comporta como o
+    dict do items.json para leitura (`item["name"]`, `item.get("stats")`),
+    então a UI e o game_utils continuam funcionando sem copiar nada.
+    """
+    __slots__ = ("catalog", "id")
+
+    _KEYS = ("id", "name", "weight", "value", "image", "type", "stats")
+
+    def __init__(self, catalog: ItemCatalog, item_id: int):
+        self.catalog = catalog
+        self.id = item_id
+
+    @property
+    def name(self) -> str:
+        return self.catalog.names[self.id]
+
+    @property
+    def weight(self) -> int:
+        return self.catalog.weights[self.id]
+
+    @property
+    def value(self) -> int:
+        return self.catalog.values[self.id]
+
+    def __getitem__(self, key):
+        catalog, item_id = self.catalog, self.id
+        if key == "id":
+            return item_id
+        if key == "name":
+            return catalog.names[item_id]
+        if key == "weight":
+            return catalog.weights[item_id]
+        if key == "value":
+            return catalog.values[item_id]
+        if key == "image":
+            return catalog.images[item_id]
+        if key == "type":
+            return catalog.types[item_id]
+        if key == "stats":
+            return catalog.stats(item_id)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
+
+    def __repr__(self):
+        return f"ItemView({self.id}, {self.name!r})"
+
+
+class _StringTable:
+    """Strings únicas do catálogo compilado, decodificadas todas de uma vez no primeiro uso."""
+    def __init__(self, blob):
+        self._blob = blob
+        self._strings = None
+
+    @property
+    def strings(self) -> list:
+        if self._strings is None:
+            self._strings = str(self._blob, "utf-8").split("\0")
+        return self._strings
+
+
+class _StringColumn(Sequence):
+    """Coluna de texto do catálogo compilado: um índice uint32 na tabela de strings por item."""
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: _StringTable, index):
+        self._table = table
+        self._index = index
+
+    def __len__(self):
+        return len(self._index)
+
+    def __getitem__(self, item_id):
+        if isinstance(item_id, slice):
+            return [self[i] for i in range(*item_id.indices(len(self)))]
+        return self._table.strings[self._index[item_id]]
+
+    def __iter__(self):
+        strings = self._table.strings
+        return (strings[k] for k in self._index)
+
+
+def compiled_path(json_path) -> str:
+    """Onde fica o catálogo compilado de um items.json (ao lado dele, com extensão .bin)."""
+    return os.path.splitext(json_path)[0] + COMPILED_SUFFIX
+
+
+def compile_catalog(json_path, out_path=None) -> str:
+    """
+    Compila o items.json para o formato binário em colunas e retorna o
+    caminho gerado. O arquivo é escrito ao lado e renomeado no fim, então
+    processos que estão lendo a versão anterior não veem um arquivo pela metade.
+    """
+    out_path = out_path or compiled_path(json_path)
+    with open(json_path, "rb") as f:
+        raw = f.read()
+        info = os.fstat(f.fileno())
+    catalog = ItemCatalog(json.loads(raw))
+
+    strings = {}
+    indexes = {}
+    for name in _STRING_COLUMNS:
+        column = array("I")
+        for text in getattr(catalog, name):
+            if "\0" in text:
+                raise ValueError(f"Texto com caractere nulo no catálogo: {text!r}")
+            column.append(strings.setdefault(text, len(strings)))
+        indexes[name] = column
+    blob = "\0".join(strings).encode("utf-8")
+
+    header = _HEADER.pack(COMPILED_MAGIC, COMPILED_VERSION, len(catalog), info.st_size, info.st_mtime_ns,
+                          hashlib.sha256(raw).digest(), len(blob))
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(out_path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            for name in _INT_COLUMNS:
+                f.write(getattr(catalog, name).tobytes())
+            for name in _STRING_COLUMNS:
+                f.write(indexes[name].tobytes())
+            f.write(blob)
+        # mkstemp cria o arquivo só para o dono (0600); o .bin fica com as
+        # permissões do JSON para outros usuários também poderem mapeá-lo
+        os.chmod(tmp_path, info.st_mode & 0o666)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return out_path
+
+
+def open_compiled(path, source_path=None):
+    """
+    Abre um catálogo compilado via mmap (as colunas são views sobre o arquivo,
+    compartilhadas entre processos pelo cache do sistema). Com `source_path`,
+    confere se ainda corresponde ao JSON: tamanho e mtime iguais bastam; senão
+    compara o sha256. Sem o JSON (ex.: só o .bin foi distribuído) o arquivo
+    compilado vale como está. Retorna None se o arquivo não existir, for de
+    outra versão do formato ou estiver desatualizado.
+    """
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(mapped) < _HEADER.size:
+        return None
+    magic, version, count, size, mtime_ns, digest, blob_size = _HEADER.unpack_from(mapped)
+    if magic != COMPILED_MAGIC or version != COMPILED_VERSION:
+        return None
+    if len(mapped) != _HEADER.size + count * (8 * len(_INT_COLUMNS) + 4 * len(_STRING_COLUMNS)) + blob_size:
+        return None
+
+    if source_path is not None:
+        try:
+            info = os.stat(source_path)
+        except OSError:
+            info = None  # JSON ausente: não há com o que comparar
+        if info is not None and (info.st_size, info.st_mtime_ns) != (size, mtime_ns):
+            with open(source_path, "rb") as f:
+                if hashlib.sha256(f.read()).digest() != digest:
+                    return None
+            _refresh_stamp(path, info)
+
+    view = memoryview(mapped)
+    columns = {}
+    offset = _HEADER.size
+    for name in _INT_COLUMNS:
+        columns[name] = view[offset:offset + count * 8].cast("q")
+        offset += count * 8
+    table = _StringTable(view[offset + count * 4 * len(_STRING_COLUMNS):])
+    for name in _STRING_COLUMNS:
+        columns[name] = _StringColumn(table, view[offset:offset + count * 4].cast("I"))
+        offset += count * 4
+
+    return ItemCatalog._from_columns(columns, version=_content_version(digest))
+
+
+def _content_version(digest: bytes) -> int:
+    """
+    Versão do catálogo a partir do sha256 do JSON. Contar os itens não serve:
+    editar um item (ou trocar um por outro) mantém a contagem e os caches
+    continuariam devolvendo resultados do conteúdo antigo.
+    """
+    return int.from_bytes(digest[:8], "little") >> 1
+
+
+def _refresh_stamp(path, info):
+    """JSON tocado mas com o mesmo conteúdo: grava o novo tamanho/mtime para não recalcular o hash."""
+    try:
+        with open(path, "r+b") as f:
+            f.seek(_STAMP_OFFSET)
+            f.write(_STAMP.pack(info.st_size, info.st_mtime_ns))
+    except OSError:
+        pass
+
+
+def load_catalog(path=DEFAULT_CATALOG_PATH) -> ItemCatalog:
+    """
+    Carrega o catálogo pelo arquivo compilado ao lado do JSON, recompilando
+    se ele faltar ou estiver desatualizado. Um caminho .bin é aberto direto.
+    Se não der para usar o formato binário (máquina big-endian, pasta sem
+    permissão de escrita), lê o JSON como antes.
+    """
+    if sys.byteorder != "little":
+        return ItemCatalog.from_json(path)
+    if path.endswith(COMPILED_SUFFIX):
+        catalog = open_compiled(path)
+        if catalog is None:
+            raise ValueError(f"Catálogo compilado inválido ou de outra versão: {path}")
+        return catalog
+
+    compiled = compiled_path(path)
+    catalog = open_compiled(compiled, path)
+    if catalog is None:
+        try:
+            compile_catalog(path, compiled)
+        except OSError:
+            if not os.path.exists(path):
+                raise
+            return ItemCatalog.from_json(path)
+        catalog = open_compiled(compiled, path)
+    return catalog
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compila o items.json para o formato binário do catálogo.")
+    parser.add_argument("source", nargs="?", default=DEFAULT_CATALOG_PATH, help="items.json de origem")
+    parser.add_argument("--output", help="arquivo .bin de saída (padrão: ao lado do JSON)")
+    args = parser.parse_args(argv)
+    print(compile_catalog(args.source, args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 import random
-from knapsack import knapsack
-import json
+from approx import knapsack_approx
+from knapsack import knapsack_step
+from bounded import expand_stacks, split_quantity, stack_items
+from game_utils import calculate_item_score, prepare_items_for_knapsack
+from party import PARTY_TIME_BUDGET, PartyResult, solve_party
+from slots import item_slot, knapsack_slots_ids
+from sampling import AliasSampler
 
 mock_inventory = [
     {'name': 'Escudo de Carvalho',  'weight': 5, 'value': 10,   'image': 'shield.jpg'}, 
@@ -21,18 +26,104 @@ all_items = [
   { "name": "Escudo Nórdico", "weight": 4, "value": 9, "image": "nordicShield.png" }
 ]
 
+class DungeonRun:
+    """
+    Estado da DP de uma exploração. Cada item empilhado na mochila vira um ou
+    mais blocos 0/1 (pilhas com "quantity" são divididas por `split_quantity`)
+    e cada bloco tem a sua linha: `rows[k]` é a DP depois dos k primeiros
+    blocos e `bits[k]` diz onde o bloco k foi usado (None quando ele nunca
+    poderia entrar).
+    """
+    def __init__(self, max_capacity: int):
+        self.max_capacity = max_capacity
+        self.items = []
+        self.chunks = []  # (posição do item em `items`, unidades, peso do bloco)
+        self.rows = [[0] * (max_capacity + 1)]
+        self.bits = []
+
+    def matches(self, backpack: list) -> bool:
+        """A mochila recebida começa pelos mesmos itens (mesmos objetos) já empilhados?"""
+        if len(backpack) < len(self.items):
+            return False
+        return all(a is b for a, b in zip(self.items, backpack))
+
+    def push(self, item: dict):
+        position = len(self.items)
+        self.items.append(item)
+
+        for units in split_quantity(item.get("quantity", 1)):
+            weight = item["weight"] * units
+            value = item["value"] * units
+            row = self.rows[-1]
+            if weight > self.max_capacity or value <= 0:
+                # nunca melhora a mochila: a linha não muda
+                self.rows.append(row)
+                self.bits.append(None)
+            else:
+                new_row, bits = knapsack_step(row, weight, value)
+                self.rows.append(new_row)
+                self.bits.append(bits)
+            self.chunks.append((position, units, weight))
+
+    def truncate(self, size: int):
+        """Mantém só os `size` primeiros itens (e os blocos deles)."""
+        kept_chunks = sum(1 for position, _, _ in self.chunks if position < size)
+        del self.items[size:]
+        del self.chunks[kept_chunks:]
+        del self.rows[kept_chunks + 1:]
+        del self.bits[kept_chunks:]
+
+    def best_counts(self) -> list:
+        """Quantas unidades de cada item (por posição) a melhor mochila leva."""
+        counts = [0] * len(self.items)
+        w = self.max_capacity
+        for k in range(len(self.chunks) - 1, -1, -1):
+            bits = self.bits[k]
+            if bits is not None and bits[w >> 3] >> (w & 7) & 1:
+                position, units, weight = self.chunks[k]
+                counts[position] += units
+                w -= weight
+        return counts
+
+
 class DungeonManager:
-    def __init__(self, all_possible_items: list):
-        self.possible_items = all_items
+    def __init__(self, all_possible_items, slot_limits: dict = None, drop_weights: list = None,
+                 epsilon: float = None):
+        # qualquer sequência indexável serve (ex.: o ItemCatalog, que só cria a
+        # visão de um item quando ele é sorteado); vazia (ex.: demo do __main__)
+        # usa a lista fixa do módulo
+        self.possible_items = all_possible_items if len(all_possible_items) else all_items
+        # chance relativa de cada item cair no loot (None = todos iguais)
+        self.sampler = AliasSampler(drop_weights) if drop_weights else None
+        # limites por slot (ver slots.SLOT_LIMITS); None = mochila sem restrição
+        self.slot_limits = slot_limits
+        # modo rápido: com `epsilon` a mochila de cada sala é a aproximada
+        # (ver approx.knapsack_approx) e `last_approx` guarda o limite do ótimo
+        self.epsilon = epsilon
+        self.last_approx = None
+        self.run = None
 
-    def generate_loot(self, quantity: int = 3) -> list:
+    def generate_loot(self, quantity: int = 3, stack: bool = False, rng=None) -> list:
+        """
+        Sorteia o loot; com `stack=True` itens repetidos viram uma pilha com "quantity".
+        `rng` (um random.Random) deixa o sorteio reproduzível.
+        """
+        rng = rng or random
         loot = []
         for _ in range(quantity):
-            item = random.choice(self.possible_items)
+            if self.sampler is not None:
+                item = self.possible_items[self.sampler.sample(rng)]
+            else:
+                item = rng.choice(self.possible_items)
             loot.append(item)
-        return loot
+        return stack_items(loot) if stack else loot
 
-    def discard_overweight(self, current_backpack: list, loot: list, max_capacity: int) -> tuple[list, list, int]:
+    def reset_run(self):
+        """Esquece a DP da exploração atual (ex.: a mochila foi recalculada do zero)."""
+        self.run = None
+
+    def discard_overweight(self, current_backpack: list, loot: list, max_capacity: int,
+                           progress=None) -> tuple[list, list, int]:
         """
         Recebe:
         - current_backpack: Lista de itens que já estavam na mochila.
@@ -43,24 +134,171 @@ class DungeonManager:
         - kept_items: Itens que ficaram na mochila (Otimizados).
         - discarded_items: Itens que foram jogados fora.
         - total_value: Valor da nova mochila.
+
+        As linhas da DP dos itens que continuam na mochila são guardadas entre
+        uma sala e outra; a cada loot só calculamos as linhas dos itens novos
+        (e dos que vieram depois do primeiro item descartado).
+
+        Itens com "quantity" são pilhas: podem ser mantidos em parte, e aí a
+        parte mantida e a descartada saem como cópias com a quantidade de cada uma.
+
+        `progress` é repassado para a DP (ver `knapsack()`). No modo incremental
+        ele é chamado entre um item e outro, então um `SolveCancelled` nunca
+        deixa a DP guardada pela metade.
+
+        Com `epsilon` (e sem slots) cada sala é resolvida pelo modo rápido e
+        `total_value` fica a no máximo `epsilon` do ótimo.
         """
-        
         overcarry = current_backpack + loot
-        
-        # roda o knapsack novamente para ver a mochila com o maior valor entre os itens atuais + loot
-        best_value, kept_items, _ = knapsack(overcarry, max_capacity)
-        
+
+        if self.slot_limits is not None:
+            # com slots a DP agrupada é refeita a cada sala
+            self.run = None
+            best_value, counts = self._solve_with_slots(overcarry, max_capacity, progress)
+        elif self.epsilon is not None:
+            self.run = None
+            best_value, counts = self._solve_approx(overcarry, max_capacity, progress)
+        else:
+            run = self.run
+            if run is None or run.max_capacity != max_capacity or not run.matches(current_backpack):
+                run = self.run = DungeonRun(max_capacity)
+
+            pending = overcarry[len(run.items):]
+            for done, item in enumerate(pending):
+                if progress is not None:
+                    progress(done, len(pending))
+                run.push(item)
+            if progress is not None:
+                progress(len(pending), len(pending))
+
+            best_value = run.rows[-1][max_capacity]
+            counts = run.best_counts()
+
+        # identidade pela posição em overcarry: itens repetidos não se confundem.
+        # Pilhas levadas pela metade aparecem nas duas listas, cada uma com a sua "quantity".
+        kept_items = []
         discarded_items = []
-        kept_set = {json.dumps(item, sort_keys=True) for item in kept_items}
-        
-        # se ele tava na mochila e não está mais no kept_items, ele foi descartado
-        for item in overcarry:
-            item_key = json.dumps(item, sort_keys=True)
-            if item_key not in kept_set:
+        first_discarded = None
+        for k, item in enumerate(overcarry):
+            quantity = item.get("quantity", 1)
+            taken = counts[k]
+            if taken == quantity:
+                kept_items.append(item)
+                continue
+
+            if first_discarded is None:
+                first_discarded = k
+            if taken:
+                kept_items.append({**item, "quantity": taken})
+                discarded_items.append({**item, "quantity": quantity - taken})
+            else:
                 discarded_items.append(item)
-                
+
+        # só o prefixo sem descartes continua válido para a próxima sala
+        if self.run is not None:
+            self.run.truncate(len(overcarry) if first_discarded is None else first_discarded)
+
         return kept_items, discarded_items, best_value
     
+    def distribute_party(self, backpacks: list, loot: list, party: list, time_budget: float = PARTY_TIME_BUDGET,
+                         progress=None) -> tuple[list, list, PartyResult]:
+        """
+        Versão em grupo do `discard_overweight`: o loot novo e tudo o que o
+        grupo já carrega são redistribuídos de uma vez entre as mochilas (ver
+        `party.solve_party`), então um item pode trocar de dono e uma pilha
+        pode ser dividida entre vários membros.
+
+        Recebe:
+        - backpacks: mochila atual de cada membro (itens preparados para a raça dele).
+        - loot: itens novos (crus, como saem do `generate_loot`, ou já preparados).
+        - party: (raça, capacidade) de cada membro, na ordem de `backpacks`.
+
+        Retorna:
+        - as mochilas novas, com os itens preparados para a raça de cada dono;
+        - os itens descartados (crus);
+        - o `PartyResult`, com o score do grupo e a distância até o ótimo (`gap`).
+        """
+        carried = [item for backpack in backpacks for item in backpack]
+        pool = [_raw_item(item) for item in carried + list(loot)]
+        weights, _, owners = expand_stacks(pool)
+        columns = []
+        for race, _ in party:
+            scores = [calculate_item_score(item, race) for item in pool]
+            columns.append([scores[position] * units for position, units in owners])
+        result = solve_party(weights, columns, [capacity for _, capacity in party], time_budget=time_budget,
+                             progress=progress)
+
+        counts = [[0] * len(pool) for _ in party]
+        for member, chosen in enumerate(result.assignment):
+            for k in chosen:
+                position, units = owners[k]
+                counts[member][position] += units
+
+        new_backpacks = []
+        for member, (race, _) in enumerate(party):
+            kept = [_with_quantity(item, counts[member][k]) for k, item in enumerate(pool) if counts[member][k]]
+            new_backpacks.append(prepare_items_for_knapsack(kept, race))
+        discarded = []
+        for k, item in enumerate(pool):
+            left = item.get("quantity", 1) - sum(member_counts[k] for member_counts in counts)
+            if left:
+                discarded.append(_with_quantity(item, left))
+        return new_backpacks, discarded, result
+
+    def _solve_approx(self, overcarry: list, max_capacity: int, progress=None) -> tuple[int, list]:
+        """Mochila aproximada sobre os blocos (1, 2, 4...) de backpack + loot."""
+        weights, values, owners = expand_stacks(overcarry)
+        self.last_approx = knapsack_approx(weights, values, max_capacity, self.epsilon, progress=progress)
+
+        counts = [0] * len(overcarry)
+        for k in self.last_approx.chosen:
+            position, unit = owners[k]
+            counts[position] += unit
+        return self.last_approx.score, counts
+
+    def _solve_with_slots(self, overcarry: list, max_capacity: int, progress=None) -> tuple[int, list]:
+        """
+        Mochila agrupada por slot sobre backpack + loot. Pilhas de slots sem
+        limite viram blocos 1, 2, 4...; nos slots limitados cada unidade conta
+        como um item, então a pilha vira até `limite` unidades soltas.
+        """
+        weights, values, slots, owners = [], [], [], []
+        for position, item in enumerate(overcarry):
+            slot = item_slot(item)
+            quantity = item.get("quantity", 1)
+            limit = self.slot_limits.get(slot)
+            units = split_quantity(quantity) if limit is None else [1] * min(quantity, limit)
+            for unit in units:
+                weights.append(item["weight"] * unit)
+                values.append(item["value"] * unit)
+                slots.append(slot)
+                owners.append((position, unit))
+
+        best_value, chosen = knapsack_slots_ids(weights, values, slots, max_capacity, self.slot_limits,
+                                                progress=progress)
+
+        counts = [0] * len(overcarry)
+        for k in chosen:
+            position, unit = owners[k]
+            counts[position] += unit
+        return best_value, counts
+
+
+def _raw_item(item) -> dict:
+    """Item preparado para uma raça de volta ao formato cru (valor original, sem "is_favorite")."""
+    raw = {key: value for key, value in item.items() if key not in ("real_value", "is_favorite")}
+    if "real_value" in item:
+        raw["value"] = item["real_value"]
+    return raw
+
+
+def _with_quantity(item: dict, quantity: int) -> dict:
+    """O próprio item se a quantidade não mudou; senão uma cópia com a nova "quantity"."""
+    if quantity == item.get("quantity", 1):
+        return item
+    return {**item, "quantity": quantity}
+
+
 def parse_formatted_items(items: list):
     formatted = []
     for item in items:
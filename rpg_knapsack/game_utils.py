@@ -1,55 +1,194 @@
+import re
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional; sem ele a matriz é montada em Python puro
+    np = None
+
+# Regras de afinidade de cada raça. Score = ataque * "attack" + defesa * "defense"
+# + bônus das palavras do nome ("name_bonus") + valor base * "value".
+# Se o nome tiver alguma palavra de "when_name", a regra alternativa vale no lugar.
+# O peso de "value" acrescenta influência do valor original para evitar escolhas estranhas.
+RACE_RULES = {
+    # Orcs => preferência forte por dano corpo-a-corpo (espadas) e penaliza arcos;
+    # parte do valor base com peso menor para não sobrepor os stats
+    "orc": {
+        "attack": 6, "defense": 1, "value": 0.1,
+        "name_bonus": [(("espada", "sword"), 90), (("arco", "bow"), -90)],
+    },
+    "nord": {
+        "attack": 1, "defense": 4, "value": 0.15,
+        "name_bonus": [(("escudo", "nordico", "nórdico"), 25), (("espada",), 20)],
+    },
+    "wood_elf": {
+        "value": 0.4,
+        "when_name": (("arco",), {"attack": 3, "value": 1, "name_bonus": [((), 60)]}),
+    },
+    "khajiit": {"value": 2},
+    "imperial": {"attack": 1, "defense": 1, "value": 1},
+}
+
+# Poções sempre são úteis independentemente da raça
+CONSUMABLE_BONUS = 15
+CONSUMABLE_TYPES = ("consumable",)
+CONSUMABLE_WORDS = ("poção",)
+
 def calculate_item_score(item, race_key):
     """
-    Calcula o valor de utilidade baseado na raça.
-    Acrescenta influência do value original para evitar escolhas estranhas.
+    Calcula o valor de utilidade baseado na raça, segundo `RACE_RULES`.
     """
     stats = item.get("stats", {"attack": 0, "defense": 0})
-    base_value = item.get("value", 0)
     name = item.get("name", "").lower()
-    item_type = item.get("type", "")
-    
-    score = 0
-    
-    if race_key == "orc":
-        # Orcs => preferência forte por dano corpo-a-corpo (espadas)
-        # base ponderada por ataque 
-        score = (stats.get("attack", 0) * 6) + (stats.get("defense", 0) * 1)
-        # dar um bônus maior para espadas (preferência clara por melee)
-        if "espada" in name or "sword" in name:
-            score += 90
-        # penaliza arcos para orcs
-        if "arco" in name or "bow" in name:
-            score -= 90
-        # incluir parte do valor base, mas com peso menor para não sobrepor os stats
-        score += base_value * 0.1
-            
-    elif race_key == "nord":
-        score = (stats.get("defense", 0) * 4) + (stats.get("attack", 0) * 1)
-        if "escudo" in name or "nordico" in name or "nórdico" in name:
-            score += 25
-        if "espada" in name:
-            score += 20
-        score += base_value * 0.15
-            
-    elif race_key == "wood_elf":
-        if "arco" in name:
-            score = base_value + 60 + (stats.get("attack", 0) * 3)
-        else:
-            score = base_value * 0.4 
-            
-    elif race_key == "khajiit":
-        score = base_value * 2 
-        
-    elif race_key == "imperial":
-        score = base_value + stats.get("attack", 0) + stats.get("defense", 0)
-
-    # Poções sempre são úteis independentemente da raça
-    if item_type == "consumable" or "poção" in name:
-        score += 15
+
+    rule = _pick_rule(RACE_RULES.get(race_key, {}), name)
+    score = (
+        stats.get("attack", 0) * rule.get("attack", 0)
+        + stats.get("defense", 0) * rule.get("defense", 0)
+    )
+    for words, bonus in rule.get("name_bonus", ()):
+        if _has_word(name, words):
+            score += bonus
+    score += item.get("value", 0) * rule.get("value", 0)
+
+    if _is_consumable(item.get("type", ""), name):
+        score += CONSUMABLE_BONUS
 
     # Garantir não-negatividade e inteiro para o knapsack
-    final = max(int(score), 0)
-    return final
+    return max(int(score), 0)
+
+def _pick_rule(rule, name):
+    alternative = rule.get("when_name")
+    if alternative and _has_word(name, alternative[0]):
+        return alternative[1]
+    return rule
+
+def _has_word(name, words):
+    # tupla vazia = bônus incondicional
+    return not words or any(word in name for word in words)
+
+def _is_consumable(item_type, name):
+    return item_type in CONSUMABLE_TYPES or _has_word(name, CONSUMABLE_WORDS)
+
+
+class ScoreMatrix:
+    """
+    Scores raça x item de um ItemCatalog, calculados sob demanda: cada coluna
+    só é montada no primeiro `column(race)`, então abrir o app não paga pelas
+    raças que ninguém escolheu. `column(race)` devolve a coluna de scores da
+    raça indexada pelo id do item, pronta para o knapsack (mesmos valores do
+    `calculate_item_score`).
+    """
+    def __init__(self, catalog, rules=RACE_RULES):
+        self.rules = rules
+        self.races = list(rules)
+        self._catalog = catalog
+        self._masks = {}
+        self._columns = {}
+        self._consumable = None
+
+    def column(self, race_key):
+        column = self._columns.get(race_key)
+        if column is None:
+            if self._consumable is None:
+                self._prepare()
+            rule = self.rules.get(race_key, {})
+            if np is not None:
+                column = array("q")
+                column.frombytes(self._compute_numpy(rule).astype(np.int64).tobytes())
+            else:
+                column = self._compute_python(rule)
+            self._columns[race_key] = column
+        return column
+
+    def _prepare(self):
+        """Texto dos nomes e máscara de consumíveis, comuns a todas as raças."""
+        catalog = self._catalog
+        # todos os nomes em minúsculas num texto só, separados por "\n": cada
+        # palavra vira uma busca no texto inteiro em vez de um teste por item
+        self._text = "\n".join(catalog.names).lower()
+        if self._text.count("\n") != max(len(catalog) - 1, 0):  # algum nome com "\n": junta nome a nome
+            self._text = "\n".join(name.replace("\n", " ").lower() for name in catalog.names)
+        # posição (em caracteres) onde começa o nome de cada item
+        if np is not None:
+            codes = np.frombuffer(self._text.encode("utf-32-le"), dtype=np.uint32)
+            self._starts = np.concatenate(([0], np.flatnonzero(codes == 10) + 1))[:len(catalog)]
+        else:
+            lengths = (len(name) + 1 for name in self._text.split("\n"))
+            self._starts = list(accumulate(lengths, initial=0))[:len(catalog)]
+
+        name_mask = self._mask(CONSUMABLE_WORDS)
+        type_mask = bytearray(t in CONSUMABLE_TYPES for t in catalog.types)
+        if np is not None:
+            self._consumable = name_mask | np.frombuffer(type_mask, dtype=bool)
+        else:
+            self._consumable = bytearray(a | b for a, b in zip(name_mask, type_mask))
+
+    def _mask(self, words):
+        """Quais itens têm alguma das palavras no nome (calculado uma vez por grupo)."""
+        mask = self._masks.get(words)
+        if mask is None:
+            count = len(self._starts)
+            text, starts = self._text, self._starts
+            if not words or not all(words):  # tupla vazia (ou palavra vazia) casa com todo nome
+                mask = np.ones(count, dtype=bool) if np is not None else bytearray(b"\1" * count)
+            elif np is not None:
+                # início de cada ocorrência -> item dono do trecho, tudo de uma vez
+                mask = np.zeros(count, dtype=bool)
+                for word in words:
+                    found = [m.start() for m in re.finditer(re.escape(word), text)]
+                    mask[np.searchsorted(starts, found, side="right") - 1] = True
+            else:
+                mask = bytearray(count)
+                for word in words:
+                    pos = text.find(word)
+                    while pos != -1:
+                        item = bisect_right(starts, pos) - 1
+                        mask[item] = 1
+                        # pula para o próximo nome: o item já está marcado
+                        pos = text.find(word, starts[item + 1] if item + 1 < count else len(text))
+            self._masks[words] = mask
+        return mask
+
+    def _compute_python(self, rule):
+        catalog = self._catalog
+        alternative = rule.get("when_name")
+        alt_mask = self._mask(alternative[0]) if alternative else None
+        column = array("q")
+        for i in range(len(catalog)):
+            current = alternative[1] if alt_mask and alt_mask[i] else rule
+            score = catalog.attack[i] * current.get("attack", 0) + catalog.defense[i] * current.get("defense", 0)
+            for words, bonus in current.get("name_bonus", ()):
+                if self._mask(words)[i]:
+                    score += bonus
+            score += catalog.values[i] * current.get("value", 0)
+            if self._consumable[i]:
+                score += CONSUMABLE_BONUS
+            column.append(max(int(score), 0))
+        return column
+
+    def _compute_numpy(self, rule):
+        score = self._linear_numpy(rule)
+        alternative = rule.get("when_name")
+        if alternative:
+            mask = np.array(self._mask(alternative[0]), dtype=bool)
+            score = np.where(mask, self._linear_numpy(alternative[1]), score)
+        # mesma ordem de operações do calculate_item_score: trunca como int()
+        return np.maximum(np.trunc(score).astype(np.int64), 0)
+
+    def _linear_numpy(self, rule):
+        catalog = self._catalog
+        attack = np.array(catalog.attack, dtype=np.int64)
+        defense = np.array(catalog.defense, dtype=np.int64)
+        values = np.array(catalog.values, dtype=np.int64)
+
+        score = attack * rule.get("attack", 0) + defense * rule.get("defense", 0)
+        for words, bonus in rule.get("name_bonus", ()):
+            score = score + np.array(self._mask(words), dtype=np.int64) * bonus
+        score = score + values * rule.get("value", 0)
+        return score + np.array(self._consumable, dtype=np.int64) * CONSUMABLE_BONUS
 
 def prepare_items_for_knapsack(items, race_key):
     """
@@ -57,14 +196,23 @@ def prepare_items_for_knapsack(items, race_key):
     """
     processed_items = []
     for item in items:
-        new_item = item.copy()
-        # Salva o valor original e define o 'value' como o Score calculado
-        new_item["real_value"] = item["value"] 
-        new_item["value"] = calculate_item_score(item, race_key)
-        
-        # Adiciona uma tag pra mostrar que o item é "favorito" da raça
-        if new_item["value"] > item["value"] * 2: # Se o score for muito alto
-            new_item["is_favorite"] = True
-            
-        processed_items.append(new_item)
-    return processed_items
\ No newline at end of file
+        processed_items.append(_prepared_item(dict(item), calculate_item_score(item, race_key)))
+    return processed_items
+
+def prepare_chosen_items(catalog, ids, scores):
+    """
+    Monta, só para os itens escolhidos, o mesmo dict que o
+    `prepare_items_for_knapsack` geraria (com "real_value" e "is_favorite").
+    """
+    return [_prepared_item(catalog.to_dict(i), scores[i]) for i in ids]
+
+def _prepared_item(new_item, score):
+    # Salva o valor original e define o 'value' como o Score calculado
+    new_item["real_value"] = new_item["value"]
+    new_item["value"] = score
+
+    # Adiciona uma tag pra mostrar que o item é "favorito" da raça
+    if score > new_item["real_value"] * 2: # Se o score for muito alto
+        new_item["is_favorite"] = True
+
+    return new_item
@@ -0,0 +1,170 @@
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class _NullSpan:
+    """Span que não faz nada: o que `span()` devolve com a instrumentação desligada."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("owner", "name", "start")
+
+    def __init__(self, owner, name: str):
+        self.owner = owner
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.owner.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Instrumentation:
+    """
+    Medição leve das etapas do app: spans nomeados (tempo de cada etapa),
+    contadores (ex.: células da DP), notas com a última decisão de cada tipo
+    (ex.: qual motor resolveu a DP e por quê) e captura opcional com cProfile (dos
+    trechos marcados com `profiled()`, em qualquer thread).
+    Cada span guarda as últimas `window` medições para os percentis.
+    Desligada, `span()` devolve sempre o mesmo objeto vazio e `count()` só
+    testa uma flag, então pode ficar no caminho quente.
+    """
+    def __init__(self, window: int = 200):
+        self.window = window
+        self.enabled = False
+        self.samples = {}
+        self.counters = {}
+        self.notes = {}
+        self._profiles = None  # perfis coletados na captura atual (None = desligada)
+        self._profile_lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.samples.clear()
+        self.counters.clear()
+        self.notes.clear()
+
+    def span(self, name: str):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name: str, seconds: float):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def count(self, name: str, amount: int = 1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def note(self, name: str, text: str):
+        """Guarda a última ocorrência de `name` (ex.: "engine" -> motor e motivo)."""
+        if self.enabled:
+            self.notes[name] = text
+
+    # --- cProfile ---
+
+    @property
+    def profiling(self) -> bool:
+        return self._profiles is not None
+
+    def start_profile(self):
+        """Liga a captura: cada bloco `profiled()` que rodar a partir daqui entra no relatório."""
+        with self._profile_lock:
+            if self._profiles is None:
+                self._profiles = []
+
+    @contextmanager
+    def profiled(self):
+        """
+        Roda o bloco sob um cProfile da thread atual, se a captura estiver
+        ligada. O cProfile só enxerga a thread em que foi ligado, então a
+        medição precisa ser feita na thread do trabalho (ex.: a dos solves).
+        """
+        profiles = self._profiles
+        if profiles is None:
+            yield
+            return
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            with self._profile_lock:
+                profiles.append(profiler)  # se a captura já parou, a lista antiga é só descartada
+
+    def stop_profile(self, limit: int = 20) -> str:
+        """
+        Para a captura e devolve as funções mais caras (tempo acumulado) em
+        texto, somando os perfis de todas as threads medidas.
+        """
+        with self._profile_lock:
+            profiles, self._profiles = self._profiles, None
+        if profiles is None:
+            return ""
+        if not profiles:
+            return "Nenhum solve rodou durante a captura.\n"
+        out = io.StringIO()
+        stats = pstats.Stats(profiles[0], stream=out)
+        for profiler in profiles[1:]:
+            stats.add(profiler)
+        stats.sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+    # --- relatórios ---
+
+    def percentiles(self, name: str) -> dict:
+        samples = sorted(self.samples.get(name, ()))
+        if not samples:
+            return {"count": 0}
+
+        def pick(q):
+            return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+        return {
+            "count": len(samples),
+            "p50_ms": pick(0.50) * 1000,
+            "p90_ms": pick(0.90) * 1000,
+            "p99_ms": pick(0.99) * 1000,
+            "max_ms": samples[-1] * 1000,
+        }
+
+    def snapshot(self) -> dict:
+        return {
+            "spans": {name: self.percentiles(name) for name in sorted(self.samples)},
+            "counters": dict(self.counters),
+            "notes": dict(self.notes),
+        }
+
+    def dump(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+
+# Instância compartilhada pelo app e pelos módulos do solver
+instrumentation = Instrumentation()
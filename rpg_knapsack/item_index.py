@@ -0,0 +1,115 @@
+from bisect import bisect_left
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional; sem ele as ordenações usam sorted()
+    np = None
+
+# Chaves de ordenação da tabela de itens e a coluna do ItemCatalog de cada uma
+SORT_COLUMNS = {"weight": "weights", "value": "values", "attack": "attack", "defense": "defense"}
+SORT_KEYS = ("name",) + tuple(SORT_COLUMNS)
+
+# Maior caractere possível: prefixo + ele é o limite superior da faixa do prefixo
+_PREFIX_END = "\U0010ffff"
+
+
+class ItemIndex:
+    """
+    Índices de ordenação e filtro do catálogo para a tabela de itens.
+    Cada ordenação (por nome, peso, valor, ataque, defesa) é montada uma vez,
+    no primeiro uso, e a busca por prefixo do nome é uma busca binária sobre
+    os nomes já ordenados, então filtrar e reordenar não percorre o catálogo.
+    Se o catálogo mudar (`version`), os índices são refeitos.
+    """
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self._reset()
+
+    def _reset(self):
+        self.version = self.catalog.version
+        self._orders = {}
+        self._ranks = {}
+        self._sorted_names = None
+        self._by_type = None
+
+    def _fresh(self):
+        if self.catalog.version != self.version:
+            self._reset()
+
+    def order(self, key: str) -> list:
+        """Ids em ordem crescente de `key` (empates pelo id)."""
+        self._fresh()
+        order = self._orders.get(key)
+        if order is None:
+            if key == "name":
+                lowered = [name.lower() for name in self.catalog.names]
+                order = sorted(range(len(lowered)), key=lowered.__getitem__)
+                self._sorted_names = [lowered[i] for i in order]
+            elif key not in SORT_COLUMNS:
+                raise ValueError(f"Ordenação desconhecida: {key}")
+            elif np is not None:
+                column = np.asarray(getattr(self.catalog, SORT_COLUMNS[key]), dtype=np.int64)
+                order = np.argsort(column, kind="stable").tolist()
+            else:
+                column = getattr(self.catalog, SORT_COLUMNS[key])
+                order = sorted(range(len(column)), key=column.__getitem__)
+            self._orders[key] = order
+        return order
+
+    def rank(self, key: str) -> list:
+        """Posição de cada id na ordenação por `key`; ordena um subconjunto sem comparar valores."""
+        rank = self._ranks.get(key)
+        if rank is None:
+            order = self.order(key)
+            rank = [0] * len(order)
+            for position, item_id in enumerate(order):
+                rank[item_id] = position
+            self._ranks[key] = rank
+        return rank
+
+    def types(self) -> list:
+        """Tipos de item existentes no catálogo, em ordem alfabética."""
+        return sorted(t for t in self._type_ids() if t)
+
+    def _type_ids(self) -> dict:
+        """tipo -> ids do tipo, em ordem de id."""
+        self._fresh()
+        if self._by_type is None:
+            self._by_type = {}
+            for item_id, item_type in enumerate(self.catalog.types):
+                self._by_type.setdefault(item_type, []).append(item_id)
+        return self._by_type
+
+    def prefix_range(self, prefix: str) -> list:
+        """Ids cujo nome começa com `prefix` (sem diferenciar maiúsculas), em ordem de nome."""
+        order = self.order("name")
+        prefix = prefix.lower()
+        lo = bisect_left(self._sorted_names, prefix)
+        hi = bisect_left(self._sorted_names, prefix + _PREFIX_END, lo)
+        return order[lo:hi]
+
+    def query(self, prefix: str = "", item_type: str = None, sort: str = None, descending: bool = False):
+        """
+        Ids que passam nos filtros, na ordem pedida. Sem `sort` os itens ficam
+        na ordem do catálogo; sem filtros e sem `sort` nenhum índice é montado.
+        """
+        self._fresh()
+        prefix = prefix.strip()
+        ids = None
+        sorted_by = None
+        if prefix:
+            ids = self.prefix_range(prefix)
+            sorted_by = "name"
+        if item_type:
+            if ids is None:
+                ids = self._type_ids().get(item_type, [])
+            else:
+                types = self.catalog.types
+                ids = [i for i in ids if types[i] == item_type]
+
+        if ids is None:
+            ids = self.order(sort) if sort else range(len(self.catalog))
+        elif sort != sorted_by:
+            ids = sorted(ids, key=self.rank(sort).__getitem__) if sort else sorted(ids)
+
+        return ids[::-1] if descending else ids
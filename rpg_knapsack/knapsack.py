@@ -1,11 +1,89 @@
-def knapsack(items: list, max_weight: int) -> tuple[int, list, list]:
+from typing import NamedTuple
+
+from instrumentation import instrumentation
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional; sem ele usamos só o motor em Python puro
+    np = None
+
+# Abaixo desse número de células (n * (W+1)) o custo de montar arrays NumPy
+# não compensa e o laço em Python puro é mais rápido.
+NUMPY_MIN_CELLS = 2048
+
+# Modelo de custo do seletor, em "células da DP em Python puro":
+# NumPy faz ~17 células no tempo de uma, mas paga ~60 células por linha;
+# cada nó do branch-and-bound custa ~6 células.
+NUMPY_SPEEDUP = 17
+NUMPY_ROW_OVERHEAD = 60
+BRANCH_NODE_COST = 6
+BRANCH_BOUND_MAX_ITEMS = 30
+
+ENGINES = ("python", "numpy", "by_value", "branch_bound")
+# Só os motores indexados por peso respondem todas as capacidades (sweep) e
+# desempatam igual à tabela completa
+WEIGHT_ENGINES = ("python", "numpy")
+
+# O callback `progress(linhas_feitas, total)` é chamado a cada ~PROGRESS_CELLS
+# células da DP (e uma vez no início e no fim).
+PROGRESS_CELLS = 1 << 16
+
+
+class SolveCancelled(Exception):
+    """Levantada pelo callback de progresso para interromper uma DP em andamento."""
+
+
+class EngineChoice(NamedTuple):
+    engine: str
+    reason: str
+    estimates: dict  # custo estimado de cada motor considerado
+
+
+def knapsack(items: list, max_weight: int, lean: bool = False, engine: str = "auto",
+             progress=None) -> tuple[int, list, list]:
+    """
+    Resolve a mochila 0/1 sobre `items` (dicts com "weight" e "value").
+
+    Com `lean=True` a tabela completa não é construída: guardamos apenas uma
+    linha 1-D de valores e os bits de decisão ("pegou o item?") de cada item,
+    empacotados em um bytearray (n * (W+1) / 8 bytes). Nesse modo o terceiro
+    elemento retornado é None, mas `best_score` e `chosen` são os mesmos.
+
+    `engine` escolhe o motor: "python", "numpy" ou "auto" (NumPy para
+    entradas grandes, se estiver instalado). Os motores retornam exatamente o
+    mesmo `best_score` e os mesmos itens em `chosen`. No modo enxuto também
+    valem "by_value" e "branch_bound" (ver `select_engine`): mesmo score, mas
+    em caso de empate podem escolher outros itens.
+
+    `progress(linhas_feitas, total)` é chamado de tempos em tempos durante a
+    DP; para cancelar, o callback levanta `SolveCancelled`, que sobe daqui.
+    O branch-and-bound (instâncias pequenas) não chama o callback.
+    """
+    weights = [item["weight"] for item in items]
+    values = [item["value"] for item in items]
+
+    if lean:
+        # "auto" aqui fica só nos motores indexados por peso, que desempatam igual à tabela
+        if engine == "auto":
+            engine = _choose_engine(weights, values, max_weight, WEIGHT_ENGINES)
+        best, chosen_idx = knapsack_ids(weights, values, max_weight, engine=engine, progress=progress)
+        return best, [items[i] for i in chosen_idx], None
+
+    if _pick_engine(values, max_weight, engine) == "numpy":
+        best, chosen_idx, dp = _knapsack_numpy(weights, values, max_weight, keep_table=True, progress=progress)
+        return best, [items[i] for i in chosen_idx], dp
+
     n = len(items)
+    instrumentation.count("dp_cells", n * (max_weight + 1))
 
     # DP[i][w] = melhor valor usando itens até i com peso máximo w
     dp = [[0] * (max_weight + 1) for _ in range(n + 1)]
 
     # Computando a tabela
+    step = _progress_every(max_weight + 1)
     for i in range(1, n + 1):
+        if progress is not None and (i - 1) % step == 0:
+            progress(i - 1, n)
         item_weight = items[i-1]["weight"]
         item_value = items[i-1]["value"]
 
@@ -18,6 +96,9 @@ def knapsack(items: list, max_weight: int) -> tuple[int, list, list]:
             else:
                 dp[i][w] = dp[i-1][w]
 
+    if progress is not None:
+        progress(n, n)
+
     # Reconstrução dos itens usados
     chosen = []
     w = max_weight
@@ -28,3 +109,446 @@ def knapsack(items: list, max_weight: int) -> tuple[int, list, list]:
             w -= items[i-1]["weight"]
 
     return dp[n][max_weight], chosen[::-1], dp
+
+
+def knapsack_ids(weights, values, max_weight: int, ids=None, engine: str = "auto",
+                 progress=None) -> tuple[int, list]:
+    """
+    `knapsack()` sobre colunas: `weights` e `values` indexados pelo id do item
+    (ex.: `ItemCatalog.weights`). Com `ids`, só esses itens entram na DP.
+    Sempre no modo enxuto; retorna o melhor valor e os ids escolhidos.
+    `progress` funciona como em `knapsack()`.
+    """
+    if ids is None:
+        ids = range(len(weights))
+    else:
+        weights = [weights[i] for i in ids]
+        values = [values[i] for i in ids]
+
+    if engine == "auto":
+        engine = _choose_engine(weights, values, max_weight)
+
+    if engine == "by_value":
+        best, chosen = _knapsack_by_value(weights, values, max_weight, progress)
+    elif engine == "branch_bound":
+        best, chosen = _knapsack_branch_bound(weights, values, max_weight)
+    elif _pick_engine(values, max_weight, engine) == "numpy":
+        best, chosen, _ = _knapsack_numpy(weights, values, max_weight, keep_table=False, progress=progress)
+    else:
+        best, chosen = _knapsack_lean(weights, values, max_weight, progress)
+    return best, [ids[k] for k in chosen]
+
+
+def select_engine(weights, values, max_weight: int, engines=ENGINES) -> EngineChoice:
+    """
+    Estima o custo de cada motor exato e escolhe o mais barato:
+    - "python"/"numpy": DP indexada por peso, ~n * W células;
+    - "by_value": DP indexada por score (menor peso para cada score), ~n * soma(scores);
+    - "branch_bound": busca com limite guloso fracionário, até 2^n nós (só n pequeno).
+    O motivo da escolha vem em `reason` e as estimativas em `estimates`.
+    """
+    usable = [i for i in range(len(weights)) if weights[i] <= max_weight and values[i] > 0]
+    n = len(usable)
+    integral = all(isinstance(values[i], int) for i in usable)
+    total_value = sum(values[i] for i in usable) if integral else None
+
+    weight_cells = len(weights) * (max_weight + 1)
+    estimates = {}
+    if "python" in engines:
+        estimates["python"] = weight_cells
+    # abaixo de NUMPY_MIN_CELLS montar os arrays custa mais que a DP (mesmo corte do `_pick_engine`)
+    if "numpy" in engines and np is not None and weight_cells >= NUMPY_MIN_CELLS and _numpy_dtype(values) is not None:
+        estimates["numpy"] = weight_cells // NUMPY_SPEEDUP + len(weights) * NUMPY_ROW_OVERHEAD
+    if "by_value" in engines and integral:
+        value_cells = n * (total_value + 1)
+        if np is not None:
+            value_cells = value_cells // NUMPY_SPEEDUP + n * NUMPY_ROW_OVERHEAD
+        estimates["by_value"] = value_cells
+    if "branch_bound" in engines and n <= BRANCH_BOUND_MAX_ITEMS:
+        estimates["branch_bound"] = BRANCH_NODE_COST * 2 ** n
+
+    if not estimates:
+        raise ValueError("Nenhum dos motores pedidos serve para esta entrada")
+
+    engine = min(estimates, key=estimates.get)
+    if engine in ("python", "numpy"):
+        reason = f"n·W = {weight_cells} células"
+        if "by_value" in estimates:
+            reason += f", menor que n·ΣV = {n * (total_value + 1)}"
+    elif engine == "by_value":
+        reason = f"n·ΣV = {n * (total_value + 1)} células, menor que n·W = {weight_cells}"
+    else:
+        reason = f"só {n} itens úteis: até 2^{n} nós custa menos que as DPs"
+    if engine == "numpy":
+        reason += " (vetorizado com NumPy)"
+    return EngineChoice(engine, reason, estimates)
+
+
+def _choose_engine(weights, values, max_weight: int, engines=ENGINES) -> str:
+    """
+    `select_engine` para um pedido com engine="auto", deixando a escolha
+    visível no diagnóstico: um contador por motor ("engine_numpy", ...) e a
+    nota "engine" com o motor e o motivo da última escolha.
+    """
+    choice = select_engine(weights, values, max_weight, engines)
+    instrumentation.count(f"engine_{choice.engine}")
+    instrumentation.note("engine", f"{choice.engine}: {choice.reason}")
+    return choice.engine
+
+
+class CapacitySweep:
+    """
+    Resultado de uma única DP até `max_weight`: a última linha já tem o melhor
+    score para toda capacidade 0..max_weight, e os bits de decisão permitem
+    reconstruir a mochila de qualquer uma delas sob demanda.
+
+    `scale` é o mdc usado quando os pesos foram divididos antes da DP
+    (capacidade c da instância original = c // scale na DP).
+    """
+    def __init__(self, ids, weights, row: list, bits, row_bytes: int, max_weight: int, scale: int = 1):
+        self.ids = ids
+        self.max_weight = max_weight
+        self.scale = scale
+        self._weights = weights
+        self._row = row
+        self._bits = bits
+        self._row_bytes = row_bytes
+        self._chosen = {}
+
+    def _column(self, capacity: int) -> int:
+        if not 0 <= capacity <= self.max_weight:
+            raise ValueError(f"Capacidade {capacity} fora do intervalo resolvido (0..{self.max_weight})")
+        return capacity // self.scale
+
+    def best_score(self, capacity: int) -> int:
+        return self._row[self._column(capacity)]
+
+    def best_scores(self) -> list:
+        """Melhor score para cada capacidade de 0 até `max_weight`."""
+        return [self._row[c // self.scale] for c in range(self.max_weight + 1)]
+
+    def mapped(self, ids, max_weight: int, scale: int) -> "CapacitySweep":
+        """
+        A mesma DP vista pela instância original: `ids[k]` é o id original do
+        item k desta DP e `max_weight` a capacidade antes da divisão por `scale`.
+        """
+        return CapacitySweep(
+            [ids[k] for k in self.ids], self._weights, self._row, self._bits,
+            self._row_bytes, max_weight, scale,
+        )
+
+    def chosen(self, capacity: int) -> list:
+        """Ids dos itens escolhidos para `capacity` (reconstruído só quando pedido)."""
+        column = self._column(capacity)
+        if column not in self._chosen:
+            path = _reconstruct_from_bits(self._weights, self._bits, self._row_bytes, column)
+            self._chosen[column] = [self.ids[k] for k in path]
+        return self._chosen[column]
+
+
+def knapsack_sweep(weights, values, max_weight: int, ids=None, engine: str = "auto",
+                   progress=None) -> CapacitySweep:
+    """Como `knapsack_ids`, mas guarda a resposta de todas as capacidades até `max_weight`."""
+    if ids is None:
+        ids = range(len(weights))
+    else:
+        weights = [weights[i] for i in ids]
+        values = [values[i] for i in ids]
+
+    if engine == "auto":
+        engine = _choose_engine(weights, values, max_weight, WEIGHT_ENGINES)
+    row, bits, row_bytes = _fill(weights, values, max_weight, engine, progress)
+    return CapacitySweep(ids, weights, row, bits, row_bytes, max_weight)
+
+
+def knapsack_step(row: list, item_weight: int, item_value: int) -> tuple[list, bytearray]:
+    """
+    Acrescenta um item sobre uma linha já calculada da DP (dp[i-1]).
+    Retorna a nova linha (dp[i]) e os bits de decisão do item, no mesmo
+    formato de `_knapsack_lean`, para quem quer guardar a DP linha a linha.
+    """
+    max_weight = len(row) - 1
+    instrumentation.count("dp_cells", max_weight + 1)
+    new_row = row[:]
+    bits = bytearray((max_weight >> 3) + 1)
+
+    for w in range(item_weight, max_weight + 1):
+        candidate = row[w - item_weight] + item_value
+        if candidate > row[w]:
+            new_row[w] = candidate
+            bits[w >> 3] |= 1 << (w & 7)
+
+    return new_row, bits
+
+
+def _knapsack_lean(weights: list, values: list, max_weight: int, progress=None) -> tuple[int, list]:
+    """
+    Versão enxuta: linha única de valores + bits de decisão por item.
+    Retorna o melhor valor e os índices dos itens escolhidos (em ordem).
+    """
+    row, bits, row_bytes = _fill_lean(weights, values, max_weight, progress)
+    return row[max_weight], _reconstruct_from_bits(weights, bits, row_bytes, max_weight)
+
+
+def _fill_lean(weights: list, values: list, max_weight: int, progress=None) -> tuple[list, bytearray, int]:
+    """Preenche a linha final da DP e os bits de decisão (motor em Python puro)."""
+    n = len(weights)
+    instrumentation.count("dp_cells", n * (max_weight + 1))
+    row_bytes = (max_weight >> 3) + 1
+    row = [0] * (max_weight + 1)
+    # bits[i * row_bytes + (w >> 3)] guarda se o item i foi usado na capacidade w
+    bits = bytearray(n * row_bytes)
+
+    step = _progress_every(max_weight + 1)
+    for i in range(n):
+        if progress is not None and i % step == 0:
+            progress(i, n)
+        item_weight = weights[i]
+        item_value = values[i]
+        base = i * row_bytes
+
+        # Percorre a capacidade de trás pra frente para reaproveitar a mesma linha
+        for w in range(max_weight, item_weight - 1, -1):
+            candidate = row[w - item_weight] + item_value
+            if candidate > row[w]:
+                row[w] = candidate
+                bits[base + (w >> 3)] |= 1 << (w & 7)
+
+    if progress is not None:
+        progress(n, n)
+    return row, bits, row_bytes
+
+
+def _fill(weights, values, max_weight: int, engine: str, progress=None) -> tuple[list, object, int]:
+    """Linha final (lista de int) + bits de decisão achatados, com o motor escolhido."""
+    if _pick_engine(values, max_weight, engine) == "numpy":
+        row, bits = _fill_numpy(weights, values, max_weight, progress=progress)
+        return row.tolist(), bits.ravel(), bits.shape[1]
+    return _fill_lean(weights, values, max_weight, progress)
+
+
+def _progress_every(row_cells: int) -> int:
+    """De quantas em quantas linhas chamar o callback de progresso."""
+    return max(1, PROGRESS_CELLS // max(row_cells, 1))
+
+
+def _reconstruct_from_bits(weights: list, bits, row_bytes: int, capacity: int) -> list:
+    """Refaz o caminho da DP a partir dos bits de decisão, começando em `capacity`."""
+    chosen = []
+    w = capacity
+    for i in range(len(weights) - 1, -1, -1):
+        if bits[i * row_bytes + (w >> 3)] >> (w & 7) & 1:
+            chosen.append(i)
+            w -= weights[i]
+    return chosen[::-1]
+
+
+def _pick_engine(values: list, max_weight: int, engine: str) -> str:
+    """Decide entre o motor em Python puro e o vetorizado com NumPy."""
+    if engine == "python":
+        return "python"
+    if engine == "numpy":
+        if np is None:
+            raise ImportError("O motor 'numpy' precisa do pacote numpy instalado")
+        if _numpy_dtype(values) is None:
+            raise ValueError("Valores não inteiros ou grandes demais para o motor 'numpy'")
+        return "numpy"
+    if engine != "auto":
+        raise ValueError(f"Motor desconhecido: {engine}")
+
+    if np is None or len(values) * (max_weight + 1) < NUMPY_MIN_CELLS:
+        return "python"
+    return "numpy" if _numpy_dtype(values) is not None else "python"
+
+
+def _numpy_dtype(values: list):
+    """
+    Menor dtype inteiro que comporta qualquer soma de valores sem overflow,
+    ou None se algum valor não for inteiro (aí só o motor em Python serve).
+    """
+    total = 0
+    for value in values:
+        if not isinstance(value, int):
+            return None
+        total += abs(value)
+
+    if total <= np.iinfo(np.int32).max:
+        return np.int32
+    if total <= np.iinfo(np.int64).max:
+        return np.int64
+    return None
+
+
+def _knapsack_numpy(weights: list, values: list, max_weight: int, keep_table: bool, progress=None):
+    """
+    Motor vetorizado: cada item atualiza a linha inteira de uma vez com
+    np.maximum(prev, prev deslocada + valor). Os bits de decisão usam a mesma
+    regra do motor em Python (só pega se melhorar estritamente), então a
+    reconstrução escolhe os mesmos itens.
+    """
+    table = None
+    if keep_table:
+        table = np.zeros((len(weights) + 1, max_weight + 1), dtype=_numpy_dtype(values))
+
+    row, bits = _fill_numpy(weights, values, max_weight, table, progress)
+
+    chosen = _reconstruct_from_bits(weights, bits.ravel(), bits.shape[1], max_weight)
+    dp = table.tolist() if table is not None else None
+    return int(row[max_weight]), chosen, dp
+
+
+def _fill_numpy(weights, values, max_weight: int, table=None, progress=None):
+    """Preenche a linha final e os bits (uma linha de bytes por item); grava em `table` se vier."""
+    n = len(weights)
+    instrumentation.count("dp_cells", n * (max_weight + 1))
+    row = np.zeros(max_weight + 1, dtype=_numpy_dtype(values))
+    bits = np.zeros((n, (max_weight >> 3) + 1), dtype=np.uint8)
+    take_row = np.zeros(max_weight + 1, dtype=bool)
+
+    step = _progress_every(max_weight + 1)
+    for i in range(n):
+        if progress is not None and i % step == 0:
+            progress(i, n)
+        item_weight = weights[i]
+        if item_weight <= max_weight:
+            shifted = row[:max_weight + 1 - item_weight] + values[i]
+            take = shifted > row[item_weight:]
+            if take.any():
+                take_row[:item_weight] = False
+                take_row[item_weight:] = take
+                bits[i] = np.packbits(take_row, bitorder="little")
+                np.maximum(row[item_weight:], shifted, out=row[item_weight:])
+        if table is not None:
+            table[i + 1] = row
+
+    if progress is not None:
+        progress(n, n)
+    return row, bits
+
+
+def _knapsack_by_value(weights, values, max_weight: int, progress=None) -> tuple[int, list]:
+    """
+    DP indexada por score: min_weight[s] = menor peso que soma exatamente s.
+    Boa quando os pesos são grandes (ex.: gramas) e os scores pequenos.
+    Itens com score <= 0 ou mais pesados que a mochila nunca entram.
+    """
+    usable = [i for i in range(len(weights)) if weights[i] <= max_weight and values[i] > 0]
+    return _solve_by_value(weights, values, usable, sum(values[i] for i in usable), max_weight, progress)
+
+
+def _solve_by_value(weights, values, usable: list, total: int, max_weight: int, progress=None) -> tuple[int, list]:
+    """
+    Miolo do `_knapsack_by_value` sobre os índices `usable`, com a linha da DP
+    indo só até o score `total` (somas acima dele ficam de fora).
+    """
+    instrumentation.count("dp_cells", len(usable) * (total + 1))
+
+    if np is not None and len(usable) * (total + 1) >= NUMPY_MIN_CELLS:
+        min_weight, bits, row_bytes = _fill_by_value_numpy(weights, values, usable, total, max_weight, progress)
+    else:
+        min_weight, bits, row_bytes = _fill_by_value(weights, values, usable, total, max_weight, progress)
+
+    best = max(s for s in range(total + 1) if min_weight[s] <= max_weight)
+
+    chosen = []
+    s = best
+    for k in range(len(usable) - 1, -1, -1):
+        if bits[k * row_bytes + (s >> 3)] >> (s & 7) & 1:
+            chosen.append(usable[k])
+            s -= values[usable[k]]
+    return best, chosen[::-1]
+
+
+def _fill_by_value(weights, values, usable: list, total: int, max_weight: int, progress=None):
+    unreachable = max_weight + 1
+    min_weight = [0] + [unreachable] * total
+    row_bytes = (total >> 3) + 1
+    bits = bytearray(len(usable) * row_bytes)
+
+    reachable = 0
+    step = _progress_every(total + 1)
+    for k, i in enumerate(usable):
+        if progress is not None and k % step == 0:
+            progress(k, len(usable))
+        item_weight = weights[i]
+        item_value = values[i]
+        base = k * row_bytes
+        reachable = min(reachable + item_value, total)
+
+        for s in range(reachable, item_value - 1, -1):
+            candidate = min_weight[s - item_value] + item_weight
+            if candidate < min_weight[s] and candidate <= max_weight:
+                min_weight[s] = candidate
+                bits[base + (s >> 3)] |= 1 << (s & 7)
+
+    if progress is not None:
+        progress(len(usable), len(usable))
+    return min_weight, bits, row_bytes
+
+
+def _fill_by_value_numpy(weights, values, usable: list, total: int, max_weight: int, progress=None):
+    unreachable = max_weight + 1
+    min_weight = np.full(total + 1, unreachable, dtype=np.int64)
+    min_weight[0] = 0
+    bits = np.zeros((len(usable), (total >> 3) + 1), dtype=np.uint8)
+    take_row = np.zeros(total + 1, dtype=bool)
+
+    step = _progress_every(total + 1)
+    for k, i in enumerate(usable):
+        if progress is not None and k % step == 0:
+            progress(k, len(usable))
+        item_value = values[i]
+        shifted = min_weight[:total + 1 - item_value] + weights[i]
+        take = (shifted < min_weight[item_value:]) & (shifted <= max_weight)
+        if take.any():
+            take_row[:item_value] = False
+            take_row[item_value:] = take
+            bits[k] = np.packbits(take_row, bitorder="little")
+            min_weight[item_value:][take] = shifted[take]
+
+    if progress is not None:
+        progress(len(usable), len(usable))
+    return min_weight.tolist(), bits.ravel(), bits.shape[1]
+
+
+def _knapsack_branch_bound(weights, values, max_weight: int) -> tuple[int, list]:
+    """
+    Branch-and-bound em profundidade com os itens em ordem de score/peso.
+    O limite de cada nó é o guloso fracionário (relaxação linear), calculado
+    com divisão inteira para não podar errado por arredondamento.
+    """
+    order = [i for i in range(len(weights)) if weights[i] <= max_weight and values[i] > 0]
+    # peso zero primeiro (razão infinita), depois maior score por peso
+    order.sort(key=lambda i: (weights[i] != 0, -values[i] / (weights[i] or 1)))
+    item_weights = [weights[i] for i in order]
+    item_values = [values[i] for i in order]
+    n = len(order)
+
+    best = [0, []]
+    taken = []
+    nodes = [0]
+
+    def upper_bound(k: int, capacity: int, value: int) -> int:
+        while k < n and item_weights[k] <= capacity:
+            capacity -= item_weights[k]
+            value += item_values[k]
+            k += 1
+        if k < n:
+            value += capacity * item_values[k] // item_weights[k]
+        return value
+
+    def visit(k: int, capacity: int, value: int):
+        nodes[0] += 1
+        if value > best[0]:
+            best[0], best[1] = value, taken[:]
+        if k == n or upper_bound(k, capacity, value) <= best[0]:
+            return
+        if item_weights[k] <= capacity:
+            taken.append(k)
+            visit(k + 1, capacity - item_weights[k], value + item_values[k])
+            taken.pop()
+        visit(k + 1, capacity, value)
+
+    visit(0, max_weight, 0)
+    instrumentation.count("bb_nodes", nodes[0])
+    return best[0], sorted(order[k] for k in best[1])
@@ -0,0 +1,221 @@
+import time
+from typing import NamedTuple
+
+from approx import lp_bound
+from instrumentation import instrumentation
+from reduction import knapsack_reduced_ids
+
+# Até quantos itens úteis o grupo é resolvido de forma exata (branch-and-bound);
+# acima disso, ou se a busca passar de PARTY_EXACT_NODES nós, vale a heurística.
+PARTY_EXACT_MAX_ITEMS = 20
+PARTY_EXACT_NODES = 200_000
+
+# Orçamento padrão da heurística (segundos): cabe numa sala de dungeon interativa
+PARTY_TIME_BUDGET = 0.05
+
+
+class PartyResult(NamedTuple):
+    score: int              # soma dos scores de todos os membros
+    assignment: list        # por membro, ids dos itens que ele leva
+    member_scores: list     # score de cada membro (na coluna da raça dele)
+    upper_bound: int        # nenhuma divisão do loot passa disso
+    method: str             # "exact" ou "heuristic"
+
+    @property
+    def gap(self) -> int:
+        """Quanto, no pior caso, falta para a melhor divisão possível (0 no exato)."""
+        return self.upper_bound - self.score
+
+
+def solve_party(weights, columns: list, capacities: list, ids=None, exact_max_items: int = PARTY_EXACT_MAX_ITEMS,
+                time_budget: float = PARTY_TIME_BUDGET, progress=None) -> PartyResult:
+    """
+    Divide os itens entre as mochilas de um grupo: o membro j tem capacidade
+    `capacities[j]` e vê o item i com score `columns[j][i]` (a coluna da raça
+    dele, ex.: `ScoreMatrix.column(raça)`). Cada item vai para no máximo um
+    membro e a soma dos scores é maximizada.
+
+    Resolver um membro por vez (knapsack do primeiro, o que sobrou para o
+    segundo...) depende da ordem e deixa score na mesa. Aqui, com até
+    `exact_max_items` itens úteis, um branch-and-bound acha a divisão ótima;
+    acima disso (ou se a busca não terminar a tempo) a heurística monta uma
+    divisão pelo membro que mais valoriza cada item e a melhora re-resolvendo
+    cada membro e cada par de membros até não melhorar mais. As duas fases
+    dividem o mesmo `time_budget`: o tempo gasto na busca exata sai do da heurística.
+
+    O limite superior (`upper_bound`) é o menor entre a relaxação linear com
+    todas as mochilas somadas (cada item valendo o score do membro que mais o
+    valoriza) e a soma das relaxações de cada membro sozinho.
+    `progress(rodadas_feitas, total)` é chamado entre as rodadas da heurística.
+    """
+    if len(columns) != len(capacities):
+        raise ValueError("Informe uma coluna de scores por membro do grupo")
+    if ids is None:
+        ids = range(len(weights))
+    members = range(len(capacities))
+    usable = [
+        i for i in ids
+        if any(weights[i] <= capacities[j] and columns[j][i] > 0 for j in members)
+    ]
+
+    deadline = time.perf_counter() + time_budget
+    bound = _upper_bound(weights, columns, capacities, usable)
+    assignment = None
+    if len(usable) <= exact_max_items:
+        assignment = _party_branch_bound(weights, columns, capacities, usable, bound, deadline)
+    method = "exact"
+    if assignment is None:
+        assignment = _party_heuristic(weights, columns, capacities, usable, deadline, progress)
+        method = "heuristic"
+
+    member_scores = [sum(columns[j][i] for i in assignment[j]) for j in members]
+    score = sum(member_scores)
+    if method == "exact":
+        bound = score
+    return PartyResult(score, [sorted(chosen) for chosen in assignment], member_scores, bound, method)
+
+
+def _upper_bound(weights, columns, capacities, usable: list):
+    members = range(len(capacities))
+    best = {}
+    for i in usable:
+        best[i] = max(columns[j][i] for j in members if weights[i] <= capacities[j])
+    pooled = lp_bound(weights, best, sum(capacities), ids=usable)
+    separate = sum(lp_bound(weights, columns[j], capacities[j], ids=usable) for j in members)
+    return min(pooled, separate)
+
+
+def _best_ratio_order(weights, columns, capacities, usable: list) -> list:
+    def key(i):
+        value = max(columns[j][i] for j in range(len(capacities)))
+        # peso zero primeiro (razão infinita), depois maior score por peso
+        return weights[i] != 0, -value / (weights[i] or 1)
+    return sorted(usable, key=key)
+
+
+def _party_branch_bound(weights, columns, capacities, usable: list, bound, deadline: float):
+    """
+    Busca em profundidade: cada item (na ordem da melhor razão score/peso)
+    vai para um dos membros em que cabe, ou para nenhum. O limite de cada nó
+    é a relaxação linear com as capacidades que sobraram somadas. Membros
+    iguais (mesmos scores nos itens úteis e mesma capacidade livre) só são
+    tentados uma vez: a comparação é pelo conteúdo, então colunas iguais em
+    objetos diferentes (ex.: dois membros da mesma raça) também contam.
+    Retorna None se passar de PARTY_EXACT_NODES nós ou do `deadline`.
+    """
+    order = _best_ratio_order(weights, columns, capacities, usable)
+    members = range(len(capacities))
+    n = len(order)
+    item_weights = [weights[i] for i in order]
+    item_best = [max(columns[j][i] for j in members) for i in order]
+    # membros com os mesmos scores nos itens úteis recebem a mesma classe
+    signatures = {}
+    member_class = [signatures.setdefault(tuple(columns[j][i] for i in order), j) for j in members]
+
+    remaining = list(capacities)
+    taken = [[] for _ in members]
+    best = [0, None]
+    nodes = [0]
+
+    def upper_bound(k: int, capacity: int, value):
+        while k < n and item_weights[k] <= capacity:
+            capacity -= item_weights[k]
+            value += item_best[k]
+            k += 1
+        if k < n:
+            value += capacity * item_best[k] // item_weights[k]
+        return value
+
+    def visit(k: int, value):
+        nodes[0] += 1
+        if nodes[0] > PARTY_EXACT_NODES or (nodes[0] & 1023 == 0 and time.perf_counter() > deadline):
+            raise _SearchTooLarge
+        if value > best[0] or best[1] is None:
+            best[0], best[1] = value, [chosen[:] for chosen in taken]
+        if k == n or best[0] >= bound or upper_bound(k, sum(remaining), value) <= best[0]:
+            return
+
+        i = order[k]
+        tried = set()
+        for j in sorted(members, key=lambda j: -columns[j][i]):
+            item_value = columns[j][i]
+            twin = (member_class[j], remaining[j])
+            if item_value <= 0 or item_weights[k] > remaining[j] or twin in tried:
+                continue
+            tried.add(twin)
+            remaining[j] -= item_weights[k]
+            taken[j].append(i)
+            visit(k + 1, value + item_value)
+            taken[j].pop()
+            remaining[j] += item_weights[k]
+        visit(k + 1, value)
+
+    try:
+        visit(0, 0)
+    except _SearchTooLarge:
+        return None
+    finally:
+        instrumentation.count("party_nodes", nodes[0])
+    return best[1]
+
+
+class _SearchTooLarge(Exception):
+    pass
+
+
+def _party_heuristic(weights, columns, capacities, usable: list, deadline: float, progress=None) -> list:
+    members = range(len(capacities))
+
+    def solve(j, candidates):
+        _, chosen, _ = knapsack_reduced_ids(weights, columns[j], capacities[j], ids=sorted(candidates))
+        return set(chosen)
+
+    def value(j, chosen):
+        return sum(columns[j][i] for i in chosen)
+
+    # 1) cada item começa com o membro que mais o valoriza (entre os que o carregam)
+    preferred = [[] for _ in members]
+    for i in usable:
+        fits = [j for j in members if weights[i] <= capacities[j]]
+        preferred[max(fits, key=lambda j: columns[j][i])].append(i)
+    assignment = [solve(j, preferred[j]) for j in members]
+    free = set(usable).difference(*assignment)
+
+    # 2) melhora: cada membro re-resolve sobre o que já leva + o que está livre,
+    #    e cada par redistribui entre si (nas duas ordens) o que os dois levam + o livre
+    rounds = 0
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        if progress is not None:
+            progress(rounds, rounds + 1)
+        improved = False
+        for j in members:
+            chosen = solve(j, assignment[j] | free)
+            if value(j, chosen) > value(j, assignment[j]):
+                free = (free | assignment[j]) - chosen
+                assignment[j] = chosen
+                improved = True
+            if time.perf_counter() >= deadline:
+                break
+
+        for a in members:
+            for b in range(a + 1, len(capacities)):
+                if time.perf_counter() >= deadline:
+                    break
+                pool = assignment[a] | assignment[b] | free
+                current = value(a, assignment[a]) + value(b, assignment[b])
+                for first, second in ((a, b), (b, a)):
+                    chosen_first = solve(first, pool)
+                    chosen_second = solve(second, pool - chosen_first)
+                    total = value(first, chosen_first) + value(second, chosen_second)
+                    if total > current:
+                        assignment[first], assignment[second] = chosen_first, chosen_second
+                        free = pool - chosen_first - chosen_second
+                        current = total
+                        improved = True
+        rounds += 1
+
+    if progress is not None:
+        progress(rounds, rounds)
+    instrumentation.count("party_rounds", rounds)
+    return assignment
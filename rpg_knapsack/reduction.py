@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+from math import gcd
+
+from knapsack import CapacitySweep, knapsack_ids, knapsack_sweep
+
+
+@dataclass
+class ReductionReport:
+    """Quanto o pré-processamento encolheu a instância antes da DP."""
+    items_before: int
+    capacity_before: int
+    items_after: int = 0
+    capacity_after: int = 0
+    removed_heavy: int = 0       # mais pesados que a mochila inteira
+    removed_zero: int = 0        # score <= 0 (ex.: arcos para orcs)
+    removed_dominated: int = 0   # sempre trocáveis por um item mais leve e melhor
+    weight_gcd: int = 1
+    all_fit: bool = False        # tudo o que sobrou cabe: DP nem roda
+
+    def summary(self) -> str:
+        return (
+            f"{self.items_before} -> {self.items_after} itens "
+            f"(pesados: {self.removed_heavy}, sem score: {self.removed_zero}, "
+            f"dominados: {self.removed_dominated}), "
+            f"capacidade {self.capacity_before} -> {self.capacity_after} (mdc {self.weight_gcd})"
+        )
+
+
+@dataclass
+class ReducedInstance:
+    weights: list   # já divididos pelo mdc
+    values: list
+    indices: list   # posição original (ou id no catálogo) de cada item reduzido
+    capacity: int
+    report: ReductionReport
+
+
+def reduce_columns(weights, values, max_weight: int, ids=None) -> ReducedInstance:
+    """
+    Encolhe a instância sem mudar o valor ótimo:
+    - descarta itens mais pesados que `max_weight` e itens com score <= 0;
+    - descarta itens dominados (ver `_dominated`);
+    - divide pesos e capacidade pelo mdc dos pesos.
+    `weights`/`values` são indexados pelo id do item; `ids` restringe a
+    instância a esses itens (padrão: todos).
+    """
+    if ids is None:
+        ids = range(len(weights))
+    report = ReductionReport(items_before=len(ids), capacity_before=max_weight)
+
+    survivors = []
+    for i in ids:
+        if weights[i] > max_weight:
+            report.removed_heavy += 1
+        elif values[i] <= 0:
+            report.removed_zero += 1
+        else:
+            survivors.append(i)
+
+    if sum(weights[i] for i in survivors) > max_weight:
+        dominated = _dominated(weights, values, survivors, max_weight)
+        report.removed_dominated = len(dominated)
+        survivors = [i for i in survivors if i not in dominated]
+
+    report.all_fit = sum(weights[i] for i in survivors) <= max_weight
+
+    divisor = 0
+    for i in survivors:
+        divisor = gcd(divisor, weights[i])
+    divisor = divisor or 1
+
+    report.items_after = len(survivors)
+    report.capacity_after = max_weight // divisor
+    report.weight_gcd = divisor
+    return ReducedInstance(
+        [weights[i] // divisor for i in survivors],
+        [values[i] for i in survivors],
+        survivors,
+        report.capacity_after,
+        report,
+    )
+
+
+def knapsack_reduced_ids(weights, values, max_weight: int, ids=None, **kwargs) -> tuple[int, list, ReductionReport]:
+    """
+    Mesmo contrato de `knapsack_ids` (mesmo best_score), mas roda a DP só sobre
+    a instância reduzida; em caso de empate o conjunto escolhido pode diferir.
+    Retorna também o relatório da redução.
+    """
+    reduced = reduce_columns(weights, values, max_weight, ids)
+
+    if reduced.report.all_fit:
+        return sum(reduced.values), reduced.indices, reduced.report
+
+    best, chosen = knapsack_ids(reduced.weights, reduced.values, reduced.capacity, **kwargs)
+    return best, [reduced.indices[k] for k in chosen], reduced.report
+
+
+def knapsack_sweep_reduced(weights, values, max_weight: int, ids=None, **kwargs) -> tuple[CapacitySweep, ReductionReport]:
+    """
+    Como `knapsack_sweep`, com a redução antes da DP. A redução feita para
+    `max_weight` continua exata para qualquer capacidade menor, então o
+    resultado serve todas as capacidades de 0 até `max_weight`.
+    """
+    reduced = reduce_columns(weights, values, max_weight, ids)
+    sweep = knapsack_sweep(reduced.weights, reduced.values, reduced.capacity, **kwargs)
+    return sweep.mapped(reduced.indices, max_weight, reduced.report.weight_gcd), reduced.report
+
+
+def _dominated(weights, values, candidates: list, max_weight: int) -> set:
+    """
+    Item j é dominado por d se d não é mais pesado e não vale menos (empates
+    desfeitos pelo índice). Se j e todos os seus dominadores não cabem juntos
+    na mochila, qualquer solução com j tem um dominador de fora para trocar,
+    então j pode sair sem perder o ótimo.
+
+    Percorre os itens por peso crescente (valor decrescente) mantendo uma
+    árvore de Fenwick com a soma dos pesos já vistos por faixa de valor.
+    """
+    order = sorted(candidates, key=lambda i: (weights[i], -values[i], i))
+
+    # rank 1 = maior valor; prefixo até rank(v) = itens com valor >= v
+    distinct = sorted({values[i] for i in candidates}, reverse=True)
+    rank = {value: r for r, value in enumerate(distinct, start=1)}
+    tree = [0] * (len(distinct) + 1)
+
+    dominated = set()
+    for i in order:
+        weight = weights[i]
+        r = rank[values[i]]
+
+        dominators_weight = 0
+        k = r
+        while k > 0:
+            dominators_weight += tree[k]
+            k -= k & -k
+        if dominators_weight + weight > max_weight:
+            dominated.add(i)
+
+        k = r
+        while k < len(tree):
+            tree[k] += weight
+            k += k & -k
+
+    return dominated
@@ -0,0 +1,115 @@
+from collections import Counter, OrderedDict
+
+# Totais mostrados no painel de resultado
+TOTAL_FIELDS = ("gold", "attack", "defense", "weight")
+
+
+def card_key(item, is_discarded: bool = False) -> tuple:
+    """
+    Tudo que muda a aparência de um card de resultado: o item (id do
+    catálogo; itens soltos, sem id, entram com tudo que o card mostra), a
+    quantidade da pilha e os estados favorito/descartado.
+    """
+    item_id = item.get("id")
+    if item_id is None:
+        stats = item.get("stats") or {}
+        identity = (None, item["name"], item.get("image"), tuple(sorted(stats.items())))
+    else:
+        identity = (item_id,)
+    return identity + (
+        item["weight"],
+        item.get("real_value", item["value"]),
+        item.get("quantity", 1),
+        bool(item.get("is_favorite")) and not is_discarded,
+        is_discarded,
+    )
+
+
+def item_totals(item) -> tuple:
+    """Contribuição do item (pilha inteira) para cada campo de TOTAL_FIELDS."""
+    quantity = item.get("quantity", 1)
+    stats = item.get("stats", {})
+    return (
+        item.get("real_value", item["value"]) * quantity,
+        stats.get("attack", 0) * quantity,
+        stats.get("defense", 0) * quantity,
+        item["weight"] * quantity,
+    )
+
+
+class CardCache:
+    """
+    Cards de resultado reaproveitados entre um solve e outro. A chave é o
+    lugar onde o card aparece (`place`, ex.: "panel", "kept"), a `card_key`
+    do item e a ocorrência dele na lista: um mesmo controle do flet não pode
+    estar em dois pais, então itens repetidos e listas diferentes recebem
+    instâncias próprias. Guarda no máximo `maxsize` cards (LRU).
+
+    Cada lugar lembra as entradas que mostrou por último; `changes(place)`
+    diz quais entraram e quais saíram na última chamada de `cards()`.
+    """
+    def __init__(self, factory, maxsize: int = 512):
+        self.factory = factory  # factory(item, is_discarded) -> card
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cards = OrderedDict()
+        self._shown = {}    # place -> {chave completa: item} da última lista
+        self._changes = {}  # place -> (itens que entraram, itens que saíram)
+
+    def cards(self, place: str, items: list, is_discarded: bool = False) -> list:
+        seen = Counter()
+        shown = {}
+        result = []
+        for item in items:
+            key = card_key(item, is_discarded)
+            full_key = (place, key, seen[key])
+            seen[key] += 1
+            shown[full_key] = item
+
+            card = self._cards.get(full_key)
+            if card is None:
+                card = self._cards[full_key] = self.factory(item, is_discarded)
+                self.misses += 1
+            else:
+                self._cards.move_to_end(full_key)
+                self.hits += 1
+            result.append(card)
+
+        while len(self._cards) > self.maxsize:
+            self._cards.popitem(last=False)
+
+        previous = self._shown.get(place, {})
+        self._changes[place] = (
+            [item for full_key, item in shown.items() if full_key not in previous],
+            [item for full_key, item in previous.items() if full_key not in shown],
+        )
+        self._shown[place] = shown
+        return result
+
+    def changes(self, place: str) -> tuple[list, list]:
+        """Itens que entraram e que saíram de `place` na última chamada de `cards()`."""
+        return self._changes.get(place, ([], []))
+
+    def clear(self):
+        self._cards.clear()
+
+    def info(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._cards), "maxsize": self.maxsize}
+
+
+class BackpackTotals:
+    """
+    Totais da mochila exibida, mantidos por diferença: `apply` recebe só as
+    entradas que entraram e saíram (ex.: `CardCache.changes("panel")`), então
+    o custo é o da mudança, não o da mochila inteira.
+    """
+    def __init__(self):
+        self.values = dict.fromkeys(TOTAL_FIELDS, 0)
+
+    def apply(self, added: list, removed: list) -> dict:
+        for items, sign in ((added, 1), (removed, -1)):
+            for item in items:
+                for field, amount in zip(TOTAL_FIELDS, item_totals(item)):
+                    self.values[field] += sign * amount
+        return self.values
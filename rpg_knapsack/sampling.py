@@ -0,0 +1,39 @@
+import random
+
+
+class AliasSampler:
+    """
+    Sorteio com pesos em O(1) por amostra (método do alias de Vose).
+    Montar a tabela custa O(n); cada sorteio usa um índice e uma moeda.
+    """
+    def __init__(self, weights: list):
+        n = len(weights)
+        if n == 0:
+            raise ValueError("AliasSampler precisa de pelo menos um peso")
+        total = float(sum(weights))
+        if total <= 0 or any(w < 0 for w in weights):
+            raise ValueError("Pesos devem ser não-negativos e com soma positiva")
+
+        self.n = n
+        self.prob = [0.0] * n
+        self.alias = [0] * n
+
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+
+        # sobras (só por arredondamento) ficam com probabilidade 1
+        for i in large + small:
+            self.prob[i] = 1.0
+
+    def sample(self, rng=random) -> int:
+        i = int(rng.random() * self.n)
+        return i if rng.random() < self.prob[i] else self.alias[i]
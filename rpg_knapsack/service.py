@@ -0,0 +1,557 @@
+"""
+Serviço HTTP/JSON local (só biblioteca padrão) para outras ferramentas
+pedirem mochilas sem abrir a interface.
+
+Rotas:
+    POST /solve         {"race", "capacity", "slots"?: bool, "items"?: [...]}
+    POST /sweep         {"race", "capacity"}  -> melhor score para cada capacidade 0..capacity
+    POST /dungeon-step  {"race", "capacity", "backpack": [ids], "loot"?: [ids], "loot_count"?: int, "seed"?: int,
+                         "slots"?: bool}
+    GET  /stats         vazão, percentis de latência, pedidos agrupados
+    GET  /health
+
+Pedidos idênticos em andamento são respondidos por uma única execução, e
+pedidos de /solve e /sweep da mesma raça que chegam dentro de uma janela
+curta viram uma DP só (resolvida até a maior capacidade). O trabalho de CPU
+roda num pool de processos; cada processo abre o catálogo uma vez.
+"items" em /solve aceita itens no formato do items.json, fora do catálogo,
+com "quantity" opcional para pilhas.
+Nos ids, uma pilha pode vir como {"id": 3, "quantity": 2}.
+
+Exemplos (a partir de `rpg_knapsack`):
+
+    python service.py --port 8765
+    python service.py --load-test --requests 5000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bounded import knapsack_bounded
+from catalog import DEFAULT_CATALOG_PATH, load_catalog
+from dungeon import DungeonManager
+from game_utils import RACE_RULES, ScoreMatrix, prepare_chosen_items, prepare_items_for_knapsack
+from instrumentation import Instrumentation
+from reduction import knapsack_sweep_reduced
+from slots import SLOT_LIMITS, item_slot, knapsack_slots_ids
+
+DEFAULT_PORT = 8765
+# Quanto esperar por outros pedidos da mesma raça antes de rodar a DP (segundos)
+DEFAULT_BATCH_WINDOW = 0.005
+MAX_CAPACITY = 1_000_000
+MAX_LOOT_COUNT = 1000
+MAX_QUANTITY = 1_000_000
+MAX_VALUE = 1_000_000
+MAX_BODY_BYTES = 1 << 20
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class BodyTooLarge(ValueError):
+    """Pedido com Content-Length acima de MAX_BODY_BYTES (responde 413)."""
+
+
+# Estado de cada processo do pool (preenchido por `_init_worker`)
+_worker = {}
+
+
+def _init_worker(catalog_path: str):
+    catalog = load_catalog(catalog_path)
+    _worker["catalog"] = catalog
+    _worker["scores"] = ScoreMatrix(catalog)
+    _worker["manager"] = DungeonManager(catalog)
+    _worker["slots"] = None
+
+
+def _slot_column() -> list:
+    if _worker["slots"] is None:
+        _worker["slots"] = [item_slot(item) for item in _worker["catalog"]]
+    return _worker["slots"]
+
+
+def _loadout(race_key: str, capacity: int, score: int, ids: list) -> dict:
+    catalog = _worker["catalog"]
+    return {
+        "race": race_key,
+        "capacity": capacity,
+        "score": score,
+        "weight": sum(catalog.weights[i] for i in ids),
+        "ids": list(ids),
+        "items": prepare_chosen_items(catalog, ids, _worker["scores"].column(race_key)),
+    }
+
+
+def _solve_race(race_key: str, capacities: list, use_slots: bool) -> dict:
+    """
+    Uma DP para todas as capacidades do lote. Retorna a mochila de cada
+    capacidade e, sem slots, o melhor score de 0 até a maior capacidade.
+    """
+    catalog = _worker["catalog"]
+    scores = _worker["scores"].column(race_key)
+    if use_slots:
+        results = {}
+        for capacity in capacities:
+            score, ids = knapsack_slots_ids(catalog.weights, scores, _slot_column(), capacity)
+            results[capacity] = _loadout(race_key, capacity, score, ids)
+        return {"results": results, "best_scores": None}
+
+    sweep, _ = knapsack_sweep_reduced(catalog.weights, scores, max(capacities))
+    results = {c: _loadout(race_key, c, sweep.best_score(c), sweep.chosen(c)) for c in capacities}
+    return {"results": results, "best_scores": sweep.best_scores()}
+
+
+def _solve_items(race_key: str, capacity: int, items: list) -> dict:
+    """
+    Itens enviados pelo cliente: prepara para a raça e resolve a mochila com
+    quantidade limitada, então uma pilha pode ser levada em parte (o item
+    volta com a "quantity" levada).
+    """
+    prepared = prepare_items_for_knapsack(items, race_key)
+    best, taken = knapsack_bounded(prepared, capacity)
+    chosen = [item if units == item.get("quantity", 1) else {**item, "quantity": units} for item, units in taken]
+    return {"race": race_key, "capacity": capacity, "score": best,
+            "weight": sum(item["weight"] * units for item, units in taken), "items": chosen}
+
+
+def _stack(entries: list, race_key: str) -> list:
+    """Ids (ou {"id", "quantity"}) -> itens preparados para a raça."""
+    catalog = _worker["catalog"]
+    scores = _worker["scores"].column(race_key)
+    items = []
+    for entry in entries:
+        item_id, quantity = (entry["id"], entry.get("quantity", 1)) if isinstance(entry, dict) else (entry, 1)
+        if not 0 <= item_id < len(catalog):
+            raise ValueError(f"Item inexistente: {item_id}")
+        item = prepare_chosen_items(catalog, [item_id], scores)[0]
+        if quantity != 1:
+            item["quantity"] = quantity
+        items.append(item)
+    return items
+
+
+def _dungeon_step(race_key: str, capacity: int, backpack: list, loot, seed, loot_count: int, use_slots: bool) -> dict:
+    manager = _worker["manager"]
+    if loot is None:
+        counts = {}
+        for view in manager.generate_loot(loot_count, rng=random.Random(seed)):
+            counts[view.id] = counts.get(view.id, 0) + 1
+        loot = [{"id": item_id, "quantity": count} for item_id, count in counts.items()]
+
+    manager.reset_run()
+    manager.slot_limits = SLOT_LIMITS if use_slots else None
+    kept, discarded, score = manager.discard_overweight(_stack(backpack, race_key), _stack(loot, race_key), capacity)
+    return {"race": race_key, "capacity": capacity, "seed": seed, "score": score,
+            "loot": loot, "kept": kept, "discarded": discarded}
+
+
+class SolveService:
+    """
+    O servidor: roteia, junta pedidos idênticos em andamento e agrupa os
+    solves da mesma raça (ver o docstring do módulo). As latências ficam numa
+    `Instrumentation` própria, sempre ligada, com uma janela por rota.
+    """
+    def __init__(self, pool, batch_window: float = DEFAULT_BATCH_WINDOW):
+        self.pool = pool
+        self.batch_window = batch_window
+        self.metrics = Instrumentation(window=5000)
+        self.metrics.enable()
+        self.started = time.perf_counter()
+        self.requests = 0
+        self._inflight = {}
+        self._pending = {}
+        self.routes = {
+            "/solve": ("POST", self.solve),
+            "/sweep": ("POST", self.sweep),
+            "/dungeon-step": ("POST", self.dungeon_step),
+            "/stats": ("GET", self.stats),
+            "/health": ("GET", self.health),
+        }
+
+    # --- HTTP ---
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except ValueError as e:
+                    status = 413 if isinstance(e, BodyTooLarge) else 400
+                    writer.write(_response(status, {"error": str(e)}, keep_alive=False))
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self.dispatch(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # cliente sumiu ou o servidor está desligando com a conexão ociosa
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> tuple[int, dict]:
+        start = time.perf_counter()
+        self.requests += 1
+        route = self.routes.get(path)
+        if route is None:
+            return 404, {"error": f"Rota desconhecida: {path}"}
+        if route[0] != method:
+            return 405, {"error": f"Use {route[0]} em {path}"}
+
+        try:
+            request = json.loads(body) if body else {}
+            if not isinstance(request, dict):
+                raise ValueError("O corpo deve ser um objeto JSON")
+            payload = await self._coalesced(path, route[1], request)
+            status = 200
+        except (ValueError, KeyError, TypeError) as e:
+            self.metrics.count("errors")
+            status, payload = 400, {"error": str(e) or type(e).__name__}
+        except Exception as e:
+            self.metrics.count("errors")
+            status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+
+        self.metrics.record(path, time.perf_counter() - start)
+        return status, payload
+
+    async def _coalesced(self, path: str, handler, request: dict):
+        if path == "/dungeon-step" and "loot" not in request and "seed" not in request:
+            # loot sorteado: fixa a semente aqui, então pedidos iguais não se confundem
+            request["seed"] = random.getrandbits(32)
+        key = (path, json.dumps(request, sort_keys=True))
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(handler(request))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.metrics.count("coalesced")
+        return await asyncio.shield(task)
+
+    # --- rotas ---
+
+    async def solve(self, request: dict) -> dict:
+        race_key, capacity = _race_and_capacity(request)
+        if "items" in request:
+            return await self._run(_solve_items, race_key, capacity, _items(request))
+        result = await self._batched(race_key, capacity, bool(request.get("slots")))
+        return result["results"][capacity]
+
+    async def sweep(self, request: dict) -> dict:
+        race_key, capacity = _race_and_capacity(request)
+        result = await self._batched(race_key, capacity, use_slots=False)
+        return {"race": race_key, "capacity": capacity, "best_scores": result["best_scores"][:capacity + 1]}
+
+    async def dungeon_step(self, request: dict) -> dict:
+        race_key, capacity = _race_and_capacity(request)
+        backpack = _entries(request, "backpack")
+        loot = _entries(request, "loot") if request.get("loot") is not None else None
+        loot_count = _bounded_int(request, "loot_count", 1, MAX_LOOT_COUNT, default=3)
+        return await self._run(
+            _dungeon_step, race_key, capacity, backpack, loot,
+            request.get("seed"), loot_count, bool(request.get("slots")),
+        )
+
+    async def health(self, request: dict) -> dict:
+        return {"status": "ok"}
+
+    async def stats(self, request: dict) -> dict:
+        elapsed = time.perf_counter() - self.started
+        snapshot = self.metrics.snapshot()
+        return {
+            "uptime_s": elapsed,
+            "requests": self.requests,
+            "throughput_rps": self.requests / elapsed if elapsed else 0.0,
+            "latency": snapshot["spans"],
+            "counters": snapshot["counters"],
+        }
+
+    # --- lotes e pool ---
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, fn, *args)
+
+    async def _batched(self, race_key: str, capacity: int, use_slots: bool) -> dict:
+        """Entra no lote aberto da raça (ou abre um) e espera a DP do lote."""
+        loop = asyncio.get_running_loop()
+        key = (race_key, use_slots)
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = {"capacities": set(), "future": loop.create_future()}
+            loop.call_later(self.batch_window, lambda: asyncio.ensure_future(self._flush(key)))
+        batch["capacities"].add(capacity)
+        return await asyncio.shield(batch["future"])
+
+    async def _flush(self, key):
+        batch = self._pending.pop(key)
+        race_key, use_slots = key
+        self.metrics.count("batches")
+        self.metrics.count("batched_capacities", len(batch["capacities"]))
+        try:
+            result = await self._run(_solve_race, race_key, sorted(batch["capacities"]), use_slots)
+        except Exception as e:
+            batch["future"].set_exception(e)
+        else:
+            batch["future"].set_result(result)
+
+
+def _race_and_capacity(request: dict) -> tuple[str, int]:
+    race_key = request.get("race")
+    if race_key not in RACE_RULES:
+        raise ValueError(f"Raça desconhecida: {race_key!r} (use uma de {', '.join(RACE_RULES)})")
+    return race_key, _bounded_int(request, "capacity", 0, MAX_CAPACITY)
+
+
+def _is_int(value) -> bool:
+    # bool é subclasse de int no Python, mas true/false no JSON não é número
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _bounded_int(request: dict, field: str, low: int, high: int, default=None) -> int:
+    """`request[field]` validado como inteiro em [low, high]; floats e booleanos são recusados."""
+    value = request.get(field, default)
+    if not _is_int(value) or not low <= value <= high:
+        raise ValueError(f"'{field}' deve ser um inteiro entre {low} e {high}")
+    return value
+
+
+def _entries(request: dict, field: str) -> list:
+    """Lista de ids (ou {"id", "quantity"}) de `request[field]`, com tipos e quantidades conferidos."""
+    entries = request.get(field, [])
+    if not isinstance(entries, list):
+        raise ValueError(f"'{field}' deve ser uma lista de ids")
+    for entry in entries:
+        if isinstance(entry, dict):
+            if not _is_int(entry.get("id")):
+                raise ValueError(f"Em '{field}', cada pilha precisa de um 'id' inteiro")
+            _bounded_int(entry, "quantity", 1, MAX_QUANTITY, default=1)
+        elif not _is_int(entry):
+            raise ValueError(f"Em '{field}', cada item deve ser um id inteiro ou {{\"id\", \"quantity\"}}")
+    return entries
+
+
+def _items(request: dict) -> list:
+    """
+    Itens soltos de `request["items"]` (formato do items.json), conferidos
+    antes de ir para o pool: peso, valor, quantidade e stats inteiros.
+    """
+    items = request["items"]
+    if not isinstance(items, list):
+        raise ValueError("'items' deve ser uma lista de itens")
+    for item in items:
+        if not isinstance(item, dict):
+            raise ValueError("Em 'items', cada item deve ser um objeto")
+        _bounded_int(item, "weight", 0, MAX_CAPACITY)
+        _bounded_int(item, "value", -MAX_VALUE, MAX_VALUE)
+        _bounded_int(item, "quantity", 1, MAX_QUANTITY, default=1)
+        for field in ("name", "type"):
+            if not isinstance(item.get(field, ""), str):
+                raise ValueError(f"Em 'items', '{field}' deve ser texto")
+        stats = item.get("stats", {})
+        if not isinstance(stats, dict):
+            raise ValueError("Em 'items', 'stats' deve ser um objeto")
+        for field in ("attack", "defense"):
+            _bounded_int(stats, field, -MAX_VALUE, MAX_VALUE, default=0)
+    return items
+
+
+async def _read_request(reader):
+    """Lê um pedido HTTP/1.1 (linha, cabeçalhos e corpo por Content-Length). None = conexão fechada."""
+    line = await reader.readline()
+    if not line:
+        return None
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3:
+        raise ValueError("Linha de pedido inválida")
+    method, target, _ = parts
+
+    headers = {}
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY_BYTES:
+        raise BodyTooLarge(f"Corpo maior que {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method, target.split("?", 1)[0], headers, body
+
+
+def _response(status: int, payload: dict, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def start_service(host: str = "127.0.0.1", port: int = DEFAULT_PORT, workers: int = None,
+                        catalog_path: str = DEFAULT_CATALOG_PATH, batch_window: float = DEFAULT_BATCH_WINDOW):
+    """Sobe o servidor; retorna (servidor asyncio, SolveService, pool). Quem chamou fecha os dois."""
+    pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                               initargs=(catalog_path,))
+    service = SolveService(pool, batch_window)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    return server, service, pool
+
+
+async def serve(host: str, port: int, **options):
+    server, _, pool = await start_service(host, port, **options)
+    address = server.sockets[0].getsockname()
+    print(f"Servindo em http://{address[0]}:{address[1]}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+# --- teste de carga ---
+
+async def _request(reader, writer, method: str, path: str, payload=None) -> tuple[int, dict]:
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+def _random_request(rng: random.Random, capacities: list) -> tuple[str, dict]:
+    race_key = rng.choice(list(RACE_RULES))
+    capacity = rng.choice(capacities)
+    roll = rng.random()
+    if roll < 0.2:
+        return "/sweep", {"race": race_key, "capacity": capacity}
+    if roll < 0.3:
+        return "/dungeon-step", {"race": race_key, "capacity": capacity, "backpack": [], "seed": rng.randrange(100)}
+    return "/solve", {"race": race_key, "capacity": capacity}
+
+
+async def load_test(host: str, port: int, requests: int, concurrency: int, capacities: list, seed: int = 0) -> dict:
+    """
+    Dispara `requests` pedidos misturados (70% /solve, 20% /sweep, 10%
+    /dungeon-step) por `concurrency` conexões keep-alive e mede do lado do cliente.
+    """
+    rng = random.Random(seed)
+    jobs = [_random_request(rng, capacities) for _ in range(requests)]
+    latencies = []
+    failures = [0]
+
+    async def client(indexes):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for index in indexes:
+                path, payload = jobs[index]
+                start = time.perf_counter()
+                status, _ = await _request(reader, writer, "POST", path, payload)
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    failures[0] += 1
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(range(k, requests, concurrency)) for k in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, server_stats = await _request(reader, writer, "GET", "/stats")
+    writer.close()
+    await writer.wait_closed()
+
+    latencies.sort()
+
+    def pick(q):
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "failures": failures[0],
+        "elapsed_s": elapsed,
+        "throughput_rps": requests / elapsed if elapsed else 0.0,
+        "p50_ms": pick(0.50),
+        "p90_ms": pick(0.90),
+        "p99_ms": pick(0.99),
+        "max_ms": pick(1.0),
+        "server": server_stats,
+    }
+
+
+async def _load_test_local(args) -> dict:
+    """Sobe o serviço numa porta livre, roda o teste de carga contra ele e desliga."""
+    server, _, pool = await start_service("127.0.0.1", 0, workers=args.workers, catalog_path=args.catalog,
+                                          batch_window=args.batch_window_ms / 1000)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        async with server:
+            return await load_test("127.0.0.1", port, args.requests, args.concurrency, args.capacities, args.seed)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço JSON de mochilas (solve, sweep, dungeon).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG_PATH, help="items.json do catálogo")
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: núcleos da máquina)")
+    parser.add_argument("--batch-window-ms", type=float, default=DEFAULT_BATCH_WINDOW * 1000)
+    parser.add_argument("--load-test", action="store_true", help="mede vazão e latência (sobe um serviço local "
+                                                                 "se --target não for dado)")
+    parser.add_argument("--target", help="host:porta de um serviço já rodando, para o teste de carga")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--capacities", nargs="+", type=int, default=[10, 15, 20, 30, 50])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if not args.load_test:
+        options = dict(workers=args.workers, catalog_path=args.catalog, batch_window=args.batch_window_ms / 1000)
+        try:
+            asyncio.run(serve(args.host, args.port, **options))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if args.target:
+        host, _, port = args.target.rpartition(":")
+        report = asyncio.run(load_test(host or "127.0.0.1", int(port), args.requests, args.concurrency,
+                                       args.capacities, args.seed))
+    else:
+        report = asyncio.run(_load_test_local(args))
+    json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
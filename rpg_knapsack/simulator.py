@@ -0,0 +1,213 @@
+"""
+Simulador de dungeon sem interface, para checagens de balanceamento.
+
+Cada exploração começa com a melhor mochila da raça (como o botão "Equipar"),
+atravessa `rooms` salas sorteando loot do catálogo real e usa o
+`DungeonManager` para decidir o que manter. As explorações são distribuídas
+em blocos entre processos e cada uma tem uma semente própria derivada de
+`--seed` e do seu número, então o resultado não depende de quantos processos
+rodaram. Cada exploração vira uma linha JSON.
+
+Com `--fast [EPSILON]` tudo roda no modo aproximado (`approx.knapsack_approx`):
+cada mochila fica a no máximo EPSILON do ótimo e a linha ganha "upper_bound",
+o limite do ótimo da última mochila calculada.
+
+Exemplo (a partir de `rpg_knapsack`):
+
+    python simulator.py --races orc nord --capacities 15 30 --runs 10000 --output runs.jsonl
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from approx import DEFAULT_EPSILON, knapsack_approx
+from bounded import stack_items
+from catalog import DEFAULT_CATALOG_PATH, load_catalog
+from dungeon import DungeonManager
+from game_utils import RACE_RULES, ScoreMatrix, prepare_chosen_items
+from reduction import knapsack_sweep_reduced
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# Estado de cada processo (preenchido por `_init_worker`)
+_state = {}
+
+
+def _init_worker(catalog_path: str, drop_weights_path: str = None, epsilon: float = None):
+    catalog = load_catalog(catalog_path)
+    drop_weights = None
+    if drop_weights_path:
+        drop_weights = load_drop_weights(drop_weights_path, catalog)
+
+    _state["catalog"] = catalog
+    _state["scores"] = ScoreMatrix(catalog)
+    _state["manager"] = DungeonManager(catalog, drop_weights=drop_weights, epsilon=epsilon)
+    _state["epsilon"] = epsilon
+    _state["prepared"] = {}
+    _state["start"] = {}
+
+
+def load_drop_weights(path: str, catalog) -> list:
+    """JSON {"nome do item": peso}; itens fora do arquivo ficam com peso 1."""
+    with open(path, "r", encoding="utf-8") as f:
+        by_name = json.load(f)
+    return [by_name.get(name, 1) for name in catalog.names]
+
+
+def run_seed(base_seed: int, run_index: int) -> int:
+    """Semente da exploração `run_index`: reproduzível e independente do paralelismo."""
+    return (base_seed << 32) | run_index
+
+
+def _prepared_item(race_key: str, item_id: int) -> dict:
+    """Item visto pela raça; um dict por (raça, item) reaproveitado entre explorações."""
+    cache = _state["prepared"].setdefault(race_key, {})
+    item = cache.get(item_id)
+    if item is None:
+        scores = _state["scores"].column(race_key)
+        item = cache[item_id] = prepare_chosen_items(_state["catalog"], [item_id], scores)[0]
+    return item
+
+
+def _start_backpack(race_key: str, capacity: int) -> tuple[int, list, int]:
+    """Mochila inicial da raça: score, itens e limite do ótimo (igual ao score no modo exato)."""
+    key = (race_key, capacity)
+    if key not in _state["start"]:
+        catalog = _state["catalog"]
+        scores = _state["scores"].column(race_key)
+        if _state["epsilon"] is not None:
+            fast = knapsack_approx(catalog.weights, scores, capacity, _state["epsilon"])
+            score, chosen, bound = fast.score, fast.chosen, fast.upper_bound
+        else:
+            sweep, _ = knapsack_sweep_reduced(catalog.weights, scores, capacity)
+            score, chosen = sweep.best_score(capacity), sweep.chosen(capacity)
+            bound = score
+        _state["start"][key] = (score, [_prepared_item(race_key, i) for i in chosen], bound)
+    return _state["start"][key]
+
+
+def simulate_crawl(race_key: str, capacity: int, rooms: int, loot_per_room: int, seed: int) -> dict:
+    """Uma exploração completa; retorna o resumo da mochila final."""
+    rng = random.Random(seed)
+    manager = _state["manager"]
+    manager.reset_run()
+
+    score, backpack, bound = _start_backpack(race_key, capacity)
+    discarded_units = 0
+
+    for _ in range(rooms):
+        loot = [_prepared_item(race_key, view.id) for view in manager.generate_loot(loot_per_room, rng=rng)]
+        backpack, discarded, score = manager.discard_overweight(backpack, stack_items(loot), capacity)
+        discarded_units += sum(item.get("quantity", 1) for item in discarded)
+        if manager.last_approx is not None:
+            bound = manager.last_approx.upper_bound
+
+    totals = {"gold": 0, "attack": 0, "defense": 0, "weight": 0}
+    for item in backpack:
+        quantity = item.get("quantity", 1)
+        stats = item["stats"]
+        totals["gold"] += item["real_value"] * quantity
+        totals["attack"] += stats.get("attack", 0) * quantity
+        totals["defense"] += stats.get("defense", 0) * quantity
+        totals["weight"] += item["weight"] * quantity
+
+    summary = {
+        "race": race_key,
+        "capacity": capacity,
+        "seed": seed,
+        "score": score,
+        **totals,
+        "items": sum(item.get("quantity", 1) for item in backpack),
+        "discarded": discarded_units,
+    }
+    if _state["epsilon"] is not None:
+        summary["upper_bound"] = bound
+    return summary
+
+
+def _run_chunk(race_key, capacity, first_run, count, base_seed, rooms, loot_per_room) -> list:
+    lines = []
+    for run_index in range(first_run, first_run + count):
+        summary = simulate_crawl(race_key, capacity, rooms, loot_per_room, run_seed(base_seed, run_index))
+        summary["run"] = run_index
+        lines.append(json.dumps(summary, ensure_ascii=False))
+    return lines
+
+
+def iter_chunks(races: list, capacities: list, runs: int, chunk_size: int):
+    """(raça, capacidade, primeira exploração, quantidade) de cada bloco de trabalho."""
+    run_index = 0
+    for race_key in races:
+        for capacity in capacities:
+            for start in range(0, runs, chunk_size):
+                count = min(chunk_size, runs - start)
+                yield race_key, capacity, run_index, count
+                run_index += count
+
+
+def run_simulations(out, races: list, capacities: list, runs: int, rooms: int = 5, loot_per_room: int = 3,
+                    base_seed: int = 0, workers: int = None, catalog_path: str = DEFAULT_CATALOG_PATH,
+                    drop_weights_path: str = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    epsilon: float = None) -> int:
+    """
+    Roda `runs` explorações para cada (raça, capacidade) e escreve uma linha
+    JSON por exploração em `out`, na ordem das explorações, conforme os blocos
+    terminam. Retorna quantas explorações rodaram. Com `epsilon` roda no modo rápido.
+    """
+    chunks = list(iter_chunks(races, capacities, runs, chunk_size))
+    extra = (base_seed, rooms, loot_per_room)
+    total = 0
+
+    if workers == 1:
+        _init_worker(catalog_path, drop_weights_path, epsilon)
+        results = (_run_chunk(*chunk, *extra) for chunk in chunks)
+        for lines in results:
+            out.write("\n".join(lines) + "\n")
+            total += len(lines)
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                             initargs=(catalog_path, drop_weights_path, epsilon)) as pool:
+        futures = [pool.submit(_run_chunk, *chunk, *extra) for chunk in chunks]
+        for future in futures:
+            lines = future.result()
+            out.write("\n".join(lines) + "\n")
+            total += len(lines)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulação Monte-Carlo de explorações de dungeon.")
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG_PATH, help="items.json do catálogo")
+    parser.add_argument("--drop-weights", help='JSON {"nome do item": peso de drop}')
+    parser.add_argument("--races", nargs="+", default=list(RACE_RULES), help="raças (padrão: todas)")
+    parser.add_argument("--capacities", nargs="+", type=int, default=[15])
+    parser.add_argument("--runs", type=int, default=1000, help="explorações por raça e capacidade")
+    parser.add_argument("--rooms", type=int, default=5, help="salas por exploração")
+    parser.add_argument("--loot", type=int, default=3, help="itens sorteados por sala")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: núcleos da máquina)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--output", help="arquivo .jsonl de saída (padrão: stdout)")
+    parser.add_argument("--fast", nargs="?", type=float, const=DEFAULT_EPSILON, metavar="EPSILON",
+                        help=f"modo aproximado, a no máximo EPSILON do ótimo (padrão: {DEFAULT_EPSILON})")
+    args = parser.parse_args(argv)
+
+    options = dict(
+        races=args.races, capacities=args.capacities, runs=args.runs, rooms=args.rooms,
+        loot_per_room=args.loot, base_seed=args.seed, workers=args.workers,
+        catalog_path=args.catalog, drop_weights_path=args.drop_weights, chunk_size=args.chunk_size,
+        epsilon=args.fast,
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            run_simulations(f, **options)
+    else:
+        run_simulations(sys.stdout, **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+from knapsack import NUMPY_MIN_CELLS, PROGRESS_CELLS
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional; sem ele usamos só o laço em Python puro
+    np = None
+
+# Quantos itens cabem em cada slot de equipamento (None = sem limite)
+SLOT_LIMITS = {
+    "main_hand": 1,
+    "off_hand": 1,
+    "ranged": 1,
+    "consumable": None,
+}
+
+# Slot de cada item, pela primeira regra que casar com o tipo ou com o nome.
+# Itens que não casam com nenhuma regra vão para a mão principal.
+SLOT_RULES = [
+    ("consumable", ("consumable",), ("poção",)),
+    ("ranged", (), ("arco", "bow")),
+    ("off_hand", ("armor",), ("escudo", "shield")),
+]
+DEFAULT_SLOT = "main_hand"
+
+# Estado impossível ("exatamente k itens do slot" que não dá para montar)
+_UNREACHABLE = -(1 << 62)
+
+
+def item_slot(item) -> str:
+    """Slot do item: usa item["slot"] se existir, senão deriva do tipo e do nome."""
+    if item.get("slot"):
+        return item["slot"]
+    name = item.get("name", "").lower()
+    item_type = item.get("type", "")
+    for slot, types, words in SLOT_RULES:
+        if item_type in types or any(word in name for word in words):
+            return slot
+    return DEFAULT_SLOT
+
+
+def knapsack_slots(items: list, max_weight: int, limits: dict = SLOT_LIMITS, engine: str = "auto",
+                   progress=None) -> tuple[int, list]:
+    """
+    Mochila respeitando o limite de itens por slot (ex.: um escudo só).
+    Retorna o melhor valor e os itens escolhidos, na ordem de `items`.
+    """
+    weights = [item["weight"] for item in items]
+    values = [item["value"] for item in items]
+    slots = [item_slot(item) for item in items]
+    best, chosen = knapsack_slots_ids(weights, values, slots, max_weight, limits, engine=engine, progress=progress)
+    return best, [items[i] for i in chosen]
+
+
+def knapsack_slots_ids(weights, values, slots, max_weight: int, limits: dict = SLOT_LIMITS,
+                       ids=None, engine: str = "auto", progress=None) -> tuple[int, list]:
+    """
+    Mochila agrupada (multiple-choice) sobre colunas indexadas pelo id do item.
+
+    Cada slot é um grupo processado de uma vez sobre o eixo de capacidade:
+    para um limite L guardamos L+1 camadas ("exatamente k itens do grupo") e
+    cada item do grupo atualiza as camadas de cima para baixo, como na mochila
+    0/1. No fim do grupo a linha da DP é o máximo entre as camadas. Slots sem
+    limite (ou com limite maior que o grupo) viram linhas 0/1 comuns, então o
+    custo fica perto do knapsack sem restrições: ~n * L * W células.
+
+    `progress(itens_feitos, total)` é chamado como em `knapsack()` e pode
+    levantar `SolveCancelled` para interromper.
+    """
+    if ids is None:
+        ids = range(len(weights))
+
+    groups = {}
+    for i in ids:
+        if weights[i] <= max_weight and values[i] > 0:
+            groups.setdefault(slots[i], []).append(i)
+
+    if engine == "numpy" and np is None:
+        raise ImportError("O motor 'numpy' precisa do pacote numpy instalado")
+    use_numpy = np is not None and (
+        engine == "numpy" or (engine == "auto" and len(ids) * (max_weight + 1) >= NUMPY_MIN_CELLS)
+    )
+    ops = _NumpyOps(max_weight) if use_numpy else _PythonOps(max_weight)
+
+    total = sum(len(members) for members in groups.values())
+    step = max(1, PROGRESS_CELLS // (max_weight + 1))
+    done = 0
+
+    row = ops.zeros()
+    plan = []
+    for slot, members in groups.items():
+        limit = limits.get(slot)
+        if limit is None or limit >= len(members):
+            # sem restrição efetiva: linhas 0/1 comuns, atualizando a própria linha
+            bits = []
+            for i in members:
+                if progress is not None and done % step == 0:
+                    progress(done, total)
+                bits.append(ops.relax(row, row, weights[i], values[i]))
+                done += 1
+            plan.append((members, None, bits, None))
+            continue
+
+        layers = [row] + [ops.unreachable() for _ in range(limit)]
+        bits = {}
+        for p, i in enumerate(members):
+            if progress is not None and done % step == 0:
+                progress(done, total)
+            for k in range(min(limit, p + 1), 0, -1):
+                bits[p, k] = ops.relax(layers[k - 1], layers[k], weights[i], values[i])
+            done += 1
+        row, choice = ops.best_layer(layers)
+        plan.append((members, limit, bits, choice))
+
+    if progress is not None:
+        progress(total, total)
+
+    best = int(row[max_weight])
+
+    chosen = set()
+    w = max_weight
+    for members, limit, bits, choice in reversed(plan):
+        if limit is None:
+            for p in range(len(members) - 1, -1, -1):
+                if _taken(bits[p], w):
+                    chosen.add(members[p])
+                    w -= weights[members[p]]
+            continue
+
+        k = int(choice[w])
+        for p in range(len(members) - 1, -1, -1):
+            if k == 0:
+                break
+            if _taken(bits.get((p, k)), w):
+                chosen.add(members[p])
+                w -= weights[members[p]]
+                k -= 1
+
+    return best, [i for i in ids if i in chosen]
+
+
+def _taken(bits, w: int) -> bool:
+    return bits is not None and bits[w >> 3] >> (w & 7) & 1
+
+
+class _PythonOps:
+    def __init__(self, max_weight: int):
+        self.max_weight = max_weight
+        self.row_bytes = (max_weight >> 3) + 1
+
+    def zeros(self):
+        return [0] * (self.max_weight + 1)
+
+    def unreachable(self):
+        return [_UNREACHABLE] * (self.max_weight + 1)
+
+    def relax(self, prev, cur, item_weight: int, item_value: int):
+        """cur[w] = max(cur[w], prev[w - peso] + valor); retorna os bits de onde melhorou."""
+        bits = None
+        for w in range(self.max_weight, item_weight - 1, -1):
+            candidate = prev[w - item_weight] + item_value
+            if candidate > cur[w]:
+                cur[w] = candidate
+                if bits is None:
+                    bits = bytearray(self.row_bytes)
+                bits[w >> 3] |= 1 << (w & 7)
+        return bits
+
+    def best_layer(self, layers):
+        row = layers[0][:]
+        choice = [0] * (self.max_weight + 1)
+        for k in range(1, len(layers)):
+            layer = layers[k]
+            for w in range(self.max_weight + 1):
+                if layer[w] > row[w]:
+                    row[w] = layer[w]
+                    choice[w] = k
+        return row, choice
+
+
+class _NumpyOps:
+    def __init__(self, max_weight: int):
+        self.max_weight = max_weight
+        self.take_row = np.zeros(max_weight + 1, dtype=bool)
+
+    def zeros(self):
+        return np.zeros(self.max_weight + 1, dtype=np.int64)
+
+    def unreachable(self):
+        return np.full(self.max_weight + 1, _UNREACHABLE, dtype=np.int64)
+
+    def relax(self, prev, cur, item_weight: int, item_value: int):
+        shifted = prev[:self.max_weight + 1 - item_weight] + item_value
+        take = shifted > cur[item_weight:]
+        if not take.any():
+            return None
+        self.take_row[:item_weight] = False
+        self.take_row[item_weight:] = take
+        np.maximum(cur[item_weight:], shifted, out=cur[item_weight:])
+        return np.packbits(self.take_row, bitorder="little")
+
+    def best_layer(self, layers):
+        stacked = np.stack(layers)
+        # argmax pega a primeira camada em caso de empate, como a regra "só se melhorar"
+        choice = np.argmax(stacked, axis=0)
+        return stacked.max(axis=0), choice
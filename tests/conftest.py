@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os módulos do app são importados "soltos", como quando se roda `python app.py` dentro de rpg_knapsack
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "rpg_knapsack"))
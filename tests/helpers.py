@@ -0,0 +1,38 @@
+"""Soluções por força bruta e instâncias aleatórias pequenas para conferir os solvers."""
+import itertools
+import random
+
+
+def subsets(ids):
+    """Todos os subconjuntos de `ids` (2^n: só para instâncias pequenas)."""
+    ids = list(ids)
+    for size in range(len(ids) + 1):
+        yield from itertools.combinations(ids, size)
+
+
+def brute_force_score(weights, values, max_weight: int, ids=None) -> int:
+    """Melhor score entre todas as mochilas que cabem em `max_weight`."""
+    if ids is None:
+        ids = range(len(weights))
+    return max(
+        sum(values[i] for i in chosen)
+        for chosen in subsets(ids)
+        if sum(weights[i] for i in chosen) <= max_weight
+    )
+
+
+def make_instance(seed: int, max_items: int = 10, max_item_weight: int = 12, min_value: int = -3,
+                  max_value: int = 30) -> tuple[list, list, int]:
+    """Instância aleatória (pesos, scores, capacidade), com pesos zero e scores <= 0 de vez em quando."""
+    rng = random.Random(seed)
+    n = rng.randint(0, max_items)
+    weights = [rng.randint(0, max_item_weight) for _ in range(n)]
+    values = [rng.randint(min_value, max_value) for _ in range(n)]
+    return weights, values, rng.randint(0, max_item_weight * 3)
+
+
+def assert_feasible(weights, values, max_weight: int, best, chosen):
+    """`chosen` é uma mochila válida (sem repetição e cabendo) que vale `best`."""
+    assert len(set(chosen)) == len(chosen)
+    assert sum(weights[i] for i in chosen) <= max_weight
+    assert sum(values[i] for i in chosen) == best
@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+from alternatives import knapsack_pareto, knapsack_top_k
+from helpers import make_instance, subsets
+
+SEEDS = range(40)
+
+
+def _feasible_sets(weights, ids, max_weight):
+    return [chosen for chosen in subsets(ids) if sum(weights[i] for i in chosen) <= max_weight]
+
+
+@pytest.mark.parametrize("k", [1, 3, 8])
+@pytest.mark.parametrize("seed", SEEDS)
+def test_top_k_matches_brute_force(k, seed):
+    weights, values, capacity = make_instance(seed, max_items=8)
+    top = knapsack_top_k(weights, values, capacity, k)
+
+    # itens com score <= 0 ficam de fora do top-k
+    usable = [i for i in range(len(weights)) if weights[i] <= capacity and values[i] > 0]
+    scores = sorted((sum(values[i] for i in chosen) for chosen in _feasible_sets(weights, usable, capacity)),
+                    reverse=True)
+    assert [alternative.score for alternative in top] == scores[:k]
+
+    assert len({tuple(alternative.chosen) for alternative in top}) == len(top)
+    for alternative in top:
+        assert alternative.chosen == sorted(alternative.chosen)
+        assert sum(values[i] for i in alternative.chosen) == alternative.score
+        assert sum(weights[i] for i in alternative.chosen) == alternative.weight <= capacity
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_pareto_frontier_matches_brute_force(seed):
+    weights, values, capacity = make_instance(seed, max_items=8)
+    rng = random.Random(seed)
+    gold = [rng.randint(0, 20) for _ in weights]
+    objectives = {"score": values, "gold": gold}
+    frontier, truncated = knapsack_pareto(weights, objectives, capacity, max_size=1024)
+
+    points = {
+        (sum(values[i] for i in chosen), sum(gold[i] for i in chosen))
+        for chosen in _feasible_sets(weights, range(len(weights)), capacity)
+    }
+    expected = {p for p in points if not any(q != p and q[0] >= p[0] and q[1] >= p[1] for q in points)}
+
+    assert not truncated
+    assert {(alternative.totals["score"], alternative.totals["gold"]) for alternative in frontier} == expected
+    assert [alternative.score for alternative in frontier] == sorted((a.score for a in frontier), reverse=True)
+    for alternative in frontier:
+        assert sum(weights[i] for i in alternative.chosen) == alternative.weight <= capacity
+        assert alternative.totals == {"score": sum(values[i] for i in alternative.chosen),
+                                      "gold": sum(gold[i] for i in alternative.chosen)}
+
+
+def test_pareto_truncates_to_max_size():
+    rng = random.Random(7)
+    n = 14
+    weights = [rng.randint(1, 9) for _ in range(n)]
+    objectives = {"score": [rng.randint(1, 30) for _ in range(n)], "gold": [rng.randint(1, 30) for _ in range(n)]}
+    frontier, truncated = knapsack_pareto(weights, objectives, 30, max_size=4)
+    assert truncated
+    assert 1 <= len(frontier) <= 4
+    assert all(alternative.weight <= 30 for alternative in frontier)
@@ -0,0 +1,47 @@
+import pytest
+
+from approx import greedy_ids, knapsack_approx, lp_bound
+from helpers import assert_feasible, brute_force_score, make_instance
+
+SEEDS = range(40)
+
+
+@pytest.mark.parametrize("epsilon", [0.5, 0.2, 0.05])
+@pytest.mark.parametrize("seed", SEEDS)
+def test_approx_within_epsilon_of_optimum(epsilon, seed):
+    weights, values, capacity = make_instance(seed, max_value=500)
+    optimum = brute_force_score(weights, values, capacity)
+    result = knapsack_approx(weights, values, capacity, epsilon)
+
+    assert_feasible(weights, values, capacity, result.score, result.chosen)
+    assert (1 - epsilon) * optimum <= result.score <= optimum <= result.upper_bound
+    # a garantia devolvida também vale, e nunca é pior que a pedida
+    assert result.epsilon <= epsilon
+    assert (1 - result.epsilon) * optimum <= result.score
+    assert result.score >= result.greedy_score
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_approx_with_ids_returns_original_ids(seed):
+    weights, values, capacity = make_instance(seed, max_value=500)
+    ids = list(range(len(weights) - 1, -1, -2))
+    result = knapsack_approx(weights, values, capacity, 0.1, ids=ids)
+    optimum = brute_force_score(weights, values, capacity, ids=ids)
+    assert set(result.chosen) <= set(ids)
+    assert_feasible(weights, values, capacity, result.score, result.chosen)
+    assert 0.9 * optimum <= result.score <= optimum
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_greedy_and_lp_bound_bracket_the_optimum(seed):
+    weights, values, capacity = make_instance(seed)
+    optimum = brute_force_score(weights, values, capacity)
+    greedy_score, chosen = greedy_ids(weights, values, capacity)
+    assert_feasible(weights, values, capacity, greedy_score, chosen)
+    assert 2 * greedy_score >= optimum
+    assert lp_bound(weights, values, capacity) >= optimum
+
+
+def test_approx_rejects_epsilon_out_of_range():
+    with pytest.raises(ValueError):
+        knapsack_approx([1], [1], 1, epsilon=1)
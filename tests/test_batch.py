@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+import batch
+from batch import parse_capacities, solve_batch, split_capacities
+from benchmarks.catalogs import make_records
+from catalog import load_catalog
+from game_utils import ScoreMatrix
+from knapsack import knapsack_ids
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    path = tmp_path / "items.json"
+    path.write_text(json.dumps(make_records(40, seed=4), ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+def test_split_capacities_keeps_contiguous_ranges():
+    assert split_capacities(list(range(10)), 3) == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+    assert split_capacities([5], 4) == [[5]]
+    assert split_capacities([1, 2], 1) == [[1, 2]]
+
+
+def test_parse_capacities():
+    assert parse_capacities(["15", "10-30:10", "1-3"]) == [15, 10, 20, 30, 1, 2, 3]
+
+
+def test_single_worker_runs_in_process(catalog_path, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("workers=1 não deveria abrir um pool de processos")
+    monkeypatch.setattr(batch, "ProcessPoolExecutor", no_pool)
+    results = solve_batch([("nord", 10), ("orc", 10), ("nord", 5)], catalog_path, workers=1)
+    assert [(r["race"], r["capacity"]) for r in results] == [("nord", 10), ("orc", 10), ("nord", 5)]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_batch_matches_a_solve_per_job(catalog_path, workers):
+    jobs = [(race, capacity) for race in ("nord", "wood_elf") for capacity in (0, 7, 15, 40)] + [("nord", 7)]
+    results = solve_batch(jobs, catalog_path, workers=workers)
+
+    catalog = load_catalog(catalog_path)
+    scores = ScoreMatrix(catalog)
+    assert len(results) == len(jobs)
+    for (race, capacity), result in zip(jobs, results):
+        best, _ = knapsack_ids(catalog.weights, scores.column(race), capacity)
+        assert (result["race"], result["capacity"], result["score"]) == (race, capacity, best)
+        assert result["weight"] == sum(catalog.weights[i] for i in result["ids"]) <= capacity
+        assert sum(scores.column(race)[i] for i in result["ids"]) == best
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from bounded import expand_stacks, knapsack_bounded, split_quantity, stack_items
+from catalog import ItemCatalog
+from helpers import brute_force_score, subsets
+
+SEEDS = range(40)
+
+
+@pytest.mark.parametrize("quantity", range(0, 40))
+def test_split_quantity_reaches_every_amount(quantity):
+    chunks = split_quantity(quantity)
+    assert sum(chunks) == quantity
+    assert {sum(chosen) for chosen in subsets(chunks)} == set(range(quantity + 1))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_bounded_matches_brute_force_over_units(seed):
+    rng = random.Random(seed)
+    items = [{"weight": rng.randint(0, 7), "value": rng.randint(-2, 15), "quantity": rng.randint(1, 4)}
+             for _ in range(rng.randint(0, 4))]
+    capacity = rng.randint(0, 25)
+    unit_weights = [item["weight"] for item in items for _ in range(item["quantity"])]
+    unit_values = [item["value"] for item in items for _ in range(item["quantity"])]
+
+    best, taken = knapsack_bounded(items, capacity)
+    assert best == brute_force_score(unit_weights, unit_values, capacity)
+    assert sum(item["value"] * units for item, units in taken) == best
+    assert sum(item["weight"] * units for item, units in taken) <= capacity
+    assert all(0 < units <= item["quantity"] for item, units in taken)
+
+
+def test_expand_stacks_owners_point_back_to_items():
+    items = [{"weight": 2, "value": 3, "quantity": 5}, {"weight": 1, "value": 1}]
+    weights, values, owners = expand_stacks(items)
+    assert owners == [(0, 1), (0, 2), (0, 2), (1, 1)]
+    assert weights == [2, 4, 4, 1] and values == [3, 6, 6, 1]
+
+
+def test_stack_items_groups_repeated_objects():
+    sword, potion = {"name": "Espada", "weight": 7, "value": 13}, {"name": "Poção", "weight": 2, "value": 4}
+    stacked = stack_items([sword, potion, sword, sword])
+    assert [item["name"] for item in stacked] == ["Espada", "Poção"]
+    assert stacked[0]["quantity"] == 3
+    assert stacked[1] is potion  # itens únicos continuam sendo o mesmo objeto
+
+
+def test_stack_items_groups_catalog_items_by_id():
+    catalog = ItemCatalog([{"name": "Espada", "weight": 7, "value": 13}, {"name": "Poção", "weight": 2, "value": 4}])
+    stacked = stack_items([catalog[0], catalog[1], catalog[0]])  # cada acesso cria uma visão nova
+    assert [(item["id"], item.get("quantity", 1)) for item in stacked] == [(0, 2), (1, 1)]
+    # dicts soltos iguais, mas sem "id", só se juntam quando são o mesmo objeto
+    assert len(stack_items([{"weight": 1, "value": 1}, {"weight": 1, "value": 1}])) == 2
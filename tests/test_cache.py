@@ -0,0 +1,54 @@
+import pytest
+
+from cache import SweepCache
+from helpers import assert_feasible, brute_force_score, make_instance
+from knapsack import knapsack_sweep
+
+SEEDS = range(40)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_sweep_answers_every_capacity(seed):
+    weights, values, capacity = make_instance(seed)
+    sweep = knapsack_sweep(weights, values, capacity)
+    assert sweep.best_scores() == [brute_force_score(weights, values, c) for c in range(capacity + 1)]
+    for c in range(capacity + 1):
+        assert_feasible(weights, values, c, sweep.best_score(c), sweep.chosen(c))
+
+
+def test_sweep_rejects_capacity_beyond_the_solved_one():
+    sweep = knapsack_sweep([1, 2], [3, 4], 5)
+    with pytest.raises(ValueError):
+        sweep.best_score(6)
+
+
+def test_cache_serves_smaller_capacities():
+    cache = SweepCache()
+    cache.put("nord", 1, 50, "sweep 50")
+    assert cache.get("nord", 1, 20) == "sweep 50"
+    assert cache.get("nord", 1, 50) == "sweep 50"
+    assert cache.get("nord", 1, 51) is None
+    # outra raça ou outra versão do catálogo não aproveitam o resultado
+    assert cache.get("orc", 1, 20) is None
+    assert cache.get("nord", 2, 20) is None
+    assert cache.info()["hits"] == 2 and cache.info()["misses"] == 3
+
+
+def test_cache_larger_result_replaces_smaller_ones():
+    cache = SweepCache()
+    cache.put("nord", 1, 10, "sweep 10")
+    cache.put("nord", 1, 30, "sweep 30")
+    assert cache.info()["size"] == 1
+    assert cache.get("nord", 1, 5) == "sweep 30"
+
+
+def test_cache_evicts_least_recently_used():
+    cache = SweepCache(maxsize=2)
+    cache.put("nord", 1, 10, "nord")
+    cache.put("orc", 1, 10, "orc")
+    assert cache.get("nord", 1, 10) == "nord"  # "orc" passa a ser o mais antigo
+    cache.put("khajiit", 1, 10, "khajiit")
+    assert ("orc", 1, 10) not in cache
+    assert ("nord", 1, 10) in cache and ("khajiit", 1, 10) in cache
+    # `in` não conta acerto nem muda a ordem
+    assert cache.info()["hits"] == 1
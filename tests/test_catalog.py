@@ -0,0 +1,87 @@
+import json
+import os
+import stat
+
+import pytest
+
+from benchmarks.catalogs import make_records
+from catalog import ItemCatalog, compile_catalog, compiled_path, load_catalog, open_compiled
+
+COLUMNS = ("names", "images", "types", "weights", "values", "attack", "defense", "heal")
+
+
+@pytest.fixture
+def records():
+    records = make_records(200, seed=2)
+    records.append({"name": "Poção Arco\nEspada", "weight": 1, "value": 2, "image": "", "type": "x", "stats": {}})
+    return records
+
+
+@pytest.fixture
+def json_path(tmp_path, records):
+    path = tmp_path / "items.json"
+    path.write_text(json.dumps(records, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+def test_compiled_round_trip(json_path, records):
+    catalog = load_catalog(json_path)
+    reference = ItemCatalog(records)
+    assert os.path.exists(compiled_path(json_path))
+    assert len(catalog) == len(reference)
+    for name in COLUMNS:
+        assert list(getattr(catalog, name)) == list(getattr(reference, name)), name
+    assert [catalog.to_dict(i) for i in range(len(catalog))] == [reference.to_dict(i) for i in range(len(reference))]
+    # mesmo conteúdo, mesma versão, venha do .bin ou do JSON
+    assert catalog.version == ItemCatalog.from_json(json_path).version
+
+
+def test_compiled_file_keeps_the_json_permissions(json_path):
+    os.chmod(json_path, 0o644)
+    out = compile_catalog(json_path)
+    assert stat.S_IMODE(os.stat(out).st_mode) == 0o644
+
+
+def test_stale_compiled_file_is_rebuilt(json_path, records):
+    first = load_catalog(json_path)
+    records[0]["value"] += 1  # mesmo número de itens, conteúdo diferente
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False)
+    second = load_catalog(json_path)
+    assert second.values[0] == records[0]["value"]
+    assert second.version != first.version
+
+
+def test_touched_json_with_same_content_reuses_the_compiled_file(json_path):
+    first = load_catalog(json_path)
+    compiled = compiled_path(json_path)
+    inode = os.stat(compiled).st_ino
+    info = os.stat(json_path)
+    os.utime(json_path, ns=(info.st_atime_ns, info.st_mtime_ns + 10 ** 9))
+    second = load_catalog(json_path)
+    assert os.stat(compiled).st_ino == inode
+    assert second.version == first.version
+
+
+def test_compiled_file_without_the_json(json_path, records):
+    compiled = compile_catalog(json_path)
+    os.remove(json_path)
+    catalog = open_compiled(compiled, json_path)
+    assert catalog is not None and list(catalog.names) == [r["name"] for r in records]
+    assert len(load_catalog(json_path)) == len(records)
+
+
+def test_invalid_compiled_file(tmp_path):
+    path = tmp_path / "items.bin"
+    path.write_bytes(b"not a catalog")
+    assert open_compiled(str(path)) is None
+    with pytest.raises(ValueError):
+        load_catalog(str(path))
+
+
+def test_append_to_a_mapped_catalog(json_path):
+    catalog = load_catalog(json_path)
+    version = catalog.version
+    item_id = catalog.append({"name": "Nova", "weight": 3, "value": 5})
+    assert catalog.names[item_id] == "Nova" and catalog.weights[item_id] == 3
+    assert catalog.version == version + 1
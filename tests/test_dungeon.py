@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from catalog import ItemCatalog
+from dungeon import DungeonManager
+from helpers import brute_force_score
+
+SEEDS = range(30)
+
+
+def _units(items):
+    """Uma entrada (peso, score) por unidade de cada pilha."""
+    units = [(item["weight"], item["value"]) for item in items for _ in range(item.get("quantity", 1))]
+    return [w for w, _ in units], [v for _, v in units]
+
+
+def _total(items, field):
+    return sum(item[field] * item.get("quantity", 1) for item in items)
+
+
+@pytest.mark.parametrize("epsilon", [None, 0.2])
+@pytest.mark.parametrize("from_catalog", [False, True])
+@pytest.mark.parametrize("stack", [False, True])
+@pytest.mark.parametrize("seed", SEEDS)
+def test_rooms_match_full_resolve(epsilon, from_catalog, stack, seed):
+    """Sala a sala, a DP guardada entre um loot e outro dá o mesmo ótimo que resolver tudo de novo."""
+    rng = random.Random(seed)
+    pool = [
+        {"name": f"item {k}", "weight": rng.randint(1, 8), "value": rng.randint(-1, 20)}
+        for k in range(6)
+    ]
+    manager = DungeonManager(ItemCatalog(pool) if from_catalog else pool, epsilon=epsilon)
+    capacity = rng.randint(5, 20)
+    backpack = []
+    for _ in range(4):
+        loot = manager.generate_loot(rng.randint(1, 3), stack=stack, rng=rng)
+        weights, values = _units(backpack + loot)
+        optimum = brute_force_score(weights, values, capacity)
+
+        kept, discarded, score = manager.discard_overweight(backpack, loot, capacity)
+        if epsilon is None:
+            assert score == optimum
+        else:
+            assert (1 - epsilon) * optimum <= score <= optimum
+        assert _total(kept, "value") == score
+        assert _total(kept, "weight") <= capacity
+        # nada some nem aparece: cada unidade ou ficou ou foi descartada
+        assert _total(kept, "weight") + _total(discarded, "weight") == _total(backpack + loot, "weight")
+        backpack = kept
+
+
+def test_catalog_loot_stacks():
+    """Cada acesso ao catálogo cria uma visão nova; o loot empilha pelo "id" do item."""
+    catalog = ItemCatalog([{"name": "Espada", "weight": 7, "value": 13}, {"name": "Poção", "weight": 2, "value": 4}])
+    loot = DungeonManager(catalog).generate_loot(30, stack=True, rng=random.Random(1))
+    assert sorted(item["id"] for item in loot) == [0, 1]
+    assert sum(item["quantity"] for item in loot) == 30
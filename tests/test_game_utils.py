@@ -0,0 +1,47 @@
+import pytest
+
+import game_utils
+from benchmarks.catalogs import make_records
+from catalog import ItemCatalog
+from game_utils import RACE_RULES, ScoreMatrix, calculate_item_score, prepare_items_for_knapsack
+
+RACES = list(RACE_RULES) + ["sem_regra"]
+
+
+def _catalog():
+    records = make_records(300, seed=3)
+    # nomes que mudam de tamanho ao virar minúsculas ou que quebram linha
+    records += [
+        {"name": "İSTANBUL arco", "weight": 2, "value": 3, "image": "a.png", "type": "weapon", "stats": {"attack": 1}},
+        {"name": "Poção Arco\nEspada", "weight": 1, "value": 2, "image": "", "type": "", "stats": {}},
+        {"name": "", "weight": 1, "value": 0, "image": "", "type": "consumable", "stats": {}},
+    ]
+    return ItemCatalog(records)
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+@pytest.mark.parametrize("race", RACES)
+def test_score_matrix_matches_calculate_item_score(race, use_numpy, monkeypatch):
+    if use_numpy and game_utils.np is None:
+        pytest.skip("NumPy não instalado")
+    if not use_numpy:
+        monkeypatch.setattr(game_utils, "np", None)
+    catalog = _catalog()
+    column = ScoreMatrix(catalog).column(race)
+    assert list(column) == [calculate_item_score(catalog.to_dict(i), race) for i in range(len(catalog))]
+
+
+def test_prepared_items_use_the_race_score():
+    records = make_records(50, seed=9)
+    prepared = prepare_items_for_knapsack(records, "orc")
+    assert [item["value"] for item in prepared] == [calculate_item_score(r, "orc") for r in records]
+    assert [item["real_value"] for item in prepared] == [r["value"] for r in records]
+
+
+def test_score_matrix_builds_columns_on_demand():
+    catalog = _catalog()
+    scores = ScoreMatrix(catalog)
+    assert scores._columns == {} and scores._consumable is None
+    column = scores.column("orc")
+    assert list(scores._columns) == ["orc"]
+    assert scores.column("orc") is column
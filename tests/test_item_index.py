@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+import item_index
+from benchmarks.catalogs import make_records
+from catalog import ItemCatalog
+from item_index import SORT_COLUMNS, SORT_KEYS, ItemIndex
+
+SEEDS = range(10)
+
+
+def _catalog(seed):
+    records = make_records(120, seed=seed)
+    records += [{"name": "arco", "weight": 1, "value": 1}, {"name": "Arco Longo", "weight": 1, "value": 1}]
+    return ItemCatalog(records)
+
+
+def _sort_key(catalog, key):
+    if key == "name":
+        return lambda i: (catalog.names[i].lower(), i)
+    column = getattr(catalog, SORT_COLUMNS[key])
+    return lambda i: (column[i], i)
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def use_numpy(request, monkeypatch):
+    if request.param and item_index.np is None:
+        pytest.skip("NumPy não instalado")
+    if not request.param:
+        monkeypatch.setattr(item_index, "np", None)
+    return request.param
+
+
+@pytest.mark.parametrize("key", SORT_KEYS)
+def test_order_is_stable_sort(key, use_numpy):
+    catalog = _catalog(1)
+    assert list(ItemIndex(catalog).order(key)) == sorted(range(len(catalog)), key=_sort_key(catalog, key))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_query_matches_filter_and_sort(seed, use_numpy):
+    rng = random.Random(seed)
+    catalog = _catalog(seed)
+    index = ItemIndex(catalog)
+    types = [None] + index.types()
+    for _ in range(20):
+        name = catalog.names[rng.randrange(len(catalog))]
+        prefix = rng.choice(["", name[:rng.randint(1, 3)].upper(), "arco", "zzz"])
+        item_type = rng.choice(types)
+        sort = rng.choice((None,) + SORT_KEYS)
+        descending = rng.random() < 0.5
+
+        expected = [
+            i for i in range(len(catalog))
+            if catalog.names[i].lower().startswith(prefix.lower())
+            and (not item_type or catalog.types[i] == item_type)
+        ]
+        if sort:  # sem sort: ordem do catálogo, mesmo filtrando por prefixo
+            expected.sort(key=_sort_key(catalog, sort))
+        if descending:
+            expected.reverse()
+        assert list(index.query(prefix, item_type, sort, descending)) == expected
+
+
+def test_prefix_ignores_case():
+    catalog = _catalog(2)
+    ids = ItemIndex(catalog).prefix_range("ARCO")
+    assert {catalog.names[i] for i in ids} >= {"arco", "Arco Longo"}
+    assert all(catalog.names[i].lower().startswith("arco") for i in ids)
+
+
+def test_index_follows_catalog_changes():
+    catalog = ItemCatalog([{"name": "b", "weight": 2, "value": 1}])
+    index = ItemIndex(catalog)
+    assert list(index.order("weight")) == [0]
+    catalog.append({"name": "a", "weight": 1, "value": 1})
+    assert list(index.order("weight")) == [1, 0]
+    assert list(index.query("a")) == [1]
+
+
+def test_unknown_sort_key():
+    with pytest.raises(ValueError):
+        ItemIndex(_catalog(0)).order("peso")
@@ -0,0 +1,84 @@
+import pytest
+
+import knapsack as knapsack_module
+from helpers import assert_feasible, brute_force_score, make_instance
+from instrumentation import instrumentation
+from knapsack import ENGINES, knapsack, knapsack_ids, knapsack_sweep, select_engine
+
+SEEDS = range(40)
+# "numpy" só quando o NumPy estiver instalado (sem ele o motor cai no Python puro)
+WEIGHT_ENGINES = ["python"] + (["numpy"] if knapsack_module.np is not None else [])
+EXACT_ENGINES = WEIGHT_ENGINES + [engine for engine in ENGINES if engine not in ("python", "numpy")] + ["auto"]
+
+
+@pytest.mark.parametrize("engine", EXACT_ENGINES)
+@pytest.mark.parametrize("seed", SEEDS)
+def test_knapsack_ids_matches_brute_force(engine, seed):
+    weights, values, capacity = make_instance(seed)
+    best, chosen = knapsack_ids(weights, values, capacity, engine=engine)
+    assert best == brute_force_score(weights, values, capacity)
+    assert_feasible(weights, values, capacity, best, chosen)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_knapsack_ids_restricted_to_ids(seed):
+    weights, values, capacity = make_instance(seed)
+    ids = list(range(0, len(weights), 2))
+    best, chosen = knapsack_ids(weights, values, capacity, ids=ids)
+    assert best == brute_force_score(weights, values, capacity, ids=ids)
+    assert set(chosen) <= set(ids)
+    assert_feasible(weights, values, capacity, best, chosen)
+
+
+@pytest.mark.parametrize("engine", WEIGHT_ENGINES)
+@pytest.mark.parametrize("seed", SEEDS)
+def test_lean_mode_matches_full_table(engine, seed):
+    weights, values, capacity = make_instance(seed)
+    items = [{"weight": w, "value": v} for w, v in zip(weights, values)]
+    best, chosen, table = knapsack(items, capacity, engine=engine)
+    lean_best, lean_chosen, lean_table = knapsack(items, capacity, lean=True, engine=engine)
+    assert best == lean_best == brute_force_score(weights, values, capacity)
+    # os motores indexados por peso desempatam igual à tabela completa
+    assert [id(item) for item in lean_chosen] == [id(item) for item in chosen]
+    assert table is not None and lean_table is None
+
+
+@pytest.mark.skipif(knapsack_module.np is None, reason="NumPy não instalado")
+def test_numpy_engine_handles_large_values():
+    # scores acima de int32: o motor escolhe int64 e continua exato
+    weights = [3, 4, 5, 6]
+    values = [2 ** 40, 2 ** 40 + 1, 2 ** 41, 3]
+    assert knapsack_ids(weights, values, 9, engine="numpy") == knapsack_ids(weights, values, 9, engine="python")
+
+
+def test_select_engine_prefers_value_dp_for_huge_capacities():
+    weights = [10 ** 6 + i for i in range(40)]
+    values = [1 + i % 3 for i in range(40)]
+    choice = select_engine(weights, values, 10 ** 7)
+    assert choice.engine == "by_value"
+    assert set(choice.estimates) >= {"python", "by_value"}
+    assert choice.reason
+
+
+def test_select_engine_uses_branch_bound_for_few_items():
+    assert select_engine([3, 4, 5], [40, 50, 60], 10 ** 6).engine == "branch_bound"
+
+
+@pytest.fixture
+def recording():
+    instrumentation.reset()
+    instrumentation.enable()
+    yield instrumentation
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_auto_engine_choice_is_recorded(recording):
+    knapsack_ids([3, 4, 5], [40, 50, 60], 10 ** 6)
+    assert recording.counters["engine_branch_bound"] == 1
+    assert recording.notes["engine"].startswith("branch_bound: ")
+
+    # o sweep (caminho do "Equipar") só pode usar os motores indexados por peso
+    knapsack_sweep([3, 4, 5], [40, 50, 60], 12)
+    assert recording.notes["engine"].split(":")[0] in WEIGHT_ENGINES
+    assert recording.snapshot()["notes"] == recording.notes
@@ -0,0 +1,73 @@
+import itertools
+import random
+
+import pytest
+
+from party import solve_party
+
+SEEDS = range(40)
+
+
+def _party_instance(seed):
+    rng = random.Random(seed)
+    n = rng.randint(0, 7)
+    members = rng.randint(1, 3)
+    weights = [rng.randint(0, 6) for _ in range(n)]
+    shared = [rng.randint(-2, 9) for _ in range(n)]
+    # metade dos membros repete a coluna (mesma raça), em listas separadas
+    columns = [list(shared) if rng.random() < 0.5 else [rng.randint(-2, 9) for _ in range(n)]
+               for _ in range(members)]
+    capacities = [rng.randint(0, 10) for _ in range(members)]
+    return weights, columns, capacities
+
+
+def _brute_force(weights, columns, capacities) -> int:
+    """Melhor divisão testando todo dono possível (ou nenhum) para cada item."""
+    members = len(capacities)
+    best = 0
+    for owners in itertools.product(range(members + 1), repeat=len(weights)):
+        loads = [0] * members
+        score = 0
+        for i, owner in enumerate(owners):
+            if owner < members:
+                loads[owner] += weights[i]
+                score += columns[owner][i]
+        if all(load <= capacity for load, capacity in zip(loads, capacities)):
+            best = max(best, score)
+    return best
+
+
+def _assert_valid(weights, columns, capacities, result):
+    taken = [i for chosen in result.assignment for i in chosen]
+    assert len(taken) == len(set(taken))
+    for j, chosen in enumerate(result.assignment):
+        assert sum(weights[i] for i in chosen) <= capacities[j]
+        assert sum(columns[j][i] for i in chosen) == result.member_scores[j]
+    assert sum(result.member_scores) == result.score
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_exact_party_matches_brute_force(seed):
+    weights, columns, capacities = _party_instance(seed)
+    result = solve_party(weights, columns, capacities, time_budget=5)
+    assert result.method == "exact"
+    assert result.score == _brute_force(weights, columns, capacities)
+    assert result.gap == 0
+    _assert_valid(weights, columns, capacities, result)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_heuristic_party_is_valid_and_bounded(seed):
+    weights, columns, capacities = _party_instance(seed)
+    result = solve_party(weights, columns, capacities, exact_max_items=0)
+    optimum = _brute_force(weights, columns, capacities)
+    # sem nenhum item útil não há o que dividir e a resposta vazia já é exata
+    if any(result.assignment):
+        assert result.method == "heuristic"
+    assert result.score <= optimum <= result.upper_bound
+    _assert_valid(weights, columns, capacities, result)
+
+
+def test_party_needs_one_column_per_member():
+    with pytest.raises(ValueError):
+        solve_party([1, 2], [[1, 2]], [3, 3])
@@ -0,0 +1,43 @@
+import pytest
+
+from helpers import assert_feasible, brute_force_score, make_instance
+from reduction import knapsack_reduced_ids, knapsack_sweep_reduced, reduce_columns
+
+SEEDS = range(40)
+
+
+def _scaled_instance(seed):
+    """Pesos com mdc > 1 de vez em quando, para exercitar a divisão pelo mdc."""
+    weights, values, capacity = make_instance(seed)
+    factor = 1 + seed % 3
+    return [w * factor for w in weights], values, capacity * factor
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_reduced_solve_matches_brute_force(seed):
+    weights, values, capacity = _scaled_instance(seed)
+    best, chosen, report = knapsack_reduced_ids(weights, values, capacity)
+    assert best == brute_force_score(weights, values, capacity)
+    assert_feasible(weights, values, capacity, best, chosen)
+    assert report.items_before == len(weights)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_reduction_keeps_the_optimum(seed):
+    weights, values, capacity = _scaled_instance(seed)
+    reduced = reduce_columns(weights, values, capacity)
+    report = reduced.report
+    assert report.items_after + report.removed_heavy + report.removed_zero + report.removed_dominated == len(weights)
+    assert all(weights[i] % report.weight_gcd == 0 for i in reduced.indices)
+    assert brute_force_score(reduced.weights, reduced.values, reduced.capacity) == \
+        brute_force_score(weights, values, capacity)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_reduced_sweep_answers_every_capacity(seed):
+    weights, values, capacity = _scaled_instance(seed)
+    sweep, _ = knapsack_sweep_reduced(weights, values, capacity)
+    for c in range(capacity + 1):
+        best = brute_force_score(weights, values, c)
+        assert sweep.best_score(c) == best
+        assert_feasible(weights, values, c, best, sweep.chosen(c))
@@ -0,0 +1,18 @@
+from result_cards import CardCache, card_key
+
+
+def test_loose_items_differ_by_stats_and_image():
+    sword = {"name": "Espada", "weight": 7, "value": 13, "image": "espada.png", "stats": {"attack": 5}}
+    assert card_key(sword) == card_key(dict(sword))
+    assert card_key(sword) != card_key({**sword, "stats": {"attack": 9}})
+    assert card_key(sword) != card_key({**sword, "image": "espada2.png"})
+    assert card_key(sword) != card_key({**sword, "quantity": 2})
+    assert card_key(sword) != card_key(sword, is_discarded=True)
+
+
+def test_cache_reuses_cards_only_for_the_same_look():
+    cache = CardCache(lambda item, is_discarded: object())
+    sword = {"name": "Espada", "weight": 7, "value": 13, "stats": {"attack": 5}}
+    first = cache.cards("panel", [sword])
+    assert cache.cards("panel", [dict(sword)]) == first
+    assert cache.cards("panel", [{**sword, "stats": {"attack": 9}}]) != first
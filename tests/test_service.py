@@ -0,0 +1,90 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import service
+from catalog import DEFAULT_CATALOG_PATH
+from game_utils import calculate_item_score
+from helpers import brute_force_score
+from service import MAX_CAPACITY, SolveService, _bounded_int, _entries, _items
+
+
+@pytest.fixture(scope="module")
+def call():
+    """Chama uma rota do serviço com o trabalho de CPU numa thread (mesmo estado de processo)."""
+    service._init_worker(DEFAULT_CATALOG_PATH)
+    pool = ThreadPoolExecutor(max_workers=2)
+    solve_service = SolveService(pool, batch_window=0)
+
+    def call(path, payload, method="POST"):
+        body = json.dumps(payload).encode("utf-8")
+        return asyncio.run(solve_service.dispatch(method, path, body))
+
+    yield call
+    pool.shutdown()
+
+
+@pytest.mark.parametrize("value", [None, "3", 3.0, True, -1, MAX_CAPACITY + 1])
+def test_bounded_int_rejects(value):
+    with pytest.raises(ValueError):
+        _bounded_int({"capacity": value}, "capacity", 0, MAX_CAPACITY)
+
+
+def test_bounded_int_default():
+    assert _bounded_int({}, "quantity", 1, 5, default=1) == 1
+    assert _bounded_int({"quantity": 5}, "quantity", 1, 5, default=1) == 5
+
+
+@pytest.mark.parametrize("entries", [3, [1.5], [True], [{"quantity": 2}], [{"id": 1, "quantity": 0}]])
+def test_entries_rejects(entries):
+    with pytest.raises(ValueError):
+        _entries({"backpack": entries}, "backpack")
+
+
+@pytest.mark.parametrize("items", [
+    {"weight": 1, "value": 1},
+    [[1, 2]],
+    [{"value": 1}],
+    [{"weight": "2", "value": 1}],
+    [{"weight": 1, "value": 1.5}],
+    [{"weight": 1, "value": 1, "quantity": 0}],
+    [{"weight": 1, "value": 1, "name": 7}],
+    [{"weight": 1, "value": 1, "stats": {"attack": "alto"}}],
+])
+def test_items_rejects(items):
+    with pytest.raises(ValueError):
+        _items({"items": items})
+
+
+def test_invalid_items_are_a_bad_request(call):
+    status, payload = call("/solve", {"race": "orc", "capacity": 10, "items": [{"weight": "x", "value": 1}]})
+    assert status == 400 and "weight" in payload["error"]
+
+
+def test_unknown_race_and_route(call):
+    assert call("/solve", {"race": "dragão", "capacity": 10})[0] == 400
+    assert call("/nada", {})[0] == 404
+    assert call("/solve", {}, method="GET")[0] == 405
+
+
+def test_solve_client_stacks(call):
+    items = [
+        {"name": "Pedra", "weight": 3, "value": 4, "quantity": 5},
+        {"name": "Ouro", "weight": 2, "value": 9, "quantity": 2},
+    ]
+    status, result = call("/solve", {"race": "orc", "capacity": 10, "items": items})
+    assert status == 200
+    scores = [calculate_item_score(item, "orc") for item in items]
+    weights = [item["weight"] for item in items for _ in range(item["quantity"])]
+    values = [score for item, score in zip(items, scores) for _ in range(item["quantity"])]
+    assert result["score"] == brute_force_score(weights, values, 10)
+    assert result["weight"] == sum(item["weight"] * item.get("quantity", 1) for item in result["items"]) <= 10
+    assert all(item.get("quantity", 1) <= 5 for item in result["items"])
+
+
+def test_solve_catalog(call):
+    status, result = call("/solve", {"race": "orc", "capacity": 20})
+    assert status == 200 and result["weight"] <= 20
+    assert result["score"] == sum(item["value"] for item in result["items"])
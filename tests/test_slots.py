@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+import slots as slots_module
+from helpers import subsets
+from slots import SLOT_LIMITS, item_slot, knapsack_slots, knapsack_slots_ids
+
+SEEDS = range(40)
+SLOTS = list(SLOT_LIMITS)
+ENGINES = ["python"] + (["numpy"] if slots_module.np is not None else [])
+
+
+def _instance(seed):
+    rng = random.Random(seed)
+    n = rng.randint(0, 9)
+    weights = [rng.randint(0, 8) for _ in range(n)]
+    values = [rng.randint(-2, 20) for _ in range(n)]
+    item_slots = [rng.choice(SLOTS) for _ in range(n)]
+    limits = {slot: rng.choice([None, 0, 1, 2]) for slot in SLOTS}
+    return weights, values, item_slots, limits, rng.randint(0, 25)
+
+
+def _brute_force(weights, values, item_slots, limits, capacity) -> int:
+    best = 0
+    for chosen in subsets(range(len(weights))):
+        if sum(weights[i] for i in chosen) > capacity:
+            continue
+        if any(limits.get(slot) is not None and sum(item_slots[i] == slot for i in chosen) > limits[slot]
+               for slot in SLOTS):
+            continue
+        best = max(best, sum(values[i] for i in chosen))
+    return best
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("seed", SEEDS)
+def test_slots_match_brute_force(engine, seed):
+    weights, values, item_slots, limits, capacity = _instance(seed)
+    best, chosen = knapsack_slots_ids(weights, values, item_slots, capacity, limits, engine=engine)
+
+    assert best == _brute_force(weights, values, item_slots, limits, capacity)
+    assert chosen == sorted(set(chosen))
+    assert sum(values[i] for i in chosen) == best
+    assert sum(weights[i] for i in chosen) <= capacity
+    for slot, limit in limits.items():
+        if limit is not None:
+            assert sum(item_slots[i] == slot for i in chosen) <= limit
+
+
+def test_item_slot_rules():
+    assert item_slot({"name": "Poção de Cura", "type": ""}) == "consumable"
+    assert item_slot({"name": "Arco Élfico", "type": "weapon"}) == "ranged"
+    assert item_slot({"name": "Escudo Nórdico", "type": ""}) == "off_hand"
+    assert item_slot({"name": "Espada Longa", "type": "weapon"}) == "main_hand"
+    assert item_slot({"name": "Espada", "slot": "ranged"}) == "ranged"
+
+
+def test_knapsack_slots_keeps_one_shield():
+    shields = [{"name": f"Escudo {k}", "weight": 2, "value": 10 + k} for k in range(3)]
+    best, chosen = knapsack_slots(shields, 10)
+    assert best == 12 and [item["name"] for item in chosen] == ["Escudo 2"]